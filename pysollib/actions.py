@@ -197,6 +197,7 @@ class PysolMenubar(PysolMenubarTk):
         self.setMenuState(ms.find_card, "assist.findcard")
         self.setMenuState(ms.demo, "assist.demo")
         self.setMenuState(ms.demo, "assist.demoallgames")
+        self.setMenuState(ms.demo, "assist.autopilot")
         # Options menu
         self.setMenuState(ms.autofaceup, "options.automaticplay.autofaceup")
         self.setMenuState(ms.autodrop, "options.automaticplay.autodrop")
@@ -701,14 +702,20 @@ class PysolMenubar(PysolMenubarTk):
             return
         self._mDemo(mixed=1)
 
-    def _mDemo(self, mixed):
+    def mAutopilot(self, *args):
+        if self._cancelDrag():
+            return
+        if self.game.getHintClass() is not None:
+            self._mDemo(mixed=0, turbo=True)
+
+    def _mDemo(self, mixed, turbo=False):
         if self.changed():
             # only ask if there have been no demo moves or hints yet
             if self.game.stats.demo_moves == 0 and self.game.stats.hints == 0:
                 if not self.game.areYouSure(_("Play demo")):
                     return
         # self.app.demo_counter = 0
-        self.game.startDemo(mixed=mixed)
+        self.game.startDemo(mixed=mixed, turbo=turbo)
 
     #
     # Options menu
@@ -42,6 +42,7 @@ from pysollib.resource import Sample, SampleManager
 from pysollib.resource import Music, MusicManager
 from pysollib.images import Images, SubsampledImages
 from pysollib.pysolrandom import PysolRandom
+from pysollib.solvercache import solver_cache
 from pysollib.gamedb import GI, GAME_DB, loadGame
 from pysollib.options import Options
 from pysollib.settings import TOP_SIZE, TOOLKIT
@@ -392,6 +393,7 @@ class Application:
             stats=os.path.join(self.dn.config, "statistics.dat"),
             holdgame=os.path.join(self.dn.config, "holdgame.dat"),
             comments=os.path.join(self.dn.config, "comments.dat"),
+            solver_cache=os.path.join(self.dn.config, "solver_cache.dat"),
         )
         for k, v in self.dn.__dict__.items():
             if os.name == "nt":
@@ -454,6 +456,12 @@ class Application:
         except Exception:
             traceback.print_exc()
             pass
+        # try to load solver results
+        try:
+            solver_cache.load(self.fn.solver_cache)
+        except Exception:
+            traceback.print_exc()
+            pass
         # startup information
         if self.getGameClass(self.opt.last_gameid):
             self.nextgame.id = self.opt.last_gameid
@@ -624,6 +632,12 @@ class Application:
             except Exception:
                 traceback.print_exc()
                 pass
+            # save solver results
+            try:
+                solver_cache.save(self.fn.solver_cache)
+            except Exception:
+                traceback.print_exc()
+                pass
             # shut down audio
             try:
                 self.audio.destroy()
@@ -27,6 +27,7 @@ import sys
 import time
 import math
 import traceback
+from collections import OrderedDict
 
 from pysollib.mygettext import _
 from gettext import ungettext
@@ -52,6 +53,7 @@ from pysollib.pysoltk import after, after_idle, after_cancel
 from pysollib.pysoltk import MfxMessageDialog, MfxExceptionDialog
 from pysollib.pysoltk import MfxCanvasText, MfxCanvasLine, MfxCanvasRectangle
 from pysollib.pysoltk import Card
+from pysollib.headless import NullCard
 if TOOLKIT == 'tk':
     from pysollib.ui.tktile.solverdialog import reset_solver_dialog
 else:
@@ -63,7 +65,7 @@ if True:  # This prevents from travis 'error' E402.
     from pysollib.move import ANextRoundMove, ASaveSeedMove, AShuffleStackMove
     from pysollib.move import AUpdateStackMove, AFlipAllMove, ASaveStateMove
     from pysollib.move import ASingleCardMove
-    from pysollib.hint import DefaultHint
+    from pysollib.hint import DefaultHint, LookaheadHint
     from pysollib.help import help_about
 
 if sys.version_info > (3,):
@@ -71,6 +73,20 @@ if sys.version_info > (3,):
     long = int
 
 PLAY_TIME_TIMEOUT = 200
+HINTS_CACHE_SIZE = 200
+
+
+def _zobristKey(stack_id, pos, suit, rank, face_up):
+    # a fixed pseudo random 64-bit number for a card on a stack position
+    # (splitmix64), so that the snapshots are the same in every session
+    x = (stack_id << 12) + pos
+    x = (x << 8) + suit
+    x = (x << 8) + rank
+    x = (x << 1) + face_up
+    x = (x * 0x9E3779B97F4A7C15 + 0x632BE59BD9B4E019) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
 
 # ************************************************************************
 # * Base class for all solitaire games
@@ -102,6 +118,9 @@ class Game(object):
     # the format for a saved game changed (see also canLoadGame())
     GAME_VERSION = 1
 
+    # seconds of autopilot moves between two demo events (see demoEvent)
+    DEMO_TURBO_SLICE = 0.2
+
     #
     # game construction
     #
@@ -109,6 +128,8 @@ class Game(object):
     # only basic initialization here
     def __init__(self, gameinfo):
         self.preview = 0
+        self.turbo = False      # no screen updates (see playDemoToEnd)
+        self.headless = False
         self.random = None
         self.gameinfo = gameinfo
         self.id = gameinfo.id
@@ -122,8 +143,10 @@ class Game(object):
         self.stackmap = {}              # dict with (x,y) tuples as key
         self.allstacks = []
         self.sn_groups = []  # snapshot groups; list of list of similar stacks
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.snapshots = set()
+        self.failed_snapshots = set()
+        self.sn_hashes = None  # hashes of the stacks (see getSnapshot)
+        self.sn_dirty = set()  # ids of the stacks to rehash
         self.stackdesc_list = []
         self.demo_logo = None
         self.pause_logo = None
@@ -378,7 +401,42 @@ class Game(object):
         self.canvas.setInitialSize(self.width, self.height)
         self.busy = old_busy
 
+    # create the game model only (see pysollib/headless.py)
+    def createHeadless(self, app):
+        old_busy = self.busy
+        self.__createCommon(app)
+        self.preview = max(1, self.canvas.preview)
+        self.headless = True
+        # create game
+        self.createGame()
+        # set some defaults
+        self.sg.openstacks = [s for s in self.sg.openstacks
+                              if s.cap.max_accept >= s.cap.min_accept]
+        self.sg.hp_stacks = [s for s in self.sg.dropstacks
+                             if s.cap.max_move >= 2]
+        self.createSnGroups()
+        # convert stackgroups to tuples (speed)
+        self.allstacks = tuple(self.allstacks)
+        self.s.foundations = tuple(self.s.foundations)
+        self.s.rows = tuple(self.s.rows)
+        self.s.reserves = tuple(self.s.reserves)
+        self.s.internals = tuple(self.s.internals)
+        self.sg.openstacks = tuple(self.sg.openstacks)
+        self.sg.talonstacks = tuple(self.sg.talonstacks)
+        self.sg.dropstacks = tuple(self.sg.dropstacks)
+        self.sg.reservestacks = tuple(self.sg.reservestacks)
+        self.sg.hp_stacks = tuple(self.sg.hp_stacks)
+        # init the stack model; no view, no bindings
+        for stack in self.allstacks:
+            stack.is_visible = False
+            stack.prepareStack()
+            stack.assertStack()
+        # create cards
+        self.cards = self.createCards()
+        self.busy = old_busy
+
     def destruct(self):
+        self.stopHintsTimer()
         # help breaking circular references
         for obj in self.cards:
             destruct(obj)
@@ -388,6 +446,7 @@ class Game(object):
 
     # Do not destroy game structure (like stacks and cards) here !
     def reset(self, restart=0):
+        self.stopHintsTimer()
         self.filename = ""
         self.demo = None
         self.solver = None
@@ -396,6 +455,8 @@ class Game(object):
             index=-1,
             level=-1,
         )
+        # hints of the recent positions (see getHints)
+        self.hints_cache = OrderedDict()
         self.saveinfo = Struct(         # needed for saving a game
             stack_caps=[],
         )
@@ -404,8 +465,9 @@ class Game(object):
             talon_round=1,
             ncards=0,
         )
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.snapshots = set()
+        self.failed_snapshots = set()
+        self.sn_hashes = None
         # local statistics are reset on each game restart
         self.stats = Struct(
             hints=0,                  # number of hints consumed
@@ -537,6 +599,8 @@ class Game(object):
         self.startMoves()
         for stack in self.allstacks:
             stack.updateText()
+        # the dealer may place the cards directly
+        self.sn_hashes = None
         self.updateSnapshots()
         self.updateText()
         self.updateStatus(moves=(0, 0))
@@ -570,7 +634,7 @@ class Game(object):
         self.gsaveinfo = game.gsaveinfo
         self.s.talon.round = game.loadinfo.talon_round
         self.finished = game.finished
-        self.snapshots = game.snapshots
+        self.snapshots = set(game.snapshots)
         # 3) move cards to stacks
         assert len(self.allstacks) == len(game.loadinfo.stacks)
         old_state = game.moves.state
@@ -585,6 +649,7 @@ class Game(object):
                     card.showBack()
                 self.allstacks[i].addCard(card)
         game.moves.state = old_state
+        self.sn_hashes = None
         # 4) update settings
         for stack_id, cap in self.saveinfo.stack_caps:
             # print stack_id, cap
@@ -808,18 +873,32 @@ class Game(object):
         self.moves.state = old_state
 
     def getSnapshot(self):
-        # generate hash (unique string) of current move
-        sn = []
-        for stack in self.allstacks:
-            s = []
-            for card in stack.cards:
-                s.append('%d%03d%d' % (card.suit, card.rank, card.face_up))
-            sn.append(''.join(s))
-        sn = '-'.join(sn)
-        # optimisation
-        sn = hash(sn)
+        # generate hash of current position: the Zobrist hash of the
+        # cards (suit, rank and face_up) on the stacks positions;
+        # only the stacks changed by the last moves are rehashed
+        # (see __doMove)
+        if self.sn_hashes is None:
+            self.sn_hashes = [0] * len(self.allstacks)
+            self.sn_dirty = set(range(len(self.allstacks)))
+        hashes = self.sn_hashes
+        for i in self.sn_dirty:
+            h = 0
+            for pos, card in enumerate(self.allstacks[i].cards):
+                h ^= _zobristKey(i, pos, card.suit, card.rank, card.face_up)
+            hashes[i] = h
+        self.sn_dirty = set()
+        sn = 0
+        for h in hashes:
+            sn ^= h
         return sn
 
+    def _updateSnapshotStacks(self, am):
+        stack_ids = am.getStackIds()
+        if stack_ids is None:
+            self.sn_hashes = None
+        else:
+            self.sn_dirty.update(stack_ids)
+
     def createSnGroups(self):
         # group stacks by class and cap
         sg = {}
@@ -843,7 +922,7 @@ class Game(object):
             # self.updateStatus(snapshot=True)
             pass
         else:
-            self.snapshots.append(sn)
+            self.snapshots.add(sn)
             # self.updateStatus(snapshot=False)
 
     #
@@ -878,6 +957,8 @@ class Game(object):
         return cards
 
     def _createCard(self, id, deck, suit, rank, x, y):
+        if self.headless:
+            return NullCard(id, deck, suit, rank, game=self, x=x, y=y)
         return Card(id, deck, suit, rank, game=self, x=x, y=y)
 
     # shuffle cards
@@ -974,7 +1055,7 @@ class Game(object):
         return 0
 
     def updateMenus(self):
-        if not self.preview:
+        if not self.preview and not self.turbo:
             self.app.menubar.updateMenus()
 
     def disableMenus(self):
@@ -1029,7 +1110,7 @@ class Game(object):
         return EVENT_PROPAGATE
 
     def updateStatus(self, **kw):
-        if self.preview:
+        if self.preview or self.turbo:
             return
         tb, sb = self.app.toolbar, self.app.statusbar
         for k, v in kw.items():
@@ -1151,7 +1232,7 @@ class Game(object):
         if name in self.app.opt.sound_samples and \
                not self.app.opt.sound_samples[name]:
             return 0
-        if self.app.audio:
+        if self.app.audio and not self.turbo:
             return self.app.audio.playSample(
                 name,
                 priority=priority,
@@ -1168,7 +1249,7 @@ class Game(object):
 
     def startDealSample(self, loop=999999):
         a = self.app.opt.animations
-        if a and not self.preview:
+        if a and not self.preview and not self.turbo:
             self.canvas.update_idletasks()
         if self.app.audio and self.app.opt.sound \
                 and self.app.opt.sound_samples['deal']:
@@ -1222,7 +1303,7 @@ class Game(object):
         # 4 - slow (1/4 of fast speed)
         # 5 - very slow (1/8 of fast speed)
         # 10 - used internally in game preview
-        if self.app.opt.animations == 0 or frames == 0:
+        if self.app.opt.animations == 0 or frames == 0 or self.turbo:
             return
         # init timer - need a high resolution for this to work
         clock, delay, skip = None, 1, 1
@@ -1306,7 +1387,7 @@ class Game(object):
         self.canvas.update_idletasks()
 
     def doAnimatedFlipAndMove(self, from_stack, to_stack=None, frames=-1):
-        if self.app.opt.animations == 0 or frames == 0:
+        if self.app.opt.animations == 0 or frames == 0 or self.turbo:
             return False
         if not from_stack.cards:
             return False
@@ -2375,8 +2456,53 @@ Congratulations, you did it !
         hint_class = self.getHintClass()
         if hint_class is None:
             return None
+        if level == 4:
+            if not hint_class.LOOKAHEAD or \
+                    self.__class__.fillStack != Game.fillStack:
+                # the lookahead does not fill the stacks
+                level = 2
+            else:
+                # demo with lookahead
+                hint = LookaheadHint(self, level, hint_class)
+                return hint.getHints(taken_hint)
+        if taken_hint and taken_hint[6]:
+            # a forced move
+            key = None
+        else:
+            key = self._getHintsCacheKey(level)
+            hints = self._getCachedHints(key)
+            if hints is not None:
+                return hints
         hint = hint_class(self, level)      # call constructor
-        return hint.getHints(taken_hint)    # and return all hints
+        hints = hint.getHints(taken_hint)   # and return all hints
+        if key is not None:
+            self._cacheHints(key, hints)
+        return hints
+
+    # Hints of the recent positions are cached (undo/redo and bookmarks
+    # often come back to a position). The snapshot only covers the
+    # cards, so the key includes the talon round and the game state.
+    def _getHintsCacheKey(self, level):
+        state = self.getState()
+        if isinstance(state, list):
+            state = tuple(state)
+        talon_round = self.s.talon and self.s.talon.round
+        return (self.getSnapshot(), level, talon_round, state)
+
+    def _getCachedHints(self, key):
+        hints = self.hints_cache.pop(key, None)
+        if hints is None:
+            return None
+        # most recently used
+        self.hints_cache[key] = hints
+        return list(hints)
+
+    def _cacheHints(self, key, hints):
+        self.hints_cache.pop(key, None)
+        self.hints_cache[key] = list(hints)
+        while len(self.hints_cache) > HINTS_CACHE_SIZE:
+            # drop the least recently used entry
+            self.hints_cache.popitem(last=False)
 
     # give a hint
     def showHint(self, level=0, sleep=1.5, taken_hint=None):
@@ -2481,16 +2607,20 @@ Congratulations, you did it !
     #
 
     # start a demo
-    def startDemo(self, mixed=1, level=2):
+    def startDemo(self, mixed=1, level=2, turbo=False):
         assert level >= 2               # needed for flip/deal hints
         if not self.top:
             return
+        if level == 2 and not turbo and self.app.opt.demo_lookahead:
+            # (the autopilot plays too many moves for a search)
+            level = 4
         self.demo = Struct(
             level=level,
             mixed=mixed,
+            turbo=turbo,                # play to the end at once
             sleep=self.app.opt.timeouts['demo'],
             last_deal=[],
-            snapshots=[],
+            snapshots=set(),
             hint=None,
             keypress=None,
             start_demo_moves=self.stats.demo_moves,
@@ -2517,9 +2647,14 @@ Congratulations, you did it !
             self.stopDemo()
             # self.updateMenus()
             return
-        finished = self.playOneDemoMove(self.demo)
-        self.finishMove()
-        self.top.update_idletasks()
+        if self.demo.turbo:
+            # play for a while, then let the events in (the next
+            # demoEvent goes on or stops the demo)
+            finished = self.playDemoToEnd(self.demo, self.DEMO_TURBO_SLICE)
+        else:
+            finished = self.playOneDemoMove(self.demo)
+            self.finishMove()
+            self.top.update_idletasks()
         self.hints.list = None
         player_moves = self.getPlayerMoves()
         d, status = None, 0
@@ -2627,12 +2762,49 @@ Congratulations, you did it !
             if self.demo:
                 after_idle(self.top, self.demoEvent)  # schedule next move
 
+    # play the demo moves until the game is won or lost (autopilot);
+    # the screen is not updated after each move, but only at the end.
+    # Stops early (not finished) after time_limit seconds, or if the
+    # demo was stopped
+    def playDemoToEnd(self, demo, time_limit=None):
+        self.turbo = True
+        if time_limit is not None:
+            time_limit += time.time()
+        try:
+            finished = 0
+            while not finished and not self.isGameWon():
+                if self.demo is not demo or demo.keypress:
+                    break
+                if time_limit is not None and time.time() >= time_limit:
+                    break
+                finished = self.playOneDemoMove(demo)
+                self.finishMove()
+                self.hints.list = None
+        finally:
+            self.turbo = False
+            self.relayoutStacks()
+        self.updateText()
+        self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
+        self.updateMenus()
+        return finished
+
+    # move all cards to their places and update the stack texts
+    # (the cards are not moved on the canvas in turbo mode)
+    def relayoutStacks(self):
+        for stack in self.allstacks:
+            for card in stack.cards:
+                stack._position(card)
+            stack.updateText()
+
     # play one demo move while in the demo event
     def playOneDemoMove(self, demo):
         if self.moves.index > 2000:
             # we're probably looping because of some bug in the hint code
             return 1
         sleep = demo.sleep
+        if self.turbo:
+            # don't show the hint
+            sleep = 0
         # first try to deal cards to the Waste (unless there was a forced move)
         if not demo.hint or not demo.hint[6]:
             if self._autoDeal(sound=False):
@@ -2663,7 +2835,7 @@ Congratulations, you did it !
                 if sn in demo.snapshots:
                     # not unique
                     return 1
-                demo.snapshots.append(sn)
+                demo.snapshots.add(sn)
         elif from_stack == to_stack:
             # a flip-move
             from_stack.flipMove(animation=True)
@@ -2757,9 +2929,11 @@ Congratulations, you did it !
     #
 
     def getStuck(self):
-        h = self.Stuck_Class.getHints(None)
+        h = self._getCachedHints(self._getHintsCacheKey(0))
+        if h is None:
+            h = self.Stuck_Class.hasAnyMove()
         if h:
-            self.failed_snapshots = []
+            self.failed_snapshots = set()
             return True
         if not self.canDealCards():
             return False
@@ -2767,7 +2941,7 @@ Congratulations, you did it !
         sn = self.getSnapshot()
         if sn in self.failed_snapshots:
             return False
-        self.failed_snapshots.append(sn)
+        self.failed_snapshots.add(sn)
         return True
 
     def updateStuck(self):
@@ -2783,6 +2957,57 @@ Congratulations, you did it !
             # self.playSample("autopilotlost", priority=1000)
         self.updateStatus(stuck=text)
 
+    #
+    # Hints are precomputed in idle callbacks after each move, so that
+    # showHint() and the demo find them in the hints cache (see
+    # getHints). The callbacks are cancelled by the next move; a running
+    # callback is not, so the hints that may take long (a solver search)
+    # are only computed when they are asked for.
+    #
+
+    def startHintsTimer(self, stuck=1):
+        self.stopHintsTimer()
+        if self.turbo:
+            return
+        if not self.top or TOOLKIT == 'kivy':
+            # no idle callbacks
+            if stuck:
+                self.updateStuck()
+            return
+        hint_class = self.getHintClass()
+        if hint_class is None:
+            return
+        levels = []
+        if hint_class.PRECOMPUTE:
+            levels.append(0)
+            if self.hints.level in (1, 2):
+                # the level of the last hint (Ctrl-H or demo)
+                levels.append(self.hints.level)
+        if not levels and not stuck:
+            return
+        self.hints_timer = after_idle(self.top, self.precomputeHints,
+                                      self.getSnapshot(), levels, stuck)
+
+    def stopHintsTimer(self):
+        if hasattr(self, 'hints_timer') and self.hints_timer:
+            after_cancel(self.hints_timer)
+            self.hints_timer = None
+
+    def precomputeHints(self, sn, levels, stuck):
+        self.hints_timer = None
+        if self.getSnapshot() != sn:
+            # paranoia - the position has changed
+            return
+        if stuck:
+            self.updateStuck()
+        else:
+            self.getHints(levels[0])
+            levels = levels[1:]
+        if levels:
+            # one step per idle callback
+            self.hints_timer = after_idle(self.top, self.precomputeHints,
+                                          sn, levels, 0)
+
     #
     # Handle moves (with move history for undo/redo)
     # Actual move is handled in a subclass of AtomicMove.
@@ -2817,13 +3042,17 @@ Congratulations, you did it !
         if self.S_DEAL <= self.moves.state <= self.S_PLAY:
             self.moves.current.append(am)
 
+    def __doMove(self, am):
+        am.do(self)
+        self._updateSnapshotStacks(am)
+
     # move type 1
     def moveMove(self, ncards, from_stack, to_stack, frames=-1, shadow=-1):
         assert from_stack and to_stack and from_stack is not to_stack
         assert 0 < ncards <= len(from_stack.cards)
         am = AMoveMove(ncards, from_stack, to_stack, frames, shadow)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     # move type 2
@@ -2831,7 +3060,7 @@ Congratulations, you did it !
         assert stack
         am = AFlipMove(stack)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     def singleFlipMove(self, stack):
@@ -2839,14 +3068,14 @@ Congratulations, you did it !
         assert stack
         am = ASingleFlipMove(stack)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     def flipAndMoveMove(self, from_stack, to_stack, frames=-1):
         assert from_stack and to_stack and (from_stack is not to_stack)
         am = AFlipAndMoveMove(from_stack, to_stack, frames)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     # move type 3
@@ -2855,7 +3084,7 @@ Congratulations, you did it !
         assert len(to_stack.cards) == 0
         am = ATurnStackMove(from_stack, to_stack)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     # move type 4
@@ -2863,14 +3092,14 @@ Congratulations, you did it !
         assert stack
         am = ANextRoundMove(stack)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     # move type 5
     def saveSeedMove(self):
         am = ASaveSeedMove(self)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         # self.hints.list = None
 
     # move type 6
@@ -2878,7 +3107,7 @@ Congratulations, you did it !
         assert stack
         am = AShuffleStackMove(stack, self)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     # move type 7
@@ -2886,7 +3115,7 @@ Congratulations, you did it !
         assert stack
         am = AUpdateStackMove(stack, flags)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         # #self.hints.list = None
 
     # move type 8
@@ -2894,14 +3123,14 @@ Congratulations, you did it !
         assert stack
         am = AFlipAllMove(stack)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     # move type 9
     def saveStateMove(self, flags):
         am = ASaveStateMove(self, flags)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         # self.hints.list = None
 
     # for ArbitraryStack
@@ -2909,7 +3138,7 @@ Congratulations, you did it !
                        frames=-1, shadow=-1):
         am = ASingleCardMove(from_stack, to_stack, position, frames, shadow)
         self.__storeMove(am)
-        am.do(self)
+        self.__doMove(am)
         self.hints.list = None
 
     # Finish the current move.
@@ -2963,7 +3192,7 @@ Congratulations, you did it !
         self.updateStatus(moves=(moves.index, self.stats.total_moves))
         self.updateMenus()
         self.updatePlayTime(do_after=0)
-        self.updateStuck()
+        self.startHintsTimer()
         reset_solver_dialog()
 
         return 1
@@ -2982,6 +3211,7 @@ Congratulations, you did it !
         self.moves.state = self.S_UNDO
         for atomic_move in reversed(self.moves.history[self.moves.index]):
             atomic_move.undo(self)
+            self._updateSnapshotStacks(atomic_move)
         self.moves.state = self.S_PLAY
         self.stats.undo_moves += 1
         self.stats.total_moves += 1
@@ -2991,7 +3221,8 @@ Congratulations, you did it !
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
         self.updateMenus()
         self.updateStatus(stuck='')
-        self.failed_snapshots = []
+        self.failed_snapshots = set()
+        self.startHintsTimer(stuck=0)
         reset_solver_dialog()
 
     def redo(self):
@@ -3005,6 +3236,7 @@ Congratulations, you did it !
         self.moves.state = self.S_REDO
         for atomic_move in m:
             atomic_move.redo(self)
+            self._updateSnapshotStacks(atomic_move)
         self.moves.state = self.S_PLAY
         self.stats.redo_moves += 1
         self.stats.total_moves += 1
@@ -3013,7 +3245,7 @@ Congratulations, you did it !
         self.updateText()
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
         self.updateMenus()
-        self.updateStuck()
+        self.startHintsTimer()
         reset_solver_dialog()
 
     #
@@ -3301,7 +3533,7 @@ in the current implementation.''') % version)
             p.dump(self.saveinfo)
             p.dump(self.gsaveinfo)
         p.dump(self.moves)
-        p.dump(self.snapshots)
+        p.dump(list(self.snapshots))
         if 0 <= bookmark <= 1:
             if bookmark == 0:
                 self.gstats.saved = self.gstats.saved + 1
@@ -98,6 +98,8 @@ class Calculation(Game):
 2: 4 6 8 T Q A 3 5 7 9 J K
 3: 6 9 Q 2 5 8 J A 4 7 T K
 4: 8 Q 3 7 J 2 6 T A 5 9 K'''))
+        if self.headless:
+            return help, 0
         # calculate text_width
         lines = help.split('\n')
         lines.sort(key=len)
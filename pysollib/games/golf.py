@@ -140,6 +140,7 @@ class Golf_RowStack(BasicRowStack):
 class Golf(Game):
     Waste_Class = Golf_Waste
     Hint_Class = Golf_Hint
+    Solver_Class = BlackHoleSolverWrapper(preset='golf')
 
     #
     # game layout
@@ -245,6 +246,8 @@ class Elevator_RowStack(Golf_RowStack):
 
 
 class Elevator(RelaxedGolf):
+    # the rows are blocked by other rows
+    Solver_Class = None
 
     #
     # game layout
@@ -928,6 +931,8 @@ class FirTree_GameMethods:
 
 class ThreeFirTrees(Golf, FirTree_GameMethods):
     Hint_Class = CautiousDefaultHint
+    # the rows are blocked by other rows
+    Solver_Class = None
     Waste_Class = Golf_Waste
 
     def createGame(self):
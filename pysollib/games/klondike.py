@@ -33,6 +33,7 @@ from pysollib.layout import Layout
 from pysollib.hint import CautiousDefaultHint
 from pysollib.hint import KlondikeType_Hint
 from pysollib.hint import FreeCellSolverWrapper
+from pysollib.hint import KlondikeSolverWrapper
 from pysollib.pysoltk import MfxCanvasText
 
 from pysollib.games.canfield import CanfieldRush_Talon
@@ -73,6 +74,7 @@ class Klondike(Game):
     Foundation_Class = SS_FoundationStack
     RowStack_Class = KingAC_RowStack
     Hint_Class = KlondikeType_Hint
+    Solver_Class = KlondikeSolverWrapper()
 
     def createGame(self, max_rounds=-1, num_deal=1, **layout):
         # create layout
@@ -161,6 +163,7 @@ class KlondikeByThrees(Klondike):
 
 class ThumbAndPouch(Klondike):
     RowStack_Class = BO_RowStack
+    Solver_Class = KlondikeSolverWrapper(sbb='any_suit_but_own', esf='all')
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1)
@@ -173,6 +176,7 @@ class ThumbAndPouch(Klondike):
 
 class Chinaman(ThumbAndPouch):
     RowStack_Class = StackWrapper(BO_RowStack, base_rank=KING)
+    Solver_Class = KlondikeSolverWrapper(sbb='any_suit_but_own')
 
     def createGame(self):
         lay = Klondike.createGame(self, num_deal=3,
@@ -196,6 +200,7 @@ class Whitehead_RowStack(SS_RowStack):
 class Whitehead(Klondike):
     RowStack_Class = Whitehead_RowStack
     Hint_Class = CautiousDefaultHint
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1)
@@ -227,6 +232,7 @@ class SmallHarp(Klondike):
 
 class Eastcliff(Klondike):
     RowStack_Class = AC_RowStack
+    Solver_Class = KlondikeSolverWrapper(esf='all')
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1)
@@ -242,6 +248,7 @@ class Eastcliff(Klondike):
 
 class Easthaven(Eastcliff):
     Talon_Class = DealRowTalonStack
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1, waste=0)
@@ -271,6 +278,7 @@ class Westcliff(Eastcliff):
 
 class Westhaven(Westcliff):
     Talon_Class = DealRowTalonStack
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1, rows=10, waste=0)
@@ -390,6 +398,7 @@ class AgnesSorel(Klondike):
     Foundation_Class = StackWrapper(
         SS_FoundationStack, mod=13, base_rank=NO_RANK, max_move=0)
     RowStack_Class = StackWrapper(SC_RowStack, mod=13, base_rank=NO_RANK)
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1, waste=0)
@@ -413,6 +422,7 @@ class AgnesSorel(Klondike):
 class EightTimesEight(Klondike):
     Layout_Method = staticmethod(Layout.gypsyLayout)
     RowStack_Class = AC_RowStack
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, rows=8)
@@ -468,6 +478,8 @@ class Batsford_ReserveStack(ReserveStack):
 
 
 class Batsford(Klondike):
+    Solver_Class = None
+
     def createGame(self, **layout):
         kwdefault(layout, rows=10, max_rounds=1, playcards=22)
         round_text = (layout['max_rounds'] > 1)
@@ -496,6 +508,8 @@ class BatsfordAgain(Batsford):
 # ************************************************************************
 
 class Jumbo(Klondike):
+    Solver_Class = None
+
     def createGame(self):
         lay = Klondike.createGame(self, rows=9, max_rounds=2, round_text=True)
         lay.createRoundText(self.s.talon, 'ne', dx=lay.XS)
@@ -519,6 +533,7 @@ class OpenJumbo(Jumbo):
 class Stonewall(Klondike):
     Talon_Class = InitialDealTalonStack
     RowStack_Class = AC_RowStack
+    Solver_Class = None
 
     DEAL = (0, 1, 0, 1, -1, 0, 1)
 
@@ -564,6 +579,7 @@ class KingAlbert(Klondike):
     Talon_Class = InitialDealTalonStack
     RowStack_Class = StackWrapper(AC_RowStack, max_move=1)
     Hint_Class = CautiousDefaultHint
+    Solver_Class = None
 
     ROWS = 9
     RESERVES = (2, 2, 2, 1)
@@ -654,6 +670,7 @@ class Jane(Klondike):
     Foundation_Class = StackWrapper(
         SS_FoundationStack, mod=13, base_rank=NO_RANK, min_cards=1)
     RowStack_Class = StackWrapper(AC_RowStack, mod=13, base_rank=NO_RANK)
+    Solver_Class = None
 
     def createGame(self, max_rounds=1, rows=7, reserves=7, playcards=16):
         lay, s = Layout(self), self.s
@@ -794,6 +811,7 @@ class Phoenix(Klondike):
 
     Hint_Class = CautiousDefaultHint
     RowStack_Class = AC_RowStack
+    Solver_Class = None
 
     def createGame(self):
 
@@ -841,6 +859,7 @@ class Lanes(Klondike):
     Hint_Class = CautiousDefaultHint
     Foundation_Class = StackWrapper(SS_FoundationStack, max_move=0)
     RowStack_Class = StackWrapper(AC_RowStack, base_rank=ANY_RANK, max_move=1)
+    Solver_Class = KlondikeSolverWrapper(esf='all', max_move=1)
 
     def createGame(self):
         lay = Klondike.createGame(self, rows=6, max_rounds=2, round_text=True)
@@ -866,6 +885,7 @@ class ThirtySix(Klondike):
 
     Foundation_Class = StackWrapper(SS_FoundationStack, max_move=0)
     RowStack_Class = StackWrapper(RK_RowStack, base_rank=ANY_RANK)
+    Solver_Class = KlondikeSolverWrapper(sbb='rank', esf='all')
 
     def createGame(self):
         Klondike.createGame(self, rows=6, max_rounds=1)
@@ -901,6 +921,7 @@ class Q_C_(Klondike):
     Hint_Class = CautiousDefaultHint
     Foundation_Class = StackWrapper(SS_FoundationStack, max_move=0)
     RowStack_Class = StackWrapper(SS_RowStack, base_rank=ANY_RANK, max_move=1)
+    Solver_Class = None
 
     def createGame(self):
         lay = Klondike.createGame(self, rows=6, max_rounds=2)
@@ -988,6 +1009,7 @@ class DoubleDot(Klondike):
     Talon_Class = DealRowTalonStack
     RowStack_Class = StackWrapper(RK_RowStack, dir=-2, mod=13)
     Foundation_Class = StackWrapper(SS_FoundationStack, dir=2, mod=13)
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1, rows=8, waste=0)
@@ -1023,6 +1045,7 @@ class SevenDevils(Klondike):
 
     Hint_Class = CautiousDefaultHint
     RowStack_Class = StackWrapper(SevenDevils_RowStack, max_move=1)
+    Solver_Class = None
 
     def createGame(self):
 
@@ -1063,6 +1086,8 @@ class SevenDevils(Klondike):
 
 class MovingLeft(Klondike):
 
+    Solver_Class = None
+
     def createGame(self):
         Klondike.createGame(self, max_rounds=1, rows=10, playcards=24)
 
@@ -1094,6 +1119,7 @@ class Souter(MovingLeft):
 
 class BigForty(Klondike):
     RowStack_Class = SS_RowStack
+    Solver_Class = KlondikeSolverWrapper(sbb='suit', esf='all')
 
     def createGame(self):
         Klondike.createGame(self, rows=10)
@@ -1138,6 +1164,8 @@ class Saratoga(Klondike):
 
 class Whitehorse(Klondike):
 
+    Solver_Class = None
+
     def createGame(self):
         Klondike.createGame(self, num_deal=3)
 
@@ -1173,6 +1201,7 @@ class Boost(Klondike):
 
 class GoldRush(Klondike):
     Talon_Class = CanfieldRush_Talon
+    Solver_Class = None
 
     def createGame(self):
         lay = Klondike.createGame(self, max_rounds=3, round_text=True)
@@ -1189,6 +1218,7 @@ class GoldMine_RowStack(AC_RowStack):
 
 class GoldMine(Klondike):
     RowStack_Class = GoldMine_RowStack
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1, num_deal=3)
@@ -1342,6 +1372,7 @@ class Kingsley(Klondike):
 
     Foundation_Class = StackWrapper(SS_FoundationStack, base_rank=KING, dir=-1)
     RowStack_Class = StackWrapper(KingAC_RowStack, base_rank=ACE, dir=1)
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1)
@@ -1354,6 +1385,7 @@ class Kingsley(Klondike):
 class Scarp(Klondike):
     Talon_Class = DealRowTalonStack
     RowStack_Class = AC_RowStack
+    Solver_Class = None
 
     def createGame(self):
         Klondike.createGame(self, max_rounds=1, rows=13, waste=0, playcards=28)
@@ -1375,6 +1407,7 @@ class EightSages_Row(AC_RowStack):
 
 class EightSages(Klondike):
     RowStack_Class = EightSages_Row
+    Solver_Class = None
 
     def createGame(self):
         lay = Klondike.createGame(self, max_rounds=2, rows=8,
@@ -390,6 +390,7 @@ class LarasGame(Game):
         self.moves.state = self.S_UNDO
         for atomic_move in m:
             atomic_move.undo(self)
+            self._updateSnapshotStacks(atomic_move)
         self.moves.state = self.S_PLAY
         m = self.moves.history[max(0, self.moves.index - 1)]
         self.active_row = m[len(m) - 1]
@@ -413,6 +414,7 @@ class LarasGame(Game):
         self.moves.state = self.S_REDO
         for atomic_move in m:
             atomic_move.redo(self)
+            self._updateSnapshotStacks(atomic_move)
         self.moves.state = self.S_PLAY
         self.stats.redo_moves = self.stats.redo_moves + 1
         self.stats.total_moves = self.stats.total_moves + 1
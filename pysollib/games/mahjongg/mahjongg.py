@@ -35,6 +35,10 @@ from pysollib.game import Game
 from pysollib.layout import Layout
 from pysollib.hint import AbstractHint
 from pysollib.settings import TOOLKIT, DEBUG
+from pysollib.solvers.mahjongg import \
+        MahjonggDealer, \
+        MahjonggLayout, \
+        MahjonggSolver
 from pysollib.pysoltk import MfxCanvasText, MfxCanvasImage
 from pysollib.pysoltk import bind, EVENT_HANDLED, ANCHOR_NW
 from pysollib.pysoltk import MfxMessageDialog
@@ -60,9 +64,17 @@ def factorial(x):
 # ************************************************************************
 
 class Mahjongg_Hint(AbstractHint):
-    # FIXME: no intelligence whatsoever is implemented here
+    # the first pair of a solution (see getSolverResult) comes first
+    SOLUTION_SCORE = 100000
+    LOOKAHEAD = False
+    PRECOMPUTE = False
+
     def computeHints(self):
         game = self.game
+        solution = None
+        state, moves = game.getSolverResult()
+        if state == 'solved' and moves:
+            solution = moves[0]
         # get free stacks
         stacks = []
         for r in game.s.rows:
@@ -82,6 +94,8 @@ class Mahjongg_Hint(AbstractHint):
                         1000 * (len(rb.below) + len(tb.below)) + \
                         len(rb.all_left) + len(rb.all_right) + \
                         len(tb.all_left) + len(tb.all_right)
+                    if solution in ((r, t), (t, r)):
+                        score += self.SOLUTION_SCORE
                     self.addHint(score, 1, r, t)
             i += 1
 
@@ -323,6 +337,10 @@ class Mahjongg_RowStack(OpenStack):
 # *
 # ************************************************************************
 
+# the decoded layouts, by layout string
+_layout_cache = {}
+
+
 class AbstractMahjonggGame(Game):
     Hint_Class = Mahjongg_Hint
     RowStack_Class = Mahjongg_RowStack
@@ -331,6 +349,10 @@ class AbstractMahjonggGame(Game):
 
     NCARDS = 144
 
+    SOLVER_MAX_ITERS = 5000
+    SOLVER_STUCK_ITERS = 300        # for the check after each move
+    SOLVER_CACHE_SIZE = 1000
+
     def getTiles(self):
         # decode tile positions
         L = self.L
@@ -357,12 +379,32 @@ class AbstractMahjonggGame(Game):
         # tiles = tuple(tiles)
         return tiles, max_tl, max_tx, max_ty
 
+    def getLayout(self):
+        # the tiles and their blockmaps (as positions, see
+        # pysollib.solvers.mahjongg) are computed once per layout
+        layout = _layout_cache.get(self.L)
+        if layout is None:
+            tiles, max_tl, max_tx, max_ty = self.getTiles()
+            # sort tiles (for 3D)
+            tiles.sort(key=lambda x: (x[0], x[2]-x[1]))
+            layout = Struct(
+                tiles=tuple(tiles),
+                max_tl=max_tl,
+                max_tx=max_tx,
+                max_ty=max_ty,
+                blockmap=MahjonggLayout.fromTiles(tiles),
+            )
+            _layout_cache[self.L] = layout
+        return layout
+
     #
     # game layout
     #
 
     def createGame(self):
-        tiles, max_tl, max_tx, max_ty = self.getTiles()
+        layout = self.getLayout()
+        tiles, blockmap = layout.tiles, layout.blockmap
+        max_tl, max_tx, max_ty = layout.max_tl, layout.max_tx, layout.max_ty
 
         # start layout
         l, s = Layout(self), self.s
@@ -418,12 +460,9 @@ class AbstractMahjonggGame(Game):
 
         # set game extras
         self.check_dist = l.CW*l.CW + l.CH*l.CH     # see _getClosestStack()
+        self.solver_results = {}                    # see getSolverResult()
 
-        # sort tiles (for 3D)
-        tiles.sort(key=lambda x: (x[0], x[2]-x[1]))
-
-        # create a row stack for each tile and compute the tilemap
-        tilemap = {}
+        # create a row stack for each tile
         x0 = left_margin
         y0 = l.YM + dyy
         for level, tx, ty in tiles:
@@ -435,90 +474,20 @@ class AbstractMahjonggGame(Game):
             stack.CARD_XOFFSET = dx
             stack.CARD_YOFFSET = dy
             s.rows.append(stack)
-            # tilemap - each tile covers 4 positions
-            tilemap[(level, tx, ty)] = stack
-            tilemap[(level, tx+1, ty)] = stack
-            tilemap[(level, tx, ty+1)] = stack
-            tilemap[(level, tx+1, ty+1)] = stack
-
-        # compute blockmap
-        for stack in s.rows:
-            level, tx, ty = tiles[stack.id]
-            above, below, left, right = {}, {}, {}, {}
-            # above blockers
-            for tl in range(level+1, level+2):
-                above[tilemap.get((tl, tx, ty))] = 1
-                above[tilemap.get((tl, tx+1, ty))] = 1
-                above[tilemap.get((tl, tx, ty+1))] = 1
-                above[tilemap.get((tl, tx+1, ty+1))] = 1
-            #
-            for tl in range(level):
-                below[tilemap.get((tl, tx, ty))] = 1
-                below[tilemap.get((tl, tx+1, ty))] = 1
-                below[tilemap.get((tl, tx, ty+1))] = 1
-                below[tilemap.get((tl, tx+1, ty+1))] = 1
-            # left blockers
-            left[tilemap.get((level, tx-1, ty))] = 1
-            left[tilemap.get((level, tx-1, ty+1))] = 1
-            # right blockers
-            right[tilemap.get((level, tx+2, ty))] = 1
-            right[tilemap.get((level, tx+2, ty+1))] = 1
-            # up blockers
-            # up[tilemap.get((level, tx, ty-1))] = 1
-            # up[tilemap.get((level, tx+1, ty-1))] = 1
-            # bottom blockers
-            # bottom[tilemap.get((level, tx, ty+2))] = 1
-            # bottom[tilemap.get((level, tx+1, ty+2))] = 1
-            # sanity check - assert that there are no overlapping tiles
-            assert tilemap.get((level, tx, ty)) is stack
-            assert tilemap.get((level, tx+1, ty)) is stack
-            assert tilemap.get((level, tx, ty+1)) is stack
-            assert tilemap.get((level, tx+1, ty+1)) is stack
-            #
-            above = tuple([_f for _f in above.keys() if _f])
-            below = tuple([_f for _f in below.keys() if _f])
-            left = tuple([_f for _f in left.keys() if _f])
-            right = tuple([_f for _f in right.keys() if _f])
-            # up = tuple(filter(None, up.keys()))
-            # bottom = tuple(filter(None, bottom.keys()))
-
-            # assemble
+
+        # assemble the blockmap
+        rows = s.rows
+        for i, stack in enumerate(rows):
             stack.blockmap = Struct(
-                above=above,
-                below=below,
-                left=left,
-                right=right,
-                # up=up,
-                # bottom=bottom,
-                all_left=None,
-                all_right=None,
+                above=tuple([rows[k] for k in blockmap.above_list[i]]),
+                below=tuple([rows[k] for k in blockmap.below_list[i]]),
+                left=tuple([rows[k] for k in blockmap.left_list[i]]),
+                right=tuple([rows[k] for k in blockmap.right_list[i]]),
+                all_left=tuple([rows[k] for k in blockmap.all_left_list[i]]),
+                all_right=tuple([rows[k]
+                                 for k in blockmap.all_right_list[i]]),
             )
 
-        def get_all_left(s):
-            if s.blockmap.all_left is None:
-                s.blockmap.all_left = {}
-            for t in s.blockmap.left:
-                if t.blockmap.all_left is None:
-                    get_all_left(t)
-                s.blockmap.all_left.update(t.blockmap.all_left)
-                s.blockmap.all_left[t] = 1
-
-        def get_all_right(s):
-            if s.blockmap.all_right is None:
-                s.blockmap.all_right = {}
-            for t in s.blockmap.right:
-                if t.blockmap.all_right is None:
-                    get_all_right(t)
-                s.blockmap.all_right.update(t.blockmap.all_right)
-                s.blockmap.all_right[t] = 1
-
-        for r in s.rows:
-            get_all_left(r)
-            get_all_right(r)
-        for r in s.rows:
-            r.blockmap.all_left = tuple(r.blockmap.all_left.keys())
-            r.blockmap.all_right = tuple(r.blockmap.all_right.keys())
-
         # create other stacks
         for i in range(4):
             for j in range(9):
@@ -644,130 +613,34 @@ class AbstractMahjonggGame(Game):
         return old_cards
 
     def _shuffleHook2(self, rows, cards):
-
+        # build a solvable deal backwards (see pysollib.solvers.mahjongg)
         start_time = time.time()
-        iters = [0]
-        # limitations
-        max_time = 5.0                  # seconds
-        max_iters = 2*len(cards)
-
-        def is_suitable(stack, cards):
-            for s in stack.blockmap.below:
-                if cards[s.id] == 1:
-                    continue
-                # check if below stacks are non-empty
-                if cards[s.id] is None:
-                    return False
-
-            for s in stack.blockmap.left:
-                if cards[s.id] == 1:
-                    continue
-                if cards[s.id] is None:
-                    for t in s.blockmap.all_left:
-                        if cards[t.id] == 1:
-                            continue
-                        if cards[t.id] is not None:
-                            # we have empty stack between two non-empty
-                            return False
-
-            for s in stack.blockmap.right:
-                if cards[s.id] == 1:
-                    continue
-                if cards[s.id] is None:
-                    for t in s.blockmap.all_right:
-                        if cards[t.id] == 1:
-                            continue
-                        if cards[t.id] is not None:
-                            # we have empty stack between two non-empty
-                            return False
-            return True
-
-        def create_solvable(cards, new_cards):
-            iters[0] += 1
-            if iters[0] > max_iters:
-                return None
-            if time.time() - start_time > max_time:
-                return None
-            if not cards:
-                return new_cards
-
-            nc = new_cards[:]
-
-            # select two matching cards
-            c1 = cards[0]
-            del cards[0]
-            c2 = None
-            for i in range(len(cards)):
-                if self.cardsMatch(c1, cards[i]):
-                    c2 = cards[i]
-                    del cards[i]
-                    break
-
-            # find suitable stacks
-            #  suitable_stacks = []
-            #  for r in rows:
-            #      if nc[r.id] is None and is_suitable(r, nc):
-            #          suitable_stacks.append(r)
-            suitable_stacks = [r for r in rows
-                               if nc[r.id] is None and is_suitable(r, nc)]
-
-            old_pairs = []
-            i = factorial(len(suitable_stacks))//2 \
-                // factorial(len(suitable_stacks)-2)
-            for j in range(i):
-                if iters[0] > max_iters:
-                    return None
-                if time.time() - start_time > max_time:
-                    return None
-
-                # select two suitable stacks
-                while True:
-                    # create a uniq pair
-                    r1 = self.random.randrange(0, len(suitable_stacks))
-                    r2 = self.random.randrange(0, len(suitable_stacks))
-                    if r1 == r2:
-                        continue
-                    if (r1, r2) not in old_pairs and (r2, r1) not in old_pairs:
-                        old_pairs.append((r1, r2))
-                        break
-                s1 = suitable_stacks[r1]
-                s2 = suitable_stacks[r2]
-                # check if s1 don't block s2
-                nc[s1.id] = c1
-                if not is_suitable(s2, nc):
-                    nc[s1.id] = None
-                    continue
-                nc[s2.id] = c2
-                # check if this layout is solvable (backtracking)
-                ret = create_solvable(cards[:], nc)
-                if ret:
-                    ret = [x for x in ret if x != 1]
-                    return ret
-                nc[s1.id] = nc[s2.id] = None  # try another way
-
+        layout = self.getLayout().blockmap
+        used = 0
+        for r in rows:
+            used |= 1 << r.id
+        pairs = MahjonggDealer(layout, self.random, used).createDeal()
+        if DEBUG:
+            print('create_solvable time:', time.time() - start_time)
+        if pairs is None:
+            print('oops! can\'t create a solvable game')
             return None
-
-        new_cards = [None]*len(self.s.rows)  # None - empty stack, 1 - non-used
-        drows = dict.fromkeys(rows)     # optimization
-        for r in self.s.rows:
-            if r not in drows:
-                new_cards[r.id] = 1
-        del drows
-
-        while True:
-            ret = create_solvable(cards[:], new_cards)
-            if DEBUG:
-                print('create_solvable time:', time.time() - start_time)
-            if ret:
-                ret.reverse()
-                return ret
-            if time.time() - start_time > max_time or \
-                    iters[0] <= max_iters:
-                print('oops! can\'t create a solvable game')
-                return None
-            iters = [0]
-        print('oops! can\'t create a solvable game')
-        return None
+        # select the matching cards (the first pairs put on the board
+        # are the last ones to be removed)
+        cards = cards[:]
+        self.random.shuffle(cards)
+        new_cards = [None]*len(self.s.rows)
+        for i, j in pairs:
+            c1 = cards.pop()
+            for k in range(len(cards)-1, -1, -1):
+                if self.cardsMatch(c1, cards[k]):
+                    c2 = cards.pop(k)
+                    break
+            new_cards[i] = c1
+            new_cards[j] = c2
+        ret = [new_cards[r.id] for r in rows]
+        ret.reverse()
+        return ret
 
     def _mahjonggShuffle(self):
         talon = self.s.talon
@@ -888,8 +761,24 @@ a solvable configuration.'''),
                        self.NCARDS - t) % (self.NCARDS - t)
 
         t = r1 + r2 + f
+        result = self.solver_results.get(self._getSolverKey())
+        if result is not None:
+            t += {
+                'solved': _('\n\nSolvable'),
+                'unsolved': _('\n\nNot\nSolvable'),
+                'intractable': _('\n\nSolvable?'),
+            }[result[0]]
         self.texts.info.config(text=t)
 
+    def updateStuck(self):
+        Game.updateStuck(self)
+        if self.preview > 1 or self.texts.info is None or self.finished:
+            return
+        # the solvability is shown in self.texts.info; this runs after
+        # every move, so the search is short (the hints search longer)
+        self.getSolverResult(self.SOLVER_STUCK_ITERS)
+        self.updateText()
+
     #
     # Mahjongg special overrides
     #
@@ -993,6 +882,52 @@ a solvable configuration.'''),
                 return 7 >= card2.rank >= 4
         return card1.rank == card2.rank
 
+    def getTileKind(self, card):
+        # matching tiles have the same kind (see cardsMatch)
+        if card.suit == 3:
+            if card.rank >= 8:
+                return (3, 8)
+            if card.rank >= 4:
+                return (3, 4)
+        return (card.suit, card.rank)
+
+    def _getSolverKey(self):
+        return tuple([r.cards[0].id if r.cards else None
+                      for r in self.s.rows])
+
+    def getSolverResult(self, max_iters=None):
+        # Is the board still solvable? Returns 'solved', 'unsolved' or
+        # 'intractable' and the pairs of row stacks of a solution.
+        if max_iters is None:
+            max_iters = self.SOLVER_MAX_ITERS
+        key = self._getSolverKey()
+        result = self.solver_results.get(key)
+        if result is not None:
+            # (state, moves, the budget of an intractable search)
+            if result[2] is None or result[2] >= max_iters:
+                return result[:2]
+        tiles = [self.getTileKind(r.cards[0]) if r.cards else None
+                 for r in self.s.rows]
+        solver = MahjonggSolver(self.getLayout().blockmap, tiles,
+                                max_iters=max_iters)
+        state = solver.solve()
+        if len(self.solver_results) > self.SOLVER_CACHE_SIZE:
+            self.solver_results.clear()
+        rows = self.s.rows
+        moves = [(rows[i], rows[j]) for i, j in solver.moves]
+        if state == 'intractable':
+            self.solver_results[key] = (state, moves, max_iters)
+            return state, moves
+        self.solver_results[key] = (state, moves, None)
+        if state == 'solved':
+            # the boards along the solution are solved too
+            key = list(key)
+            for n, (i, j) in enumerate(solver.moves):
+                key[i] = key[j] = None
+                self.solver_results[tuple(key)] = \
+                    (state, moves[n+1:], None)
+        return state, moves
+
 
 #  mahjongg util
 def comp_cardset(ncards):
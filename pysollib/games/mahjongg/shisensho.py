@@ -30,6 +30,7 @@ from pysollib.settings import TOOLKIT
 # PySol imports
 from pysollib.mygettext import _
 from pysollib.gamedb import registerGame, GameInfo, GI
+from pysollib.game import Game
 from pysollib.mfxutil import kwdefault
 from pysollib.layout import Layout
 from pysollib.hint import AbstractHint
@@ -55,24 +56,14 @@ class Shisen_Hint(AbstractHint):
 
     def computeHints(self):
         game = self.game
-        # get free stacks
-        stacks = []
-        for r in game.s.rows:
-            if r.cards:
-                stacks.append(r)
         # find matching tiles
-        i = 0
-        for r in stacks:
-            for t in stacks[i+1:]:
-                # if game.cardsMatch(r.cards[0], t.cards[0]):
-                if r.acceptsCards(t, t.cards):
-                    # simple scoring...
-                    if self.TOP_MATCHING:
-                        score = 2000 - r.rown - t.rown
-                    else:
-                        score = 1000 + r.rown + t.rown
-                    self.addHint(score, 1, r, t)
-            i += 1
+        for r, t in game.getMatchingPairs():
+            # simple scoring...
+            if self.TOP_MATCHING:
+                score = 2000 - r.rown - t.rown
+            else:
+                score = 1000 + r.rown + t.rown
+            self.addHint(score, 1, r, t)
 
 
 class NotShisen_Hint(Shisen_Hint):
@@ -109,121 +100,7 @@ class Shisen_RowStack(Mahjongg_RowStack):
     def acceptsCards(self, from_stack, cards):
         if not self.game.cardsMatch(self.cards[0], cards[-1]):
             return 0
-
-        cols, rows = self.game.L
-        game_cols = self.game.cols
-        x1, y1 = self.coln+1, self.rown+1
-        x2, y2 = from_stack.coln+1, from_stack.rown+1
-        dx, dy = x2 - x1, y2 - y1
-
-        a = []
-        for i in range(cols+2):
-            a.append([5]*(rows+2))
-
-        def can_move(x, y, nx, ny, direct, d, direct_chng_cnt):
-            if nx == x2 and ny == y2:
-                return 1
-            if nx < 0 or ny < 0 or nx > cols+1 or ny > rows+1:
-                return 0
-            if nx in (0, cols+1) or ny in (0, rows+1) \
-                    or not game_cols[nx-1][ny-1].cards:
-                if direct_chng_cnt == 0:
-                    return 1
-                elif direct_chng_cnt == 1:
-                    if direct != d:
-                        if d == 1 and dy > 0:
-                            return 1
-                        elif d == 2 and dy < 0:
-                            return 1
-                        elif d == 3 and dx > 0:
-                            return 1
-                        elif d == 4 and dx < 0:
-                            return 1
-                    else:
-                        return 1
-                elif direct_chng_cnt == 2:
-                    if direct != d:
-                        if d in (1, 2) and x == x2:
-                            return 1
-                        elif y == y2:
-                            return 1
-                    else:
-                        if d == 1 and y < y2:
-                            return 1
-                        elif d == 2 and y > y2:
-                            return 1
-                        elif d == 3 and x < x2:
-                            return 1
-                        elif d == 4 and x > x2:
-                            return 1
-                elif direct_chng_cnt == 3:
-                    if direct == d:
-                        return 1
-
-            return 0
-
-        res_path = [None]
-
-        def do_accepts(x, y, direct, direct_chng_cnt, path):
-            # if direct_chng_cnt > 3:
-            #    return
-            if a[x][y] < direct_chng_cnt:
-                return
-            # if res_path[0]:
-            #    return
-            a[x][y] = direct_chng_cnt
-            if x == x2 and y == y2:
-                res_path[0] = path
-                return
-
-            if can_move(x, y, x, y+1, direct, 1, direct_chng_cnt):  # 1
-                # dcc = direct == 1 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 1:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x, y+1, 1, dcc, p)
-            if can_move(x, y, x, y-1, direct, 2, direct_chng_cnt):  # 2
-                # dcc = direct == 2 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 2:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x, y-1, 2, dcc, p)
-            if can_move(x, y, x+1, y, direct, 3, direct_chng_cnt):  # 3
-                # dcc = direct == 3 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 3:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x+1, y, 3, dcc, p)
-            if can_move(x, y, x-1, y, direct, 4, direct_chng_cnt):  # 4
-                # dcc = direct == 4 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 4:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x-1, y, 4, dcc, p)
-
-        do_accepts(x1, y1, 0, 0, [])
-        # from pprint import pprint
-        # pprint(a)
-
-        if a[x2][y2] > 3:
-            return None
-
-        res_path = res_path[0]
-        res_path.append((x2, y2))
-        # print res_path
-        return res_path
+        return self.game.findPath(self, from_stack)
 
     def fillStack(self):
         self.game.fillStack(self)
@@ -384,6 +261,162 @@ class AbstractShisenGame(AbstractMahjonggGame):
         # Define stack groups
         l.defaultStackGroups()
 
+    #
+    # Two tiles can be removed if they can be connected by a line of at
+    # most three segments (two turns) crossing only empty cells; the line
+    # may run around the board. The cells are numbered from 1, the border
+    # is made of empty cells.
+    #
+
+    def _getRay(self, x, y, dx, dy):
+        # the last empty cell from (x, y) in the direction (dx, dy)
+        cols, rows = self.L
+        game_cols = self.cols
+        while True:
+            nx, ny = x+dx, y+dy
+            if 0 < nx <= cols and 0 < ny <= rows:
+                if game_cols[nx-1][ny-1].cards:
+                    return x, y
+            elif not (0 <= nx <= cols+1 and 0 <= ny <= rows+1):
+                return x, y
+            x, y = nx, ny
+
+    def _isClear(self, x1, y1, x2, y2):
+        # are the cells between (x1, y1) and (x2, y2) empty?
+        cols, rows = self.L
+        if x1 == x2:
+            if not 0 < x1 <= cols:
+                return True
+            col = self.cols[x1-1]
+            for y in range(max(min(y1, y2)+1, 1), min(max(y1, y2), rows+1)):
+                if col[y-1].cards:
+                    return False
+        else:
+            if not 0 < y1 <= rows:
+                return True
+            game_cols = self.cols
+            for x in range(max(min(x1, x2)+1, 1), min(max(x1, x2), cols+1)):
+                if game_cols[x-1][y1-1].cards:
+                    return False
+        return True
+
+    def findPath(self, stack1, stack2):
+        # returns the line from stack1 to stack2 (the start, the turns
+        # and the end) or None; the line with the fewest turns, then the
+        # shortest one
+        x1, y1 = stack1.coln+1, stack1.rown+1
+        x2, y2 = stack2.coln+1, stack2.rown+1
+        if (x1 == x2 or y1 == y2) and self._isClear(x1, y1, x2, y2):
+            return [(x1, y1), (x2, y2)]
+        best, path = None, None
+        # a vertical middle segment, from the row of stack1 to the row
+        # of stack2
+        ax0 = self._getRay(x1, y1, -1, 0)[0]
+        ax1 = self._getRay(x1, y1, 1, 0)[0]
+        bx0 = self._getRay(x2, y2, -1, 0)[0]
+        bx1 = self._getRay(x2, y2, 1, 0)[0]
+        for x in range(max(ax0, bx0), min(ax1, bx1)+1):
+            if self._isClear(x, y1, x, y2):
+                best, path = self._betterPath(
+                    best, path, [(x1, y1), (x, y1), (x, y2), (x2, y2)])
+        # a horizontal middle segment
+        ay0 = self._getRay(x1, y1, 0, -1)[1]
+        ay1 = self._getRay(x1, y1, 0, 1)[1]
+        by0 = self._getRay(x2, y2, 0, -1)[1]
+        by1 = self._getRay(x2, y2, 0, 1)[1]
+        for y in range(max(ay0, by0), min(ay1, by1)+1):
+            if self._isClear(x1, y, x2, y):
+                best, path = self._betterPath(
+                    best, path, [(x1, y1), (x1, y), (x2, y), (x2, y2)])
+        return path
+
+    def getMatchingPairs(self):
+        # all the pairs of tiles that can be removed, in the order of
+        # the rows; the same as acceptsCards() for each pair, but the
+        # board is scanned once and the tiles are grouped by kind
+        cols, rows = self.L
+        # occupied cells (with the border)
+        occupied = [[False] * (rows+2)]
+        for col in self.cols:
+            occupied.append([False] + [bool(r.cards) for r in col] + [False])
+        occupied.append([False] * (rows+2))
+        # number of occupied cells before each cell of a column / row
+        col_count = []
+        for x in range(cols+2):
+            c = [0]
+            for y in range(rows+2):
+                c.append(c[-1] + occupied[x][y])
+            col_count.append(c)
+        row_count = []
+        for y in range(rows+2):
+            c = [0]
+            for x in range(cols+2):
+                c.append(c[-1] + occupied[x][y])
+            row_count.append(c)
+
+        def ray(x, y, dx, dy):
+            while 0 <= x+dx <= cols+1 and 0 <= y+dy <= rows+1 and \
+                    not occupied[x+dx][y+dy]:
+                x, y = x+dx, y+dy
+            return x, y
+
+        # the tiles by kind, with their rays
+        kinds = {}
+        for r in self.s.rows:
+            if not r.cards:
+                continue
+            x, y = r.coln+1, r.rown+1
+            tile = (r, x, y,
+                    ray(x, y, -1, 0)[0], ray(x, y, 1, 0)[0],
+                    ray(x, y, 0, -1)[1], ray(x, y, 0, 1)[1])
+            kinds.setdefault(self.getTileKind(r.cards[0]), []).append(tile)
+
+        def col_clear(x, y1, y2):
+            y1, y2 = min(y1, y2), max(y1, y2)
+            return col_count[x][y2] == col_count[x][y1+1]
+
+        def row_clear(y, x1, x2):
+            x1, x2 = min(x1, x2), max(x1, x2)
+            return row_count[y][x2] == row_count[y][x1+1]
+
+        def connected(a, b):
+            r1, x1, y1, ax0, ax1, ay0, ay1 = a
+            r2, x2, y2, bx0, bx1, by0, by1 = b
+            if x1 == x2 and col_clear(x1, y1, y2):
+                return True
+            if y1 == y2 and row_clear(y1, x1, x2):
+                return True
+            for x in range(max(ax0, bx0), min(ax1, bx1)+1):
+                if col_clear(x, y1, y2):
+                    return True
+            for y in range(max(ay0, by0), min(ay1, by1)+1):
+                if row_clear(y, x1, x2):
+                    return True
+            return False
+
+        pairs = []
+        for tiles in kinds.values():
+            for i, a in enumerate(tiles):
+                for b in tiles[i+1:]:
+                    if connected(a, b):
+                        pairs.append((a[0], b[0]))
+        pairs.sort(key=lambda p: (p[0].id, p[1].id))
+        return pairs
+
+    def _betterPath(self, best, path, points):
+        # drop the empty segments
+        new_path = [points[0]]
+        for p in points[1:]:
+            if p != new_path[-1]:
+                new_path.append(p)
+        length = 0
+        for (xa, ya), (xb, yb) in zip(new_path, new_path[1:]):
+            length += abs(xb - xa) + abs(yb - ya)
+        score = (len(new_path), length)
+        if best is None or score < best:
+            return score, new_path
+        return best, path
+
     def fillStack(self, stack):
         if not self.GRAVITY:
             return
@@ -394,23 +427,17 @@ class AbstractShisenGame(AbstractMahjonggGame):
             self.moveMove(1, from_stack, to_stack, frames=0)
             to_stack = from_stack
 
+    def updateStuck(self):
+        # no solvability checker (see AbstractMahjonggGame)
+        Game.updateStuck(self)
+
     def updateText(self):
         if self.preview > 1 or self.texts.info is None:
             return
 
         if self.app.opt.shisen_show_matching:
             # find matching tiles
-            stacks = self.s.rows
-            f, i = 0, 0
-            for r in stacks:
-                i = i + 1
-                if not r.cards:
-                    continue
-                for t in stacks[i:]:
-                    if not t.cards:
-                        continue
-                    if r.acceptsCards(t, t.cards):
-                        f += 1
+            f = len(self.getMatchingPairs())
             if f == 0:
                 f = _('No Free\nMatching\nPairs')
             else:
@@ -486,22 +513,30 @@ class NotShisen_RowStack(Shisen_RowStack):
                 (from_stack.coln+1, from_stack.rown+1)]
 
 
-class NotShisen_14x6(AbstractShisenGame):
+class AbstractNotShisenGame(AbstractShisenGame):
     Hint_Class = NotShisen_Hint
     RowStack_Class = NotShisen_RowStack
+
+    def getMatchingPairs(self):
+        stacks = [r for r in self.s.rows if r.cards]
+        pairs = []
+        for i, r in enumerate(stacks):
+            for t in stacks[i+1:]:
+                if r.acceptsCards(t, t.cards):
+                    pairs.append((r, t))
+        return pairs
+
+
+class NotShisen_14x6(AbstractNotShisenGame):
     L = (14, 6)
     NCARDS = 84
 
 
-class NotShisen_18x8(AbstractShisenGame):
-    Hint_Class = NotShisen_Hint
-    RowStack_Class = NotShisen_RowStack
+class NotShisen_18x8(AbstractNotShisenGame):
     L = (18, 8)
 
 
-class NotShisen_24x12(AbstractShisenGame):
-    Hint_Class = NotShisen_Hint
-    RowStack_Class = NotShisen_RowStack
+class NotShisen_24x12(AbstractNotShisenGame):
     L = (24, 12)
     NCARDS = 288
 
@@ -28,6 +28,7 @@ from pysollib.gamedb import registerGame, GameInfo, GI
 from pysollib.game import Game
 from pysollib.layout import Layout
 from pysollib.hint import DefaultHint
+from pysollib.solvers.montana import MontanaSolver
 
 from pysollib.util import ACE, NO_SUIT
 
@@ -47,9 +48,23 @@ from pysollib.stack import \
 
 
 class Montana_Hint(DefaultHint):
+    # the first move of the best line (see getSolverResult) comes first
+    SOLUTION_SCORE = 100000
+    LOOKAHEAD = False
+    PRECOMPUTE = False
+
     def computeHints(self):
         game = self.game
         RSTEP, RBASE = game.RSTEP, game.RBASE
+        solution = None
+        if game.SOLVER_MAX_ITERS:
+            state, moves = game.getSolverResult()
+            if moves:
+                solution = moves[0]
+                self.addHint(self.SOLUTION_SCORE, 1, *solution)
+            elif self.level >= 2 and game.canDealCards():
+                # nothing more to gain in this round
+                return
         freerows = [s for s in game.s.rows if not s.cards]
         # for each stack
         for r in game.s.rows:
@@ -66,6 +81,8 @@ class Montana_Hint(DefaultHint):
                     # rank is correct
                     continue
             for t in freerows:
+                if (r, t) == solution:
+                    continue
                 if self.shallMovePile(r, t, pile, rpile):
                     # FIXME: this scoring is completely simple
                     if left and left.cards:
@@ -171,6 +188,10 @@ class Montana(Game):
 
     RLEN, RSTEP, RBASE = 52, 13, 1
 
+    SOLVER_MAX_ITERS = 5000         # 0: no solver for these rules
+    SOLVER_RIGHT = False            # see Galary_RowStack
+    SOLVER_CACHE_SIZE = 1000
+
     def createGame(self, round_text=True):
         decks = self.gameinfo.decks
 
@@ -202,6 +223,7 @@ class Montana(Game):
         if self.RBASE:
             # create an invisible stack to hold the four Aces
             s.internals.append(InvisibleStack(self))
+        self.solver_results = {}                    # see getSolverResult()
 
         # define stack-groups
         l.defaultStackGroups()
@@ -251,6 +273,39 @@ class Montana(Game):
                 return -1
         return 1
 
+    def getSolverRank(self, card):
+        # the position of the card in its row
+        return card.rank - self.RBASE
+
+    def _getSolverKey(self):
+        return tuple([r.cards[-1].id if r.cards else None
+                      for r in self.s.rows])
+
+    def getSolverResult(self):
+        # The best line of moves for this round. Returns 'solved' if it
+        # wins the game, else 'intractable', and the (from, to) row
+        # stacks of the moves.
+        key = self._getSolverKey()
+        result = self.solver_results.get(key)
+        if result is not None:
+            return result
+        rows = self.s.rows
+        cards = [(r.cards[-1].suit, self.getSolverRank(r.cards[-1]))
+                 if r.cards else None for r in rows]
+        solver = MontanaSolver(cards, self.RSTEP, right=self.SOLVER_RIGHT,
+                               max_iters=self.SOLVER_MAX_ITERS)
+        state = solver.solve()
+        if len(self.solver_results) > self.SOLVER_CACHE_SIZE:
+            self.solver_results.clear()
+        moves = [(rows[i], rows[j]) for i, j in solver.moves]
+        self.solver_results[key] = (state, moves)
+        # the rest of the line is the best line of the next positions
+        key = list(key)
+        for n, (i, j) in enumerate(solver.moves):
+            key[i], key[j] = None, key[i]
+            self.solver_results[tuple(key)] = (state, moves[n+1:])
+        return state, moves
+
 
 # ************************************************************************
 # * Spaces
@@ -360,6 +415,7 @@ class Galary_RowStack(Montana_RowStack):
 class Galary(RedMoon):
     RowStack_Class = Galary_RowStack
     Hint_Class = Galary_Hint
+    SOLVER_RIGHT = True
 
 
 # ************************************************************************
@@ -369,6 +425,7 @@ class Galary(RedMoon):
 class Moonlight(Montana):
     RowStack_Class = Galary_RowStack
     Hint_Class = Galary_Hint
+    SOLVER_RIGHT = True
 
 
 # ************************************************************************
@@ -389,6 +446,7 @@ class Jungle(BlueMoon):
     Talon_Class = StackWrapper(Montana_Talon, max_rounds=2)
     RowStack_Class = Jungle_RowStack
     Hint_Class = Galary_Hint
+    SOLVER_MAX_ITERS = 0
 
 
 # ************************************************************************
@@ -410,6 +468,7 @@ class SpacesAndAces(BlueMoon):
     Hint_Class = Galary_Hint
     Talon_Class = InitialDealTalonStack
     RowStack_Class = SpacesAndAces_RowStack
+    SOLVER_MAX_ITERS = 0
 
     def createGame(self):
         Montana.createGame(self, round_text=False)
@@ -459,6 +518,12 @@ class Paganini(BlueMoon):
     Talon_Class = StackWrapper(Paganini_Talon, max_rounds=2)
     RowStack_Class = Paganini_RowStack
 
+    def getSolverRank(self, card):
+        # the Five follows the Ace
+        if card.rank >= 5:
+            return card.rank - 4
+        return card.rank
+
     def isGameWon(self):
         rows = self.s.rows
         for i in range(0, self.RLEN, self.RSTEP):
@@ -29,6 +29,7 @@ from pysollib.game import Game
 from pysollib.layout import Layout
 from pysollib.hint import DefaultHint
 from pysollib.pysoltk import MfxCanvasText
+from pysollib.solvers.pyramid import FOUNDATION, PyramidSolver, TALON, WASTE
 
 from pysollib.util import ANY_RANK, ANY_SUIT, JACK, KING, NO_RANK, QUEEN, \
         UNLIMITED_CARDS, UNLIMITED_REDEALS
@@ -55,6 +56,31 @@ from pysollib.stack import \
 # ************************************************************************
 
 class Pyramid_Hint(DefaultHint):
+    # the first move of a solution (see getSolverResult) comes first
+    SOLUTION_SCORE = 100000
+    LOOKAHEAD = False
+    PRECOMPUTE = False
+
+    solution = None                 # (ncards, from, to) of this move
+
+    def computeHints(self):
+        game = self.game
+        self.solution = None
+        result = game.getSolverResult()
+        if result is not None and result[0] == 'solved' and result[1]:
+            r, t = result[1][0]
+            solution = (int(t is not None), r, t)
+            self.addHint(self.SOLUTION_SCORE, *solution)
+            self.solution = solution
+        DefaultHint.computeHints(self)
+
+    def addHint(self, score, ncards, from_stack, to_stack, *args, **kw):
+        if (ncards, from_stack, to_stack) == self.solution:
+            # already there
+            return
+        DefaultHint.addHint(self, score, ncards, from_stack, to_stack,
+                            *args, **kw)
+
     # consider moving card to the Talon as well
     def step010(self, dropstacks, rows):
         rows = rows + (self.game.s.talon,)
@@ -189,6 +215,13 @@ class Pyramid(Game):
 
     PYRAMID_Y_FACTOR = 2
 
+    SOLVER_MAX_ITERS = 10000        # 0: no solver for these rules
+    SOLVER_STUCK_ITERS = 500        # for the check after each move
+    SOLVER_CACHE_SIZE = 1000
+    SOLVER_CLEAR_STOCK = True       # the talon must be removed too
+
+    pyramid_solver = None           # see _getSolver()
+
     #
     # game layout
     #
@@ -299,12 +332,109 @@ class Pyramid(Game):
     def shallHighlightMatch(self, stack1, card1, stack2, card2):
         return card1.rank + card2.rank == 11
 
+    def updateStuck(self):
+        Game.updateStuck(self)
+        if self.finished or self.Stuck_Class is None:
+            return
+        # this runs after every move, so the search is short (the hints
+        # search longer)
+        result = self.getSolverResult(self.SOLVER_STUCK_ITERS)
+        if result is not None and result[0] == 'unsolved':
+            # the deal can not be won any more
+            self.updateStatus(stuck='x')
+
+    #
+    # Pyramid special: solve the pyramid and the talon (see
+    # pysollib.solvers.pyramid)
+    #
+
+    def _getSolver(self):
+        # the solver and its lost states are kept for the whole deal;
+        # the stock is the waste from the bottom and the talon from the top
+        s = self.s
+        stock = s.waste.cards + s.talon.cards[::-1]
+        solver = self.pyramid_solver
+        if solver is not None:
+            # is this the same deal?
+            index = self.solver_index
+            n = -1
+            for c in stock:
+                if index.get(c.id, -1) <= n:
+                    solver = None
+                    break
+                n = index[c.id]
+            rows = self.solver_rows
+            for r in s.rows:
+                if r.cards and r.cards[-1].id != rows[r.id]:
+                    solver = None
+        if solver is None:
+            ranks = [r.cards[-1].rank if r.cards else None for r in s.rows]
+            solver = PyramidSolver(
+                ranks, [[b.id for b in r.blockmap] for r in s.rows],
+                [c.rank for c in stock],
+                clear_stock=self.SOLVER_CLEAR_STOCK,
+                max_iters=self.SOLVER_MAX_ITERS)
+            self.pyramid_solver = solver
+            self.solver_index = dict([(c.id, i) for i, c in enumerate(stock)])
+            self.solver_rows = [r.cards[-1].id if r.cards else None
+                                for r in s.rows]
+            self.solver_results = {}
+        return solver
+
+    def getSolverResult(self, max_iters=None):
+        # Can the game still be won? Returns 'solved', 'unsolved' or
+        # 'intractable' and the (from, to) stacks of a solution (to is None
+        # for a deal), or None if the solver does not know the rules.
+        s = self.s
+        if not self.SOLVER_MAX_ITERS or not s.waste or \
+                not isinstance(s.talon, Pyramid_Talon):
+            return None
+        if max_iters is None:
+            max_iters = self.SOLVER_MAX_ITERS
+        solver = self._getSolver()
+        index = self.solver_index
+        stock = [index[c.id] for c in s.waste.cards + s.talon.cards]
+        cursor = 0
+        if s.waste.cards:
+            cursor = index[s.waste.cards[-1].id] + 1
+        state = solver.getState(
+            [r.id for r in s.rows if r.cards], stock, cursor,
+            s.talon.max_rounds - s.talon.round)
+        result = self.solver_results.get(state)
+        if result is not None:
+            # (ret, moves, the budget of an intractable search)
+            if result[2] is None or result[2] >= max_iters:
+                return result[:2]
+        ret = solver.solve(state, max_iters)
+        stacks = {FOUNDATION: s.foundations[0], WASTE: s.waste,
+                  TALON: s.talon}
+        moves = []
+        for i, j in solver.moves:
+            if (i, j) == (TALON, WASTE):
+                # a deal
+                moves.append((s.talon, None))
+            else:
+                moves.append((stacks[i] if i < 0 else s.rows[i],
+                              stacks[j] if j < 0 else s.rows[j]))
+        if len(self.solver_results) > self.SOLVER_CACHE_SIZE:
+            self.solver_results.clear()
+        if ret == 'intractable':
+            self.solver_results[state] = (ret, moves, max_iters)
+            return ret, moves
+        self.solver_results[state] = (ret, moves, None)
+        # the states along the solution are solved too
+        for n, state in enumerate(solver.path):
+            self.solver_results[state] = (ret, moves[n:], None)
+        return ret, moves
+
 
 # ************************************************************************
 # * Relaxed Pyramid
 # ************************************************************************
 
 class RelaxedPyramid(Pyramid):
+    SOLVER_CLEAR_STOCK = False
+
     # the pyramid must be empty
     def isGameWon(self):
         return getNumberOfFreeStacks(self.s.rows) == len(self.s.rows)
@@ -959,6 +1089,7 @@ class Cheops_RowStack(Cheops_StackMethods, Pyramid_RowStack):
 
 
 class Cheops(Pyramid):
+    SOLVER_MAX_ITERS = 0
 
     Foundation_Class = StackWrapper(AbstractFoundationStack, max_accept=0)
     Talon_Class = StackWrapper(Cheops_Talon, max_rounds=1, max_accept=1)
@@ -28,6 +28,7 @@ from pysollib.gamedb import registerGame, GameInfo, GI
 from pysollib.game import Game
 from pysollib.layout import Layout
 from pysollib.hint import CautiousDefaultHint
+from pysollib.solvers.hanoi import getHanoiMoves, searchHanoiMoves
 
 from pysollib.stack import \
         InitialDealTalonStack, \
@@ -40,8 +41,16 @@ from pysollib.stack import \
 
 
 class TowerOfHanoy_Hint(CautiousDefaultHint):
-    # FIXME: demo is completely clueless
-    pass
+    LOOKAHEAD = False
+
+    def computeHints(self):
+        move = self.game.getSolverMove()
+        if move is None:
+            # the disks are not in order
+            CautiousDefaultHint.computeHints(self)
+            return
+        r, t = move
+        self.addHint(self.SCORE_FLIP, 1, r, t)
 
 
 class TowerOfHanoy_RowStack(BasicRowStack):
@@ -60,6 +69,8 @@ class TowerOfHanoy(Game):
     RowStack_Class = TowerOfHanoy_RowStack
     Hint_Class = TowerOfHanoy_Hint
 
+    SOLVER_MAX_STATES = 100000
+
     #
     # game layout
     #
@@ -80,6 +91,9 @@ class TowerOfHanoy(Game):
                 self.RowStack_Class(x, y, self, max_accept=1, max_move=1))
         s.talon = InitialDealTalonStack(l.XM, self.height-l.YS, self)
 
+        # game extras
+        self.solver_moves = {}                      # see getSolverMove()
+
         # define stack-groups
         l.defaultStackGroups()
 
@@ -104,6 +118,45 @@ class TowerOfHanoy(Game):
     def getAutoStacks(self, event=None):
         return ((), (), self.sg.dropstacks)
 
+    #
+    # TowerOfHanoy special: a shortest solution (see pysollib.solvers.hanoi)
+    #
+
+    def getSolverTargets(self):
+        return range(len(self.s.rows))
+
+    def isSolverWon(self, pegs):
+        # isGameWon() for the ranks on the row stacks
+        for p in pegs:
+            if len(p) == len(self.cards):
+                return 1
+        return 0
+
+    def getSolverMove(self):
+        # returns the from and to row stacks of the next move, or None
+        key = tuple([tuple([c.rank for c in r.cards]) for r in self.s.rows])
+        if key not in self.solver_moves:
+            best = None
+            for t in self.getSolverTargets():
+                moves = getHanoiMoves(key, t)
+                if moves is not None and \
+                        (best is None or len(moves) < len(best)):
+                    best = moves
+            if best is None:
+                # a larger disk lies on a smaller one
+                best = searchHanoiMoves(key, self.isSolverWon,
+                                        max_states=self.SOLVER_MAX_STATES)
+            # remember the move for each position along the solution
+            self.solver_moves = {key: None}
+            pegs = [list(p) for p in key]
+            for i, j in best or []:
+                self.solver_moves[tuple(map(tuple, pegs))] = (i, j)
+                pegs[j].append(pegs[i].pop())
+        move = self.solver_moves[key]
+        if move is None:
+            return None
+        return self.s.rows[move[0]], self.s.rows[move[1]]
+
 
 # ************************************************************************
 # * Hanoi Puzzle
@@ -131,6 +184,12 @@ class HanoiPuzzle4(TowerOfHanoy):
     def isGameWon(self):
         return len(self.s.rows[-1].cards) == len(self.cards)
 
+    def getSolverTargets(self):
+        return [len(self.s.rows) - 1]
+
+    def isSolverWon(self, pegs):
+        return len(pegs[-1]) == len(self.cards)
+
 
 class HanoiPuzzle5(HanoiPuzzle4):
     pass
@@ -151,6 +210,13 @@ class HanoiSequence(TowerOfHanoy):
                 return 1
         return 0
 
+    def isSolverWon(self, pegs):
+        n = len(self.cards)
+        for p in pegs:
+            if len(p) == n and list(p) == list(range(n-1, -1, -1)):
+                return 1
+        return 0
+
 
 # register the game
 registerGame(GameInfo(124, TowerOfHanoy, "Tower of Hanoy",
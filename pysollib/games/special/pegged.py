@@ -28,6 +28,7 @@ from pysollib.gamedb import registerGame, GameInfo, GI
 from pysollib.game import Game
 from pysollib.layout import Layout
 from pysollib.hint import AbstractHint
+from pysollib.solvers.pegged import PeggedSolver
 
 from pysollib.util import ANY_SUIT
 
@@ -43,9 +44,17 @@ from pysollib.stack import \
 
 
 class Pegged_Hint(AbstractHint):
-    # FIXME: no intelligence whatsoever is implemented here
+    # the first move of a solution (see getSolverResult) comes first
+    SOLUTION_SCORE = 100000
+    LOOKAHEAD = False
+    PRECOMPUTE = False
+
     def computeHints(self):
         game = self.game
+        solution = None
+        state, moves = game.getSolverResult()
+        if state == 'solved' and moves:
+            solution = moves[0]
         # get free stacks
         stacks = [r for r in game.s.rows if not r.cards]
         #
@@ -56,6 +65,8 @@ class Pegged_Hint(AbstractHint):
                     continue
                 # braindead scoring...
                 score = 10000 + game.app.miscrandom.randint(0, 9999)
+                if solution == (r, t):
+                    score += self.SOLUTION_SCORE
                 self.addHint(score, 1, r, t)
 
 
@@ -109,6 +120,9 @@ class Pegged(Game):
     ROWS = (3, 5, 7, 7, 7, 5, 3)
     EMPTY_STACK_ID = -1
 
+    SOLVER_MAX_ITERS = 10000
+    SOLVER_CACHE_SIZE = 1000
+
     #
     # game layout
     #
@@ -125,6 +139,8 @@ class Pegged(Game):
 
         # game extras 1)
         self.map = {}
+        self.solver_results = {}                    # see getSolverResult()
+        self.solvers = {}
 
         # create stacks
         for i in range(len(self.ROWS)):
@@ -213,6 +229,51 @@ class Pegged(Game):
                         rows.append(r)
         return ((rows, 1),)
 
+    def _getSolverKey(self):
+        key = 0
+        for r in self.s.rows:
+            if r.cards:
+                key |= 1 << r.id
+        return key
+
+    def _getSolver(self, target):
+        # the solvers keep their lost boards
+        solver = self.solvers.get(target)
+        if solver is None:
+            solver = PeggedSolver([r.pos for r in self.s.rows], self.STEPS,
+                                  target=target,
+                                  max_iters=self.SOLVER_MAX_ITERS)
+            self.solvers[target] = solver
+        return solver
+
+    def getSolverResult(self):
+        # Can the game still be won? Returns 'solved', 'unsolved' or
+        # 'intractable' and the (from, to) row stacks of a solution:
+        # a perfect game if there is one, else any game with one peg left.
+        key = self._getSolverKey()
+        result = self.solver_results.get(key)
+        if result is not None:
+            return result
+        rows = self.s.rows
+        board = [r.id for r in rows if r.cards]
+        solver = self._getSolver(self.EMPTY_STACK_ID)
+        state = solver.solve(board)
+        if state == 'unsolved':
+            solver = self._getSolver(None)
+            state = solver.solve(board)
+        if len(self.solver_results) > self.SOLVER_CACHE_SIZE:
+            self.solver_results.clear()
+        moves = [(rows[i], rows[j]) for i, j in solver.moves]
+        self.solver_results[key] = (state, moves)
+        if state == 'solved':
+            # the boards along the solution are solved too
+            for n, (r, t) in enumerate(moves):
+                m = self.map[((r.pos[0] + t.pos[0])//2,
+                              (r.pos[1] + t.pos[1])//2)]
+                key ^= (1 << r.id) | (1 << m.id) | (1 << t.id)
+                self.solver_results[key] = (state, moves[n+1:])
+        return state, moves
+
 
 class PeggedCross1(Pegged):
     ROWS = (3, 3, 7, 7, 7, 3, 3)
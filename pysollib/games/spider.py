@@ -33,6 +33,7 @@ from pysollib.layout import Layout
 from pysollib.hint import CautiousDefaultHint
 from pysollib.hint import SpiderType_Hint, YukonType_Hint
 from pysollib.hint import FreeCellSolverWrapper
+from pysollib.solvers.spider import FOUNDATION, SpiderSolver, TALON
 
 from pysollib.util import ACE, ANY_RANK, ANY_SUIT, KING, \
         UNLIMITED_ACCEPTS, UNLIMITED_CARDS, UNLIMITED_MOVES
@@ -71,9 +72,41 @@ from pysollib.stack import \
 # ************************************************************************
 
 class Spider_Hint(SpiderType_Hint):
-    # FIXME: demo is not too clever in this game
-
     BONUS_SAME_SUIT_MOVE = 400
+    # the first move of the planned line (see getSolverResult) comes first
+    SOLUTION_SCORE = 100000
+    LOOKAHEAD = False
+    PRECOMPUTE = False
+
+    solution = None                 # (ncards, from, to) of this move
+
+    def computeHints(self):
+        game = self.game
+        self.solution = None
+        result = None
+        if isinstance(game, RelaxedSpider) and not self.any_move:
+            # (hasAnyMove() does not need the search)
+            result = game.getSolverResult()
+        if result is not None and result[1]:
+            ncards, r, t = result[1][0]
+            if ncards == 0:
+                if game.canDealCards():
+                    self.addHint(self.SOLUTION_SCORE, 0, r, None)
+                    self.solution = (0, r, None)
+            else:
+                if t is None:
+                    t, ncards = r.canDropCards(game.s.foundations)
+                if t is not None:
+                    self.addHint(self.SOLUTION_SCORE, ncards, r, t)
+                    self.solution = (ncards, r, t)
+        SpiderType_Hint.computeHints(self)
+
+    def addHint(self, score, ncards, from_stack, to_stack, *args, **kw):
+        if (ncards, from_stack, to_stack) == self.solution:
+            # already there
+            return
+        SpiderType_Hint.addHint(self, score, ncards, from_stack, to_stack,
+                                *args, **kw)
 
     def _preferHighRankMoves(self):
         return 1
@@ -135,6 +168,13 @@ class RelaxedSpider(Game):
     RowStack_Class = Spider_RowStack
     Hint_Class = Spider_Hint
 
+    SOLVER_MAX_STATES = 5000        # 0: no search for these rules
+    SOLVER_TIME_LIMIT = 0.5         # seconds
+    SOLVER_CACHE_SIZE = 1000
+    SOLVER_DEAL_EMPTY = True        # cards may be dealt on empty rows
+
+    solver_results = None           # see getSolverResult()
+
     def createGame(self, **layout):
         # create layout
         l, s = Layout(self), self.s
@@ -166,12 +206,62 @@ class RelaxedSpider(Game):
     shallHighlightMatch = Game._shallHighlightMatch_RK
     getQuickPlayScore = Game._getSpiderQuickPlayScore
 
+    #
+    # Spider special: plan the next moves (see pysollib.solvers.spider)
+    #
+
+    def getSolverResult(self):
+        # Returns 'solved' or 'intractable' and the (ncards, from, to)
+        # moves of the best line found (to is None for a suit going to
+        # the foundations, (0, talon, None) is a deal), or None if the
+        # search does not know the rules.
+        s = self.s
+        if not self.SOLVER_MAX_STATES or s.waste or s.reserves or \
+                type(s.talon) not in (DealRowTalonStack,
+                                      InitialDealTalonStack):
+            return None
+        for r in s.rows:
+            if not isinstance(r, Spider_RowStack):
+                return None
+        rows = [[(c.suit, c.rank) if c.face_up else None for c in r.cards]
+                for r in s.rows]
+        solver = SpiderSolver(
+            rows, len(s.talon.cards),
+            same_suit=not isinstance(s.rows[0], BlackWidow_RowStack),
+            deal_empty=self.SOLVER_DEAL_EMPTY,
+            max_states=self.SOLVER_MAX_STATES,
+            time_limit=self.SOLVER_TIME_LIMIT)
+        # the moves only depend on the face-up cards, so the lines found
+        # are kept for the whole game
+        if self.solver_results is None or \
+                len(self.solver_results) > self.SOLVER_CACHE_SIZE:
+            self.solver_results = {}
+        result = self.solver_results.get(solver.getKey())
+        if result is not None:
+            return result
+        ret = solver.solve()
+        moves = []
+        for n, i, j in solver.moves:
+            if i == TALON:
+                moves.append((0, s.talon, None))
+            elif j == FOUNDATION:
+                moves.append((n, s.rows[i], None))
+            else:
+                moves.append((n, s.rows[i], s.rows[j]))
+        self.solver_results[solver.getKey()] = (ret, moves)
+        # the positions along the line
+        for n, key in enumerate(solver.path):
+            self.solver_results[key] = (ret, moves[n:])
+        return ret, moves
+
 
 # ************************************************************************
 # * Spider
 # ************************************************************************
 
 class Spider(RelaxedSpider):
+    SOLVER_DEAL_EMPTY = False
+
     def canDealCards(self):
         if not RelaxedSpider.canDealCards(self):
             return False
@@ -295,6 +385,7 @@ class SimpleSimon(Spider):
     Talon_Class = InitialDealTalonStack
     RowStack_Class = SuperMoveSpider_RowStack
     Solver_Class = FreeCellSolverWrapper(preset='simple_simon', base_rank=0)
+    SOLVER_MAX_STATES = 0           # the free rows limit the moves
 
     def createGame(self):
         Spider.createGame(self, rows=10, texts=0)
@@ -973,6 +1064,7 @@ class ChineseSpider(Spider):
 class York(RelaxedSpider):
 
     Talon_Class = InitialDealTalonStack
+    SOLVER_MAX_STATES = 0           # the ranks wrap around
     Foundation_Class = StackWrapper(
         Spider_SS_Foundation, base_rank=ANY_RANK, mod=13)
     RowStack_Class = StackWrapper(Spider_RowStack, mod=13)
@@ -1140,6 +1232,7 @@ class Tarantula_RowStack(Spider_RowStack):
 
 class Tarantula(Spider):
     RowStack_Class = Tarantula_RowStack
+    SOLVER_MAX_STATES = 0           # the runs are of one color
 
     def getQuickPlayScore(self, ncards, from_stack, to_stack):
         if to_stack.cards:
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# Copyright (C) 1998-2003 Markus Franz Xaver Johannes Oberhumer
+# Copyright (C) 2003 Mt. Hood Playing Card Co.
+# Copyright (C) 2005-2009 Skomoroh
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# ************************************************************************
+# * Null view for running the game engine without a display.
+# *
+# * Usage (the games must be registered first, e.g. by importing
+# * pysollib.games):
+# *
+# *   app = HeadlessApp()
+# *   game = app.constructGame(id)
+# *   game.createHeadless(app)
+# *   game.newGame(random=constructRandom('123'))
+# *
+# * or in one call:
+# *
+# *   game = HeadlessApp().newGame(id, '123')
+# *
+# * Cards and stacks keep their full model (cards, face_up, caps,
+# * move history, undo/redo, hints); all canvas operations are no-ops.
+# ************************************************************************
+
+from pysollib.acard import AbstractCard
+from pysollib.gamedb import GAME_DB
+from pysollib.mfxutil import Struct
+from pysollib.options import Options
+from pysollib.pysolrandom import PysolRandom, constructRandom
+from pysollib.resource import CSI
+
+
+# ************************************************************************
+# * Canvas items
+# ************************************************************************
+
+class NullCanvasItem:
+    def __init__(self, canvas=None, *args, **kw):
+        pass
+
+    def addtag(self, tag):
+        pass
+
+    def dtag(self, tag):
+        pass
+
+    def tkraise(self, aboveThis=None):
+        pass
+
+    def lower(self, belowThis=None):
+        pass
+
+    def move(self, x, y):
+        pass
+
+    def moveTo(self, x, y):
+        pass
+
+    def config(self, **kw):
+        pass
+
+    def show(self):
+        pass
+
+    def hide(self):
+        pass
+
+    def delete(self):
+        pass
+
+
+class NullCanvas:
+    def __init__(self):
+        # skip the creation of texts (see Layout.createText & co.)
+        self.preview = 2
+        self.busy = False
+        self.xmargin, self.ymargin = 0, 0
+        self.items = {}
+        self._text_items = []
+        self._text_color = '#000000'
+        self._item_id = 0
+
+    def _create(self, *args, **kw):
+        self._item_id += 1
+        return self._item_id
+
+    def coords(self, *args):
+        return [0, 0]
+
+    def winfo_ismapped(self):
+        return False
+
+    def winfo_width(self):
+        return 0
+
+    def winfo_height(self):
+        return 0
+
+    def findCard(self, stack, event):
+        return -1
+
+    def __getattr__(self, name):
+        # all other canvas methods are no-ops
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self._noop
+
+    def _noop(self, *args, **kw):
+        return None
+
+
+# ************************************************************************
+# * Cards
+# ************************************************************************
+
+class NullCard(AbstractCard):
+    def __init__(self, id, deck, suit, rank, game, x=0, y=0):
+        AbstractCard.__init__(self, id, deck, suit, rank, game, x=x, y=y)
+        self.item = NullCanvasItem()
+
+    def showFace(self, unhide=1):
+        self.face_up = 1
+
+    def showBack(self, unhide=1):
+        self.face_up = 0
+
+    def updateCardBackground(self, image):
+        pass
+
+    def moveTo(self, x, y):
+        self.x = int(round(x))
+        self.y = int(round(y))
+
+    def moveBy(self, dx, dy):
+        self.x = self.x + int(round(dx))
+        self.y = self.y + int(round(dy))
+
+
+# ************************************************************************
+# * Images
+# ************************************************************************
+
+class NullImages:
+    def __init__(self, cs):
+        self.cs = cs
+        self.CARDW, self.CARDH = cs.CARDW, cs.CARDH
+        self.CARD_XOFFSET = cs.CARD_XOFFSET
+        self.CARD_YOFFSET = cs.CARD_YOFFSET
+        self.SHADOW_XOFFSET = cs.SHADOW_XOFFSET
+        self.SHADOW_YOFFSET = cs.SHADOW_YOFFSET
+        self.CARD_DX, self.CARD_DY = cs.CARD_DX, cs.CARD_DY
+        self._xfactor = 1.0
+        self._yfactor = 1.0
+        self.redeal = [None, None]
+        self.redeal_img = None
+        self.bottom = None
+
+    def getSize(self):
+        return (self.CARDW, self.CARDH)
+
+    def getOffsets(self):
+        return (self.CARD_XOFFSET, self.CARD_YOFFSET)
+
+    def getDelta(self):
+        return (self.CARD_DX, self.CARD_DY)
+
+    def resize(self, xf, yf):
+        pass
+
+    def __getattr__(self, name):
+        # getFace, getBack, getTalonBottom, getLetter...
+        if name.startswith('get'):
+            return self._getNone
+        raise AttributeError(name)
+
+    def _getNone(self, *args, **kw):
+        return None
+
+
+# ************************************************************************
+# * Application
+# ************************************************************************
+
+class HeadlessApp:
+    def __init__(self):
+        from pysollib.app import Statistics
+        self.gdb = GAME_DB
+        self.opt = Options()
+        self.opt.player = 'headless'
+        self.opt.animations = 0
+        self.opt.flip_animation = False
+        self.opt.redeal_animation = False
+        self.opt.win_animation = False
+        self.opt.randomize_place = False
+        self.opt.sound = False
+        self.stats = Statistics()
+        # visual components
+        self.top = None
+        self.top_cursor = None
+        self.menubar = None
+        self.toolbar = None
+        self.statusbar = None
+        self.helpbar = None
+        self.audio = None
+        self.canvas = NullCanvas()
+        self.cardset = Struct(
+            version=1,
+            ranks=(),
+            suits=(),
+            CARDW=71, CARDH=96,
+            CARD_XOFFSET=16, CARD_YOFFSET=16,
+            SHADOW_XOFFSET=0, SHADOW_YOFFSET=0,
+            CARD_DX=0, CARD_DY=0,
+            si=Struct(size=CSI.SIZE_MEDIUM),
+        )
+        self.images = NullImages(self.cardset)
+        self.gimages = Struct(
+            demo=[],
+            pause=[],
+            logos=[],
+            redeal=[None, None],
+        )
+        self.intro = Struct(
+            progress=None,
+        )
+        # random generators
+        self.gamerandom = PysolRandom()
+        self.miscrandom = PysolRandom()
+        self.nextgame = Struct(
+            id=0,
+            random=None,
+            loadedgame=None,
+            startdemo=0,
+            cardset=None,
+            holdgame=0,
+            bookmark=None,
+        )
+        self.demo_counter = 0
+        self.game = None
+
+    def getFont(self, name):
+        return ('helvetica', 12)
+
+    def constructGame(self, id):
+        gi = self.gdb.get(id)
+        if gi is None:
+            raise Exception("Unknown game (id %d)" % id)
+        return gi.gameclass(gi)
+
+    def newGame(self, id, seed=None):
+        # construct and start a game; seed is a game number as in
+        # constructRandom() (None: a random deal)
+        game = self.constructGame(id)
+        game.createHeadless(self)
+        random = None
+        if seed is not None:
+            random = constructRandom(seed)
+        game.newGame(random=random)
+        return game
@@ -25,19 +25,27 @@
 # imports
 import os
 import time
-import subprocess
 import re
 import sys
+import signal
 from io import BytesIO
 
 # PySol imports
 from pysollib.settings import DEBUG, FCS_COMMAND
-from pysollib.mfxutil import destruct
 from pysollib.util import KING
+from pysollib.solverpool import solver_pool
+from pysollib.solvercache import solver_cache
+from pysollib.solvers.blackhole import BlackHoleSolver, TALON
+from pysollib.solvers.freecell import FreeCellSolver, \
+    FreeCellSolverUnsupported
+from pysollib.solvers.klondike import KlondikeSolver
 
 if sys.version_info > (3,):
     unicode = str
 
+# upper bound for the (soft) max_iters of the solvers
+SOLVER_MAX_ITERS = 10000000
+
 # ************************************************************************
 # * HintInterface is an abstract class that defines the public
 # * interface - it only consists of the constructor
@@ -51,6 +59,16 @@ class HintInterface:
     # level == 0: show hint (key `H')
     # level == 1: show hint and display score value (key `Ctrl-H')
     # level == 2: demo
+    # level == 3: demo using the solver (see Game.getHints)
+    # level == 4: demo with lookahead (see LookaheadHint)
+
+    # False if the hints already come from a search (the demo plays
+    # them at level 2 then)
+    LOOKAHEAD = True
+    # False if the hints may take long to compute: they are not
+    # precomputed after each move (see Game.startHintsTimer)
+    PRECOMPUTE = True
+
     def __init__(self, game, level):
         pass
 
@@ -81,6 +99,10 @@ class HintInterface:
 # * Subclasses should override computeHints()
 # ************************************************************************
 
+class HintFound(Exception):
+    pass
+
+
 class AbstractHint(HintInterface):
     def __init__(self, game, level):
         self.game = game
@@ -90,6 +112,7 @@ class AbstractHint(HintInterface):
             self.score_flatten_value = 10000
         # temporaries within getHints()
         self.bonus_color = None
+        self.any_move = False           # see hasAnyMove()
         #
         self.__clones = []
         self.reset()
@@ -102,30 +125,54 @@ class AbstractHint(HintInterface):
         self.max_score = 0
         self.__destructClones()
         self.solver_state = 'not_started'
+        self.move_index = {}
 
     #
     # stack cloning
     #
 
     # Create a shallow copy of a stack.
+    #
+    # The clones are only used to ask a stack "what if" questions
+    # (acceptsCards, canMoveCards, ...), so they share the card list
+    # passed in by the caller (which is always a fresh slice like
+    # rpile or r.cards[:-1]) instead of copying it again. The clone
+    # objects themselves are recycled through a pool (shared by all
+    # hint instances), so repeated getHints() calls - in demo mode for
+    # example - don't allocate new ones.
     class AClonedStack:
         def __init__(self, stack, stackcards):
+            self._clone(stack, stackcards)
+
+        def _clone(self, stack, stackcards):
             # copy class identity
             self.__class__ = stack.__class__
             # copy model data (reference copy)
             stack.copyModel(self)
-            # set new cards (shallow copy of the card list)
-            self.cards = stackcards[:]
+            # set new cards (shared, must not be modified)
+            self.cards = stackcards
+
+    _clone_pool = []
+    CLONE_POOL_SIZE = 256
 
     def ClonedStack(self, stack, stackcards):
-        s = self.AClonedStack(stack, stackcards)
+        if self._clone_pool:
+            s = self._clone_pool.pop()
+            AbstractHint.AClonedStack._clone(s, stack, stackcards)
+        else:
+            s = self.AClonedStack(stack, stackcards)
         self.__clones.append(s)
         return s
 
     def __destructClones(self):
+        pool = self._clone_pool
         for s in self.__clones:
             s.__class__ = self.AClonedStack     # restore orignal class
-            destruct(s)
+            # drop the references (and any attribute a stack class
+            # may have set) so that the next clone starts clean
+            s.__dict__.clear()
+            if len(pool) < self.CLONE_POOL_SIZE:
+                pool.append(s)
         self.__clones = []
 
     # When computing hints for level 0, the scores are flattened
@@ -140,6 +187,8 @@ class AbstractHint(HintInterface):
                 to_stack, text_color=None, forced_move=None):
         if score < 0:
             return
+        if self.any_move:
+            raise HintFound()
         self.max_score = max(self.max_score, score)
         # add an atomic hint
         if self.score_flatten_value > 0:
@@ -201,6 +250,22 @@ class AbstractHint(HintInterface):
     def computeHints(self):
         pass
 
+    # Is there any hint at all in the current position ? Same as
+    # bool(self.getHints()) for level 0/1, but computeHints() is stopped
+    # at the first hint (used for the stuck indicator).
+    # Subclasses may override this with a cheaper check.
+    def hasAnyMove(self):
+        self.reset()
+        self.any_move = True
+        try:
+            self.computeHints()
+        except HintFound:
+            return True
+        finally:
+            self.any_move = False
+            self.reset()
+        return False
+
     #
     # utility shallMovePile()
     #
@@ -247,6 +312,35 @@ class AbstractHint(HintInterface):
 
     shallMovePile = _defaultShallMovePile
 
+    #
+    # move index
+    #
+
+    # Return the stacks that may accept a pile starting with `card'
+    # (in their original order). The stacks are indexed by the ranks
+    # they accept next (see Stack.getAcceptedRanks), so that we don't
+    # have to call acceptsCards() for every stack.
+    def getTargetStacks(self, stacks, card):
+        entry = self.move_index.get(id(stacks))
+        if entry is None or entry[0] is not stacks:
+            index, anywhere = {}, []
+            for i, t in enumerate(stacks):
+                ranks = t.getAcceptedRanks()
+                if ranks is None:
+                    anywhere.append(i)
+                    continue
+                for rank in ranks:
+                    index.setdefault(rank, []).append(i)
+            entry = (stacks, index, anywhere)
+            self.move_index[id(stacks)] = entry
+        index, anywhere = entry[1], entry[2]
+        found = index.get(card.rank)
+        if not found:
+            found = anywhere
+        elif anywhere:
+            found = sorted(found + anywhere)
+        return [stacks[i] for i in found]
+
     #
     # other utility methods
     #
@@ -504,7 +598,7 @@ class DefaultHint(AbstractHint):
         empty_row_seen = 0
         r_is_waste = r in self.game.sg.talonstacks
 
-        for t in rows:
+        for t in self.getTargetStacks(rows, pile[0]):
             score, color = 0, None
             if not self.shallMovePile(r, t, pile, rpile):
                 continue
@@ -558,9 +652,9 @@ class DefaultHint(AbstractHint):
                     sub_pile = pile[di[3]+1:]
                     # print "trying drop move", c, pile, sub_pile
                     # assert r.canMoveCards(sub_pile)
-                    if not r.canMoveCards(sub_pile):
+                    if not sub_pile or not r.canMoveCards(sub_pile):
                         continue
-                    for t in rows:
+                    for t in self.getTargetStacks(rows, sub_pile[0]):
                         if t is r or not t.acceptsCards(r, sub_pile):
                             continue
                         # print "drop move", r, t, sub_pile
@@ -581,7 +675,7 @@ class DefaultHint(AbstractHint):
             if not card or not s.canMoveCards([card]):
                 continue
             # search a RowStack that would accept the card
-            for t in rows:
+            for t in self.getTargetStacks(rows, card):
                 if t is s or not t.acceptsCards(s, [card]):
                     continue
                 tt = self.ClonedStack(t, stackcards=t.cards+[card])
@@ -716,6 +810,169 @@ class SpiderType_Hint(DefaultHint):
     pass
 
 
+# ************************************************************************
+# * LookaheadHint searches a few moves ahead (level 4, used by the demo
+# * if the demo_lookahead option is set).
+# *
+# * The moves are played on the model only - the card lists of the
+# * stacks and the face_up flags of the cards, the canvas is not
+# * touched - and taken back before getHints() returns. The hints of
+# * the game's own hint class are used to generate and order the moves;
+# * a deal ends the search. The model does not fill the stacks, so the
+# * games with a fillStack() are not searched (see Game.getHints); if
+# * the hint class fails on a position of the model anyway, the level 2
+# * hints are returned.
+# *
+# * The search is an iterative deepening depth-first search with a
+# * transposition table (keyed by Game.getSnapshot()) that stops at a
+# * wall-clock deadline; it runs in a Tk callback, so the budget is
+# * short.
+# ************************************************************************
+
+class LookaheadTimeout(Exception):
+    pass
+
+
+class LookaheadHint(HintInterface):
+    TIME_BUDGET = 0.05          # seconds per getHints() call
+    MAX_DEPTH = 8
+    BRANCH = 4                  # best moves searched in each position
+
+    # evaluation of a position
+    SCORE_WON = 1000000
+    SCORE_DEAD = -100000        # no moves and no deal left
+    SCORE_REPEAT = -50000       # position already seen
+    SCORE_FOUNDATION = 1000     # per card on the foundations
+    SCORE_FACE_DOWN = -200      # per face-down card on rows and reserves
+    SCORE_FREE_STACK = 50       # per empty row or reserve
+
+    def __init__(self, game, level, hint_class, time_budget=None):
+        self.game = game
+        self.level = level
+        self.hint_class = hint_class
+        self.time_budget = time_budget
+        if time_budget is None:
+            self.time_budget = self.TIME_BUDGET
+        self.table = {}
+        self.path = set()
+        self.deadline = 0
+
+    def getHints(self, taken_hint=None):
+        game = self.game
+        hints = self.hint_class(game, 2).getHints(taken_hint)
+        if len(hints) < 2 or (taken_hint and taken_hint[6]):
+            # nothing to choose (or a forced move)
+            return hints
+        self.deadline = time.time() + self.time_budget
+        self.table = {}
+        self.path = set([game.getSnapshot()])
+        values = None
+        try:
+            for depth in range(self.MAX_DEPTH):
+                v = [self._searchHint(h, depth) for h in hints]
+                values = v
+                if max(values) >= self.SCORE_WON:
+                    break
+        except LookaheadTimeout:
+            pass
+        except Exception:
+            # a position the hint class does not expect (the moves are
+            # taken back, see _searchHint)
+            return hints
+        if values is None:
+            return hints
+        # best value first, keep the order of the hints on equal values
+        order = sorted(range(len(hints)), key=lambda i: -values[i])
+        return [hints[i] for i in order]
+
+    def _isModelMove(self, h):
+        ncards, r, t = h[2:5]
+        return ncards > 0 and t is not None and len(r.cards) >= ncards
+
+    def _searchHint(self, h, depth):
+        if not self._isModelMove(h):
+            # a deal - don't search any further
+            return self._evaluate()
+        undo = self._doMove(h)
+        try:
+            sn = self.game.getSnapshot()
+            if sn in self.path or sn in self.game.snapshots:
+                return self.SCORE_REPEAT
+            self.path.add(sn)
+            try:
+                return self._search(sn, depth)
+            finally:
+                self.path.remove(sn)
+        finally:
+            self._undoMove(h, undo)
+
+    def _search(self, sn, depth):
+        game = self.game
+        if time.time() > self.deadline:
+            raise LookaheadTimeout()
+        if game.isGameWon():
+            # prefer the quickest win
+            return self.SCORE_WON + depth
+        if depth == 0:
+            return self._evaluate()
+        entry = self.table.get(sn)
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+        hints = self.hint_class(game, 2).getHints()
+        value = None
+        n = 0
+        for h in hints:
+            if not self._isModelMove(h):
+                v = self._evaluate()
+            elif n < self.BRANCH:
+                n += 1
+                v = self._searchHint(h, depth - 1)
+            else:
+                continue
+            if value is None or v > value:
+                value = v
+        if value is None:
+            value = self._evaluate() + self.SCORE_DEAD
+        self.table[sn] = (depth, value)
+        return value
+
+    def _evaluate(self):
+        s = self.game.s
+        value = 0
+        for f in s.foundations:
+            value += self.SCORE_FOUNDATION * len(f.cards)
+        for stacks in (s.rows, s.reserves):
+            for r in stacks:
+                if not r.cards:
+                    value += self.SCORE_FREE_STACK
+                for c in r.cards:
+                    if not c.face_up:
+                        value += self.SCORE_FACE_DOWN
+        return value
+
+    def _doMove(self, h):
+        ncards, r, t = h[2:5]
+        self.game.sn_dirty.update((r.id, t.id))
+        if r is t:
+            # flip
+            card = r.cards[-1]
+            card.face_up = not card.face_up
+            return None
+        undo = (r.cards, t.cards)
+        r.cards = r.cards[:-ncards]
+        t.cards = t.cards + undo[0][-ncards:]
+        return undo
+
+    def _undoMove(self, h, undo):
+        ncards, r, t = h[2:5]
+        self.game.sn_dirty.update((r.id, t.id))
+        if r is t:
+            card = r.cards[-1]
+            card.face_up = not card.face_up
+            return
+        r.cards, t.cards = undo
+
+
 # ************************************************************************
 # * FreeCell-Solver
 # ************************************************************************
@@ -732,6 +989,15 @@ class Base_Solver_Hint:
             }
         self.hints = []
         self.hints_index = 0
+        self.solver_state = ''
+        # the running solver process (see run_solver)
+        self.solver_pid = None
+        self.solver_killed = False
+        self.cancelled = False
+        # the board as read by prepare()
+        self.prepared = False
+        self.solver_board = None
+        self.solver_input = None
 
         # correct cards rank if foundations.base_rank != 0 (Penguin, Opus)
         if 'base_rank' in game_type:    # (Simple Simon)
@@ -744,6 +1010,29 @@ class Base_Solver_Hint:
     def config(self, **kw):
         self.options.update(kw)
 
+    def prepare(self):
+        # read the board in the main thread; computeHints() may run in
+        # another one while the cards are moved (see SolverDialog)
+        self.solver_board = self.calcBoardString()
+        try:
+            self.solver_input = self.getSolverInput()
+        except FreeCellSolverUnsupported as e:
+            # only an error if the in-process solver is needed
+            self.solver_input = e
+        self.prepared = True
+
+    def getPreparedBoard(self):
+        if not self.prepared:
+            self.prepare()
+        return self.solver_board
+
+    def getPreparedInput(self):
+        if not self.prepared:
+            self.prepare()
+        if isinstance(self.solver_input, FreeCellSolverUnsupported):
+            raise self.solver_input
+        return self.solver_input
+
     def _card2str_format(self, fmt, card):
         # row and reserves
         rank = (card.rank-self.base_rank) % 13
@@ -767,6 +1056,10 @@ class Base_Solver_Hint:
         if h is None:
             return None
         ncards, src, dest = h
+        if ncards == 0:
+            # deal a card from the talon
+            self.hints_index += 1
+            return [(999999, 0, 0, src, dest, None, None)]
         thint = None
         if len(src.cards) > ncards and not src.cards[-ncards-1].face_up:
             # flip card
@@ -792,23 +1085,109 @@ class Base_Solver_Hint:
             self._v = None
             return False
 
-    def run_solver(self, command, board):
+    #
+    # solver results cache (see solvercache.py)
+    #
+
+    def getCacheKey(self, board, command):
+        # max_iters is a soft limit (not in the command for fc-solve)
+        return solver_cache.getKey(
+            board, command + ['max_iters', self.options['max_iters']])
+
+    def _encodeStack(self, stack):
+        if stack is None:
+            # foundations
+            return None
+        if stack is self.game.s.talon:
+            return ('talon', 0)
+        if stack is self.game.s.waste:
+            return ('waste', 0)
+        for name in ('rows', 'reserves'):
+            stacks = getattr(self.game.s, name)
+            if stack in stacks:
+                return (name, list(stacks).index(stack))
+        raise ValueError('unexpected stack: %s' % stack)
+
+    def _decodeStack(self, s):
+        if s is None:
+            return None
+        name, index = s
+        if name == 'talon':
+            return self.game.s.talon
+        if name == 'waste':
+            return self.game.s.waste
+        return getattr(self.game.s, name)[index]
+
+    def loadCachedHints(self, key):
+        result = solver_cache.get(key)
+        if result is None:
+            return False
+        self.solver_state, moves = result
+        self.hints = [[ncards, self._decodeStack(src), self._decodeStack(dest)]
+                      for ncards, src, dest in moves]
+        self.hints.append(None)
+        return True
+
+    def storeCachedHints(self, key):
+        if self.cancelled:
+            return
+        if self.solver_state not in ('solved', 'unsolved', 'intractable'):
+            return
+        moves = [(ncards, self._encodeStack(src), self._encodeStack(dest))
+                 for ncards, src, dest in self.hints[:-1]]
+        solver_cache.put(key, (self.solver_state, moves))
+
+    def _solverProgress(self, solver):
+        if self.options['progress']:
+            self.dialog.setText(iter=solver.iters, depth=solver.depth,
+                                states=solver.states)
+        if solver.iters >= self.options['max_iters']:
+            return True
+        return self.cancelled
+
+    def _solverStarted(self, pid):
+        self.solver_pid = pid
+        if self.cancelled:
+            self.killSolver()
+
+    def killSolver(self):
+        # may be called from any thread
+        self.solver_killed = True
+        pid = self.solver_pid
+        if pid:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def cancel(self):
+        self.cancelled = True
+        self.solver_state = 'cancelled'
+        self.killSolver()
+
+    def _solverOutput(self, chunk):
+        lines = (self._line_buf + chunk).split(b'\n')
+        self._line_buf = lines.pop()
+        for line in lines:
+            self._line_handler(unicode(line, encoding='utf-8'))
+
+    def run_solver(self, args, board, line_handler=None):
+        # line_handler(line) is called for every line of the solver
+        # output as soon as it arrives
         if DEBUG:
-            print(command)
-        kw = {'shell': True,
-              'stdin': subprocess.PIPE,
-              'stdout': subprocess.PIPE,
-              'stderr': subprocess.PIPE}
-        if os.name != 'nt':
-            kw['close_fds'] = True
-        p = subprocess.Popen(command, **kw)
-        bytes_board = board
-        if sys.version_info > (3,):
-            bytes_board = bytes(board, 'utf-8')
-        pout, perr = p.communicate(bytes_board)
-        if p.returncode in (127, 1):
+            print(' '.join([str(i) for i in args]))
+        write_out = None
+        if line_handler:
+            self._line_handler = line_handler
+            self._line_buf = b''
+            write_out = self._solverOutput
+        self.solver_killed = False
+        returncode, pout, perr = solver_pool.run(
+            args, board, write_out=write_out, started=self._solverStarted)
+        self.solver_pid = None
+        if returncode in (127, 1) and not self.solver_killed:
             # Linux and Windows return codes for "command not found" error
-            raise RuntimeError('Solver exited with {}'.format(p.returncode))
+            raise RuntimeError('Solver exited with {}'.format(returncode))
         return BytesIO(pout), BytesIO(perr)
 
 
@@ -935,12 +1314,29 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
 
         return self.board
 
+    def _handleIterLine(self, s):
+        if DEBUG >= 5:
+            print(s)
+        if self.colonPrefixMatch('Iteration', s):
+            self._iter = self._v
+            if (self._iter >= self.options['max_iters'] and
+                    not self.solver_killed):
+                self.solver_state = 'intractable'
+                self.killSolver()
+        elif self.colonPrefixMatch('Depth', s):
+            self._depth = self._v
+        elif self.colonPrefixMatch('Stored-States', s):
+            self._states = self._v
+            if self.options['progress'] and self._iter % 100 == 0:
+                self.dialog.setText(iter=self._iter, depth=self._depth,
+                                    states=self._states)
+
     def computeHints(self):
         game = self.game
         game_type = self.game_type
         progress = self.options['progress']
 
-        board = self.calcBoardString()
+        board = self.getPreparedBoard()
         #
         if DEBUG:
             print('--------------------\n', board, '--------------------')
@@ -948,13 +1344,17 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         args = []
         # args += ['-sam', '-p', '-opt', '--display-10-as-t']
         args += ['-m', '-p', '-opt', '-sel']
-        if progress:
-            args += ['--iter-output']
-            if DEBUG:
-                args += ['-s']
+        # the iteration output is parsed while the solver runs
+        # (see _handleIterLine)
+        args += ['--iter-output']
+        if progress and DEBUG:
+            args += ['-s']
         if self.options['preset'] and self.options['preset'] != 'none':
             args += ['--load-config', self.options['preset']]
-        args += ['--max-iters', self.options['max_iters'],
+        # max_iters is a soft limit that may be changed while the
+        # solver runs; pass only the upper bound to the solver
+        max_iters = max(self.options['max_iters'], SOLVER_MAX_ITERS)
+        args += ['--max-iters', max_iters,
                  '--decks-num', game.gameinfo.decks,
                  '--stacks-num', len(game.s.rows),
                  '--freecells-num', len(game.s.reserves),
@@ -969,8 +1369,25 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         if 'esf' in game_type:
             args += ['--empty-stacks-filled-by', game_type['esf']]
 
-        command = FCS_COMMAND+' '+' '.join([str(i) for i in args])
-        pout, perr = self.run_solver(command, board)
+        command = [FCS_COMMAND] + args
+        key = self.getCacheKey(board, command)
+        if self.loadCachedHints(key):
+            return
+
+        self._iter, self._depth, self._states = 0, 0, 0
+        try:
+            pout, perr = self.run_solver(command, board, self._handleIterLine)
+        except RuntimeError:
+            # fc-solve is not installed
+            try:
+                self.computeHintsInProcess()
+            except FreeCellSolverUnsupported:
+                raise RuntimeError('Solver not found')
+            self.storeCachedHints(key)
+            return
+        if self.cancelled:
+            self.hints = [None]
+            return
         #
         stack_types = {
             'the': game.s.foundations,
@@ -979,31 +1396,18 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
             }
         if DEBUG:
             start_time = time.time()
+        # skip the iteration output (already parsed by _handleIterLine)
+        for sbytes in pout:
+            s = unicode(sbytes, encoding='utf-8')
+            if DEBUG >= 5:
+                print(s)
+            if re.search('^(?:-=-=)', s):
+                break
+            elif self._determineIfSolverState(s):
+                break
         if progress:
-            # iteration output
-            iter_ = 0
-            depth = 0
-            states = 0
-
-            for sbytes in pout:
-                s = unicode(sbytes, encoding='utf-8')
-                if DEBUG >= 5:
-                    print(s)
-
-                if self.colonPrefixMatch('Iteration', s):
-                    iter_ = self._v
-                elif self.colonPrefixMatch('Depth', s):
-                    depth = self._v
-                elif self.colonPrefixMatch('Stored-States', s):
-                    states = self._v
-                    if iter_ % 100 == 0:
-                        self.dialog.setText(iter=iter_, depth=depth,
-                                            states=states)
-                elif re.search('^(?:-=-=)', s):
-                    break
-                elif self._determineIfSolverState(s):
-                    break
-            self.dialog.setText(iter=iter_, depth=depth, states=states)
+            self.dialog.setText(iter=self._iter, depth=self._depth,
+                                states=self._states)
 
         hints = []
         for sbytes in pout:
@@ -1084,16 +1488,69 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         self.hints.append(None)         # XXX
 
         # print self.hints
+        self.storeCachedHints(key)
 
         pout.close()
         perr.close()
 
+    def getSolverInput(self):
+        game = self.game
+        game_type = self.game_type
+        if self._isSimpleSimon():
+            raise FreeCellSolverUnsupported('simple_simon')
+
+        def card(c):
+            return c.suit, (c.rank - self.base_rank) % 13
+        columns = []
+        for s in game.s.rows:
+            for c in s.cards:
+                if not c.face_up:
+                    raise FreeCellSolverUnsupported('face-down cards')
+            columns.append([card(c) for c in s.cards])
+        freecells = []
+        for s in game.s.reserves:
+            if len(s.cards) > 1:
+                raise FreeCellSolverUnsupported('reserves')
+            freecells.append(card(s.cards[0]) if s.cards else None)
+        decks = game.gameinfo.decks
+        foundations = [[] for i in range(4)]
+        for s in game.s.foundations:
+            if s.cap.suit not in range(4):
+                raise FreeCellSolverUnsupported('foundations')
+            foundations[s.cap.suit].append(len(s.cards))
+        if [len(f) for f in foundations] != [decks] * 4:
+            raise FreeCellSolverUnsupported('foundations')
+        kw = {}
+        for name in ('sbb', 'sm', 'esf', 'preset'):
+            if name in game_type:
+                kw[name] = game_type[name]
+        return columns, freecells, foundations, decks, kw
+
+    def computeHintsInProcess(self):
+        columns, freecells, foundations, decks, kw = self.getPreparedInput()
+        solver = FreeCellSolver(columns, freecells, foundations, decks=decks,
+                                max_iters=SOLVER_MAX_ITERS, **kw)
+        self.solver_state = solver.solve(callback=self._solverProgress)
+        if self.cancelled:
+            self.hints = [None]
+            return
+        self.dialog.setText(iter=solver.iters, depth=solver.depth,
+                            states=solver.states)
+        self.hints = [[ncards, self._decodeStack(src), self._decodeStack(dest)]
+                      for ncards, src, dest in solver.moves]
+        self.hints.append(None)
+
 
 class BlackHoleSolver_Hint(Base_Solver_Hint):
     BLACK_HOLE_SOLVER_COMMAND = 'black-hole-solve'
 
     def calcBoardString(self):
         board = ''
+        if self.game_type['preset'] == 'golf':
+            b = ''
+            for c in reversed(self.game.s.talon.cards):
+                b += self.card2str1(c) + ' '
+            board += 'Talon: ' + b.strip() + '\n'
         cards = self.game.s.foundations[0].cards
         s = '-'
         if (len(cards) > 0):
@@ -1115,7 +1572,7 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
         game = self.game
         game_type = self.game_type
 
-        board = self.calcBoardString()
+        board = self.getPreparedBoard()
         #
         if DEBUG:
             print('--------------------\n', board, '--------------------')
@@ -1125,10 +1582,26 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
         args += ['--game', game_type['preset'], '--rank-reach-prune']
         args += ['--max-iters', self.options['max_iters']]
         #
+        command = [self.BLACK_HOLE_SOLVER_COMMAND] + args
+        key = self.getCacheKey(board, command)
+        if self.loadCachedHints(key):
+            return
 
-        command = self.BLACK_HOLE_SOLVER_COMMAND + ' ' + \
-            ' '.join([str(i) for i in args])
-        pout, perr = self.run_solver(command, board)
+        if game_type['preset'] == 'golf':
+            # only solved in-process
+            self.computeHintsInProcess()
+            self.storeCachedHints(key)
+            return
+        try:
+            pout, perr = self.run_solver(command, board)
+        except RuntimeError:
+            # black-hole-solve is not installed
+            self.computeHintsInProcess()
+            self.storeCachedHints(key)
+            return
+        if self.cancelled:
+            self.hints = [None]
+            return
         #
         if DEBUG:
             start_time = time.time()
@@ -1194,10 +1667,124 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
         self.hints.append(None)         # XXX
 
         # print self.hints
+        self.storeCachedHints(key)
 
         pout.close()
         perr.close()
 
+    def getSolverInput(self):
+        game = self.game
+        foundation = game.s.foundations[0]
+        f = None
+        if foundation.cards:
+            f = foundation.cards[-1].rank
+        talon = []
+        if self.game_type['preset'] == 'golf':
+            talon = [c.rank for c in reversed(game.s.talon.cards)]
+        return ([[c.rank for c in r.cards] for r in game.s.rows],
+                {'foundation': f, 'talon': talon,
+                 'wrap': foundation.cap.mod == 13,
+                 'king_is_blocked': game.getStrictness() == 1})
+
+    def computeHintsInProcess(self):
+        game = self.game
+        rows, kw = self.getPreparedInput()
+        solver = BlackHoleSolver(rows, max_iters=self.options['max_iters'],
+                                 **kw)
+        self.solver_state = solver.solve()
+        self.dialog.setText(iter=solver.iters)
+        hints = []
+        for i in solver.moves:
+            if i == TALON:
+                hints.append([0, game.s.talon, None])
+            else:
+                hints.append([1, game.s.rows[i], None])
+        self.hints = hints
+        self.hints.append(None)
+
+
+class KlondikeSolver_Hint(Base_Solver_Hint):
+    def calcBoardString(self):
+        game = self.game
+        board = ''
+        b = ''
+        for s in game.s.foundations:
+            if s.cards:
+                b += ' ' + self.card2str2(s.cards[-1])
+        if b:
+            board += 'Founds:' + b + '\n'
+        b = ''
+        for c in reversed(game.s.talon.cards):
+            b += self.card2str1(c) + ' '
+        board += 'Talon: ' + b.strip() + '\n'
+        b = ''
+        for c in game.s.waste.cards:
+            b += self.card2str1(c) + ' '
+        board += 'Waste: ' + b.strip() + '\n'
+
+        for s in game.s.rows:
+            b = ''
+            for c in s.cards:
+                cs = self.card2str1(c)
+                if not c.face_up:
+                    cs = '<%s>' % cs
+                b += cs + ' '
+            board += b.strip() + '\n'
+
+        return board
+
+    def computeHints(self):
+        board = self.getPreparedBoard()
+        kw = self.getPreparedInput()[4]
+        #
+        if DEBUG:
+            print('--------------------\n', board, '--------------------')
+        #
+        args = ['--num-deal', kw['num_deal'],
+                '--max-rounds', kw['max_rounds'],
+                '--round', kw['round']]
+        for name in sorted(self.game_type):
+            args += ['--' + name, self.game_type[name]]
+        # solved in-process only
+        command = ['klondike'] + args
+        key = self.getCacheKey(board, command)
+        if self.loadCachedHints(key):
+            return
+        self.computeHintsInProcess()
+        self.storeCachedHints(key)
+
+    def getSolverInput(self):
+        game = self.game
+        talon = game.s.talon
+
+        def card(c):
+            return c.suit, (c.rank - self.base_rank) % 13
+        rows = [[card(c) + (c.face_up,) for c in r.cards]
+                for r in game.s.rows]
+        stock = [card(c) for c in game.s.waste.cards]
+        stock += [card(c) for c in reversed(talon.cards)]
+        foundations = [0] * 4
+        for s in game.s.foundations:
+            foundations[s.cap.suit] = len(s.cards)
+        return (rows, stock, len(game.s.waste.cards), foundations,
+                {'num_deal': talon.num_deal, 'max_rounds': talon.max_rounds,
+                 'round': talon.round})
+
+    def computeHintsInProcess(self):
+        rows, stock, waste, foundations, kw = self.getPreparedInput()
+        kw = dict(kw, **self.game_type)
+        solver = KlondikeSolver(rows, stock, waste, foundations,
+                                max_iters=SOLVER_MAX_ITERS, **kw)
+        self.solver_state = solver.solve(callback=self._solverProgress)
+        if self.cancelled:
+            self.hints = [None]
+            return
+        self.dialog.setText(iter=solver.iters, depth=solver.depth,
+                            states=solver.states)
+        self.hints = [[ncards, self._decodeStack(src), self._decodeStack(dest)]
+                      for ncards, src, dest in solver.moves]
+        self.hints.append(None)
+
 
 class FreeCellSolverWrapper:
 
@@ -1217,3 +1804,13 @@ class BlackHoleSolverWrapper:
     def __call__(self, game, dialog):
         hint = BlackHoleSolver_Hint(game, dialog, **self.game_type)
         return hint
+
+
+class KlondikeSolverWrapper:
+
+    def __init__(self, **game_type):
+        self.game_type = game_type
+
+    def __call__(self, game, dialog):
+        hint = KlondikeSolver_Hint(game, dialog, **self.game_type)
+        return hint
@@ -540,6 +540,11 @@ class OptionsMenuDialog(LMenuDialog):
                               self.menubar.tkopt.quickplay,
                               self.menubar.mOptQuickPlay)
 
+            self.addCheckNode(tv, rg,
+                              'Demo looks ahead',
+                              self.menubar.tkopt.demo_lookahead,
+                              self.menubar.mOptDemoLookahead)
+
         # -------------------------------------------
         # Player assistance
 
@@ -1218,6 +1223,7 @@ class PysolMenubarTk:
             save_games_geometry=BooleanVar(),
             splashscreen=BooleanVar(),
             demo_logo=BooleanVar(),
+            demo_lookahead=BooleanVar(),
             mouse_type=StringVar(),
             mouse_undo=BooleanVar(),
             negative_bottom=BooleanVar(),
@@ -1276,6 +1282,7 @@ class PysolMenubarTk:
         tkopt.helpbar.set(opt.helpbar)
         tkopt.save_games_geometry.set(opt.save_games_geometry)
         tkopt.demo_logo.set(opt.demo_logo)
+        tkopt.demo_lookahead.set(opt.demo_lookahead)
         tkopt.splashscreen.set(opt.splashscreen)
         tkopt.mouse_type.set(opt.mouse_type)
         tkopt.mouse_undo.set(opt.mouse_undo)
@@ -1931,6 +1938,11 @@ class PysolMenubarTk:
             return
         self.app.opt.quickplay = self.tkopt.quickplay.get()
 
+    def mOptDemoLookahead(self, *args):
+        if self._cancelDrag(break_pause=False):
+            return
+        self.app.opt.demo_lookahead = self.tkopt.demo_lookahead.get()
+
     def mOptEnableUndo(self, *args):
         if self._cancelDrag(break_pause=False):
             return
@@ -58,6 +58,11 @@ class AtomicMove:
     def cmpForRedo(self, other):
         return -1
 
+    # The ids of the stacks changed by this move (None means all stacks).
+    # See Game.getSnapshot().
+    def getStackIds(self):
+        return None
+
 
 # ************************************************************************
 # * Move the top N cards from a stack to another stack.
@@ -102,6 +107,9 @@ class AMoveMove(AtomicMove):
         self._doMove(game, self.ncards, game.allstacks[self.to_stack_id],
                      game.allstacks[self.from_stack_id])
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return (cmp(self.ncards, other.ncards) or
                 cmp(self.from_stack_id, other.from_stack_id) or
@@ -131,6 +139,9 @@ class AFlipMove(AtomicMove):
     def undo(self, game):
         self._doMove(game, game.allstacks[self.stack_id])
 
+    def getStackIds(self):
+        return (self.stack_id,)
+
     def cmpForRedo(self, other):
         return cmp(self.stack_id, other.stack_id)
 
@@ -185,6 +196,9 @@ class AFlipAndMoveMove(AtomicMove):
         self._doMove(game, game.allstacks[self.to_stack_id],
                      game.allstacks[self.from_stack_id])
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return (cmp(self.from_stack_id, other.from_stack_id) or
                 cmp(self.to_stack_id, other.to_stack_id))
@@ -216,6 +230,9 @@ class AFlipAllMove(AtomicMove):
                 card.showFace()
         stack.refreshView()
 
+    def getStackIds(self):
+        return (self.stack_id,)
+
     def cmpForRedo(self, other):
         return cmp(self.stack_id, other.stack_id)
 
@@ -265,6 +282,9 @@ class ATurnStackMove(AtomicMove):
         from_stack.updateText()
         to_stack.updateText()
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return (cmp(self.from_stack_id, other.from_stack_id) or
                 cmp(self.to_stack_id, other.to_stack_id))
@@ -322,6 +342,9 @@ class NEW_ATurnStackMove(AtomicMove):
             to_stack.round = to_stack.round - 1
         self._doMove(to_stack, from_stack, 1)
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return (cmp(self.from_stack_id, other.from_stack_id) or
                 cmp(self.to_stack_id, other.to_stack_id) or
@@ -389,6 +412,9 @@ class ANextRoundMove(AtomicMove):
         stack.round = stack.round - 1
         stack.updateText()
 
+    def getStackIds(self):
+        return ()
+
     def cmpForRedo(self, other):
         return cmp(self.stack_id, other.stack_id)
 
@@ -407,6 +433,9 @@ class ASaveSeedMove(AtomicMove):
     def undo(self, game):
         game.random.setstate(self.state)
 
+    def getStackIds(self):
+        return ()
+
     def cmpForRedo(self, other):
         return cmp(self.state, other.state)
 
@@ -470,6 +499,9 @@ class AShuffleStackMove(AtomicMove):
         game.random.setstate(self.state)
         stack.refreshView()
 
+    def getStackIds(self):
+        return (self.stack_id,)
+
     def cmpForRedo(self, other):
         return (cmp(self.stack_id, other.stack_id) or
                 cmp(self.card_ids, other.card_ids) or
@@ -518,6 +550,9 @@ class ASingleCardMove(AtomicMove):
         from_stack.insertCard(card, from_pos)
         # to_stack.refreshView()
 
+    def getStackIds(self):
+        return (self.from_stack_id, self.to_stack_id)
+
     def cmpForRedo(self, other):
         return cmp((self.from_stack_id, self.to_stack_id, self.from_pos),
                    (other.from_stack_id, other.to_stack_id, other.from_pos))
@@ -541,6 +576,9 @@ class AInnerMove(AtomicMove):
         # stack = game.allstacks[self.stack_id]
         pass
 
+    def getStackIds(self):
+        return (self.stack_id,)
+
     def cmpForRedo(self, other):
         return cmp((self.stack_id, self.from_pos, self.to_pos),
                    (other.stack_id, other.from_pos, other.to_pos))
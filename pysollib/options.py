@@ -76,6 +76,7 @@ shade = boolean
 shrink_face_down = boolean
 shade_filled_stacks = boolean
 demo_logo = boolean
+demo_lookahead = boolean
 tile_theme = string
 default_tile_theme = string
 toolbar = integer(0, 4)
@@ -215,6 +216,7 @@ class Options:
         ('shrink_face_down', 'bool'),
         ('shade_filled_stacks', 'bool'),
         ('demo_logo', 'bool'),
+        ('demo_lookahead', 'bool'),
         ('tile_theme', 'str'),
         ('default_tile_theme', 'str'),
         ('toolbar', 'int'),
@@ -296,6 +298,7 @@ class Options:
         self.shrink_face_down = True
         self.shade_filled_stacks = True
         self.demo_logo = True
+        self.demo_lookahead = False    # demo searches a few moves ahead
         self.tile_theme = 'default'
         self.default_tile_theme = 'default'
         self.toolbar = 1       # 0 == hide, 1,2,3,4 == top, bottom, lef, right
@@ -267,6 +267,7 @@ class PysolMenubarTk:
             ('Show &number of cards',   '', 'num_cards',              False),
             ('Use mouse for undo/redo', '', 'mouse_undo',             False),
             ('&Demo logo',              '', 'demo_logo',              False),
+            ('Demo &looks ahead',       '', 'demo_lookahead',         False),
             ('Startup splash sc&reen',  '', 'splashscreen',           False),
             ('&Show removed tiles (in Mahjongg games)', '',
              'mahjongg_show_removed', True),
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# imports
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# PySol imports
+from pysollib.mfxutil import pickle, unpickle
+
+# ************************************************************************
+# * Persistent LRU cache of solver results (see Base_Solver_Hint).
+# *
+# * key:    hash of the board (calcBoardString) and the solver arguments
+# * value:  (solver_state, moves); the moves are stored as
+# *         (ncards, src, dest) with stacks as ('rows', index) or
+# *         ('reserves', index), dest None means the foundations
+# ************************************************************************
+
+
+class SolverCache:
+    CACHE_VERSION = 1
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.changed = False
+
+    def getKey(self, board, args):
+        s = board + '\n' + ' '.join([str(i) for i in args])
+        return hashlib.sha1(s.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.pop(key, None)
+            if value is not None:
+                # most recently used
+                self.entries[key] = value
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            while len(self.entries) > self.max_entries:
+                # drop the least recently used entry
+                self.entries.popitem(last=False)
+            self.changed = True
+
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict()
+            self.changed = True
+
+    def load(self, filename):
+        if not os.path.exists(filename):
+            return
+        data = unpickle(filename)
+        if not isinstance(data, tuple) or len(data) != 2:
+            return
+        version, entries = data
+        if version != self.CACHE_VERSION:
+            return
+        with self.lock:
+            self.entries = OrderedDict(entries)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.changed = False
+
+    def save(self, filename):
+        if not self.changed:
+            return
+        with self.lock:
+            data = (self.CACHE_VERSION, list(self.entries.items()))
+            self.changed = False
+        pickle(data, filename, protocol=-1)
+
+
+solver_cache = SolverCache()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# ************************************************************************
+# * Pool of long-lived solver workers (fc-solve, black-hole-solve).
+# *
+# * A worker is a small python process (python -m pysollib.solverpool) that
+# * is started once and then fed with requests over its stdin. For every
+# * request it runs the solver command directly (no shell) and sends the
+# * output back over its stdout. Crashed workers are restarted on the
+# * next request.
+# *
+# * Framing (both directions): <type: 1 byte> <length: 4 bytes> <payload>
+# *   request:   'q'  json {"args": [...], "board": "..."}
+# *   response:  'p'  the solver pid (ascii)
+# *              'o'  a chunk of the solver stdout (repeated)
+# *              'e'  the solver stderr
+# *              'x'  the solver return code (ascii)
+# *
+# * Note: this module is run by the workers, so it must only import from
+# * the standard library.
+# ************************************************************************
+
+import atexit
+import json
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+
+FRAME_HEADER = struct.Struct('!cI')
+
+# "command not found" (see Base_Solver_Hint.run_solver)
+RETURNCODE_NOT_FOUND = 127
+
+
+def write_frame(fh, type_, data):
+    fh.write(FRAME_HEADER.pack(type_, len(data)))
+    fh.write(data)
+
+
+def _read_exactly(fh, size):
+    data = b''
+    while len(data) < size:
+        chunk = fh.read(size - len(data))
+        if not chunk:
+            raise EOFError('solver worker closed the pipe')
+        data += chunk
+    return data
+
+
+def read_frame(fh):
+    type_, length = FRAME_HEADER.unpack(_read_exactly(fh, FRAME_HEADER.size))
+    return type_, _read_exactly(fh, length)
+
+
+def run_command(args, board, write_out, started=None):
+    # run the solver and pass its stdout to write_out() chunk by chunk;
+    # returns (returncode, stderr)
+    err = tempfile.TemporaryFile()
+    kw = {'stdin': subprocess.PIPE,
+          'stdout': subprocess.PIPE,
+          'stderr': err}
+    if os.name != 'nt':
+        kw['close_fds'] = True
+    try:
+        p = subprocess.Popen(args, **kw)
+    except OSError:
+        err.close()
+        return RETURNCODE_NOT_FOUND, b''
+    if started:
+        started(p.pid)
+    p.stdin.write(board)
+    p.stdin.close()
+    fd = p.stdout.fileno()
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            break
+        write_out(chunk)
+    p.stdout.close()
+    p.wait()
+    err.seek(0)
+    perr = err.read()
+    err.close()
+    return p.returncode, perr
+
+
+# ************************************************************************
+# * the worker side
+# ************************************************************************
+
+def worker_main():
+    if sys.version_info > (3,):
+        fin, fout = sys.stdin.buffer, sys.stdout.buffer
+    else:
+        fin, fout = sys.stdin, sys.stdout
+    if os.name == 'nt':
+        import msvcrt
+        msvcrt.setmode(fin.fileno(), os.O_BINARY)
+        msvcrt.setmode(fout.fileno(), os.O_BINARY)
+
+    def write_out(chunk):
+        write_frame(fout, b'o', chunk)
+        fout.flush()
+
+    def started(pid):
+        write_frame(fout, b'p', str(pid).encode('ascii'))
+        fout.flush()
+
+    while True:
+        try:
+            type_, data = read_frame(fin)
+        except EOFError:
+            # the pool was shut down
+            break
+        if type_ != b'q':
+            continue
+        request = json.loads(data.decode('utf-8'))
+        returncode, perr = run_command(
+            request['args'], request['board'].encode('utf-8'),
+            write_out, started)
+        write_frame(fout, b'e', perr)
+        write_frame(fout, b'x', str(returncode).encode('ascii'))
+        fout.flush()
+
+
+# ************************************************************************
+# * the application side
+# ************************************************************************
+
+class SolverWorker:
+    def __init__(self):
+        self.process = None
+
+    def start(self):
+        kw = {'stdin': subprocess.PIPE,
+              'stdout': subprocess.PIPE}
+        if os.name != 'nt':
+            kw['close_fds'] = True
+        # run as "python -m pysollib.solverpool"; running the file directly
+        # would put pysollib/ in sys.path and shadow stdlib modules
+        # (e.g. resource)
+        topdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        if env.get('PYTHONPATH'):
+            env['PYTHONPATH'] = topdir + os.pathsep + env['PYTHONPATH']
+        else:
+            env['PYTHONPATH'] = topdir
+        kw['env'] = env
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'pysollib.solverpool'], **kw)
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+        self.process.wait()
+        self.process = None
+
+    def isAlive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def request(self, args, board, write_out=None, started=None):
+        if not self.isAlive():
+            self.stop()
+            self.start()
+        p = self.process
+        data = json.dumps({'args': args, 'board': board}).encode('utf-8')
+        write_frame(p.stdin, b'q', data)
+        p.stdin.flush()
+        out, err = [], b''
+        while True:
+            type_, data = read_frame(p.stdout)
+            if type_ == b'o':
+                out.append(data)
+                if write_out:
+                    write_out(data)
+            elif type_ == b'p':
+                if started:
+                    started(int(data))
+            elif type_ == b'e':
+                err = data
+            elif type_ == b'x':
+                return int(data), b''.join(out), err
+
+
+class SolverPool:
+    def __init__(self, size=2):
+        self.size = size
+        self.cond = threading.Condition()
+        self.idle = []
+        self.workers = []
+        # frozen executables (py2exe & co.) can't run python modules
+        self.use_workers = not getattr(sys, 'frozen', False)
+
+    def _acquire(self):
+        with self.cond:
+            while not self.idle and len(self.workers) >= self.size:
+                self.cond.wait()
+            if self.idle:
+                return self.idle.pop()
+            worker = SolverWorker()
+            self.workers.append(worker)
+            return worker
+
+    def _release(self, worker):
+        with self.cond:
+            self.idle.append(worker)
+            self.cond.notify()
+
+    def run(self, args, board, write_out=None, started=None):
+        # returns (returncode, stdout, stderr); write_out(chunk) is called
+        # as the output arrives and started(pid) when the solver is
+        # running (e.g. to kill it)
+        args = [str(i) for i in args]
+        if not self.use_workers:
+            out = []
+
+            def _write_out(chunk):
+                out.append(chunk)
+                if write_out:
+                    write_out(chunk)
+            returncode, err = run_command(
+                args, board.encode('utf-8'), _write_out, started)
+            return returncode, b''.join(out), err
+        worker = self._acquire()
+        try:
+            try:
+                return worker.request(args, board, write_out, started)
+            except (EOFError, IOError, OSError, struct.error):
+                # the worker crashed; restart it and try once more
+                worker.stop()
+                try:
+                    return worker.request(args, board, write_out, started)
+                except (EOFError, IOError, OSError, struct.error):
+                    worker.stop()
+                    raise RuntimeError('Solver worker died')
+        finally:
+            self._release(worker)
+
+    def shutdown(self):
+        with self.cond:
+            for worker in self.workers:
+                worker.stop()
+            self.idle = list(self.workers)
+
+
+solver_pool = SolverPool()
+atexit.register(solver_pool.shutdown)
+
+
+if __name__ == '__main__':
+    worker_main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# imports
+import random
+
+# PySol imports
+from pysollib.util import KING
+
+# ************************************************************************
+# * In-process solver for Black Hole, All in a Row and Golf (used by
+# * BlackHoleSolver_Hint if black-hole-solve is not installed).
+# *
+# * Cards are played from the top of the columns to a single foundation
+# * (rank one up or down); in Golf a card may be dealt from the talon
+# * instead. The cards of a column never change, so the state is just
+# * (heights of the columns, rank on the foundation, dealt talon cards).
+# *
+# * The search is a depth-first search with a table of lost states. A
+# * plain DFS often gets stuck in a huge lost subtree after a bad first
+# * move, so the search is restarted with a growing budget and a slightly
+# * shuffled move order; the lost states are kept between the restarts.
+# ************************************************************************
+
+TALON = -1                      # move: deal a card from the talon
+
+
+class BlackHoleSolverIntractable(Exception):
+    pass
+
+
+class _Restart(Exception):
+    pass
+
+
+class BlackHoleSolver:
+    RESTART_ITERS = 200             # budget of the first run
+    RESTART_FACTOR = 1.5            # growth of the budget
+    NOISE = 3                       # shuffling of the move order
+
+    def __init__(self, columns, foundation=None, talon=(), wrap=True,
+                 king_is_blocked=False, max_iters=100000):
+        # columns: lists of ranks (bottom to top)
+        # foundation: rank of the top card, None if empty
+        # talon: ranks in deal order
+        self.columns = [tuple(c) for c in columns]
+        self.foundation = foundation
+        self.talon = tuple(talon)
+        self.king_is_blocked = king_is_blocked
+        self.max_iters = max_iters
+        self.iters = 0
+        self.moves = []                 # column index or TALON
+        self.dead = set()               # states known to be lost
+        self.neighbours = []
+        for r in range(13):
+            n = [x for x in (r-1, r+1) if 0 <= x < 13]
+            if wrap:
+                n = [x % 13 for x in (r-1, r+1)]
+            if king_is_blocked and r == KING:
+                # nothing may be played on a King
+                n = []
+            self.neighbours.append(tuple(n))
+
+    def solve(self):
+        # returns 'solved', 'unsolved' or 'intractable'
+        heights = [len(c) for c in self.columns]
+        counts = [0] * 13
+        for c in self.columns:
+            for r in c:
+                counts[r] += 1
+        self.iters = 0
+        self.dead = set()
+        # fixed seed: the same deal always gives the same solution
+        self.random = random.Random(0)
+        budget = self.RESTART_ITERS
+        try:
+            while True:
+                self.moves = []
+                self.counts = list(counts)
+                self.restart_iters = self.iters + budget
+                try:
+                    if self._search(list(heights), self.foundation, 0,
+                                    sum(heights)):
+                        return 'solved'
+                    return 'unsolved'
+                except _Restart:
+                    budget = int(budget * self.RESTART_FACTOR)
+        except BlackHoleSolverIntractable:
+            self.moves = []
+            return 'intractable'
+
+    def _isReachable(self, f, t):
+        # rank reachability pruning: every rank still in the columns must
+        # be reachable from the foundation (or from a talon card) through
+        # ranks still in the columns
+        counts = self.counts
+        seen = [False] * 13
+        todo = [f]
+        seen[f] = True
+        for r in self.talon[t:]:
+            if not seen[r]:
+                seen[r] = True
+                todo.append(r)
+        while todo:
+            r = todo.pop()
+            for n in self.neighbours[r]:
+                if not seen[n] and counts[n]:
+                    seen[n] = True
+                    todo.append(n)
+        for r in range(13):
+            if counts[r] and not seen[r]:
+                return False
+        return True
+
+    def _search(self, heights, f, t, remaining):
+        if remaining == 0:
+            return True
+        key = (tuple(heights), f, t)
+        if key in self.dead:
+            return False
+        self.iters += 1
+        if self.iters > self.max_iters:
+            raise BlackHoleSolverIntractable()
+        if self.iters > self.restart_iters:
+            raise _Restart()
+        if f is not None and not self._isReachable(f, t):
+            self.dead.add(key)
+            return False
+        if f is None:
+            targets = range(13)
+        else:
+            targets = self.neighbours[f]
+        # play from the highest columns first (more or less)
+        columns = []
+        for i, h in enumerate(heights):
+            if h and self.columns[i][h-1] in targets:
+                columns.append((self.random.random() * self.NOISE - h, i))
+        columns.sort()
+        for x, i in columns:
+            h = heights[i]
+            r = self.columns[i][h-1]
+            heights[i] = h - 1
+            self.counts[r] -= 1
+            self.moves.append(i)
+            if self._search(heights, r, t, remaining - 1):
+                return True
+            self.moves.pop()
+            self.counts[r] += 1
+            heights[i] = h
+        if t < len(self.talon):
+            self.moves.append(TALON)
+            if self._search(heights, self.talon[t], t + 1, remaining):
+                return True
+            self.moves.pop()
+        self.dead.add(key)
+        return False
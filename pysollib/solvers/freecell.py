@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# imports
+import heapq
+import random
+
+# ************************************************************************
+# * In-process solver for FreeCell, Baker's Game, Beleaguered Castle and
+# * the other games that use FreeCellSolverWrapper (used by
+# * FreeCellSolver_Hint if fc-solve is not installed).
+# *
+# * The game is described by the fc-solve options:
+# *   sbb:    sequences are built by 'alternate_color', 'suit' or 'rank'
+# *   sm:     sequence move 'limited' (by the free cells and the empty
+# *           columns) or 'unlimited'
+# *   esf:    empty stacks are filled by 'all', 'kings' or 'none'
+# *   preset: a fc-solve preset (see PRESETS)
+# *
+# * A card is an int (suit * 13 + rank), a column is a tuple of cards
+# * (bottom to top). The search is a weighted A* over the positions;
+# * positions are identified by a Zobrist hash that does not depend on
+# * the order of the columns and the free cells, and the transposition
+# * table (hash -> number of moves) is bounded by max_states.
+# ************************************************************************
+
+# the moves
+FOUNDATION = None               # dest: the foundations
+ROW = 'rows'                    # ('rows', index)
+FREECELL = 'reserves'           # ('reserves', index)
+
+PRESETS = {
+    'bakers_dozen': {'sbb': 'rank', 'esf': 'none'},
+    'bakers_game': {'sbb': 'suit'},
+    'beleaguered_castle': {'sbb': 'rank'},
+    'cruel': {'sbb': 'suit', 'esf': 'none'},
+    'der_katzenschwanz': {'sm': 'unlimited', 'esf': 'none'},
+    'die_schlange': {'esf': 'none'},
+    'eight_off': {'sbb': 'suit', 'esf': 'kings'},
+    'fan': {'sbb': 'suit', 'esf': 'kings'},
+    'forecell': {'esf': 'kings'},
+    'freecell': {},
+    'good_measure': {'sbb': 'rank', 'esf': 'none'},
+    'kings_only_bakers_game': {'sbb': 'suit', 'esf': 'kings'},
+    'relaxed_freecell': {'sm': 'unlimited'},
+    'relaxed_seahaven_towers': {'sbb': 'suit', 'esf': 'kings',
+                                'sm': 'unlimited'},
+    'seahaven_towers': {'sbb': 'suit', 'esf': 'kings'},
+    'streets_and_alleys': {'sbb': 'rank'},
+    }
+
+KING = 12
+EMPTY = 52                      # an empty free cell
+
+
+class FreeCellSolverUnsupported(Exception):
+    pass
+
+
+class FreeCellSolver:
+    WEIGHT = 5                      # weight of the heuristic (A*: 1)
+
+    def __init__(self, columns, freecells, foundations, decks=1,
+                 sbb='alternate_color', sm='limited', esf='all',
+                 preset=None, max_iters=100000, max_states=1000000):
+        # columns: lists of (suit, rank) (bottom to top)
+        # freecells: (suit, rank) or None for every free cell
+        # foundations: number of cards on the foundations for every suit
+        #              (a list of decks values per suit)
+        if preset is not None:
+            if preset not in PRESETS:
+                raise FreeCellSolverUnsupported(preset)
+            kw = {'sbb': sbb, 'sm': sm, 'esf': esf}
+            kw.update(PRESETS[preset])
+            sbb, sm, esf = kw['sbb'], kw['sm'], kw['esf']
+        if sbb not in ('alternate_color', 'suit', 'rank'):
+            raise FreeCellSolverUnsupported(sbb)
+        self.sbb, self.sm, self.esf = sbb, sm, esf
+        self.decks = decks
+        self.max_iters = max_iters
+        self.max_states = max_states
+        self.columns = [tuple([s * 13 + r for s, r in c])
+                        for c in columns]
+        self.freecells = tuple([EMPTY if c is None else c[0] * 13 + c[1]
+                                for c in freecells])
+        self.foundations = tuple([foundations[s][d]
+                                  for s in range(4) for d in range(decks)])
+        self.iters = 0
+        self.states = 0
+        self.depth = 0
+        self.moves = []
+        self._initTables()
+
+    def _initTables(self):
+        # cards that may be built on a card (sbb)
+        self.accepts = []
+        for c in range(52):
+            s, r = divmod(c, 13)
+            a = set()
+            if r > 0:
+                for s1 in range(4):
+                    if self.sbb == 'rank' or \
+                       (self.sbb == 'suit' and s1 == s) or \
+                       (self.sbb == 'alternate_color' and
+                            (s1 & 2) != (s & 2)):
+                        a.add(s1 * 13 + r - 1)
+            self.accepts.append(a)
+        # Zobrist keys
+        rnd = random.Random(0)
+        depth = max([len(c) for c in self.columns] + [0]) + 14
+        self.zcolumn = [[rnd.getrandbits(64) for c in range(52)]
+                        for i in range(depth)]
+        self.zfreecell = [rnd.getrandbits(64) for c in range(52)]
+        self.zfreecell.append(0)        # EMPTY
+        # the columns repeat a lot: cache their hash and heuristic
+        self.column_cache = {}
+        self.foundation_cache = {}
+
+    #
+    # hashing
+    #
+
+    def _columnInfo(self, col):
+        # returns (hash, heuristic) of a column
+        info = self.column_cache.get(col)
+        if info is not None:
+            return info
+        z = self.zcolumn
+        h = 0
+        for i, c in enumerate(col):
+            h ^= z[i][c]
+        # the cards to move, plus the cards that lie on a lower card of
+        # the same suit (they have to be moved at least twice)
+        n = len(col)
+        low = [13] * 4
+        for c in col:
+            s, r = divmod(c, 13)
+            if r > low[s]:
+                n += 1
+            else:
+                low[s] = r
+        info = self.column_cache[col] = (h, n)
+        return info
+
+    #
+    # rules
+    #
+
+    def _foundationInfo(self, foundations):
+        # returns {card: (index of the foundation, safe)} for the cards
+        # that may be moved to the foundations
+        info = self.foundation_cache.get(foundations)
+        if info is not None:
+            return info
+        decks = self.decks
+        low = [min(foundations[s*decks:(s+1)*decks]) for s in range(4)]
+        info = {}
+        for d, r in enumerate(foundations):
+            if r >= 13:
+                continue
+            c = (d // decks) * 13 + r
+            if c in info:
+                continue
+            # a card may be moved to the foundations automatically if no
+            # card can be built on it anymore
+            safe = r <= 1
+            if not safe:
+                safe = True
+                for c1 in self.accepts[c]:
+                    if low[c1 // 13] < r:
+                        safe = False
+                        break
+            info[c] = (d, safe)
+        self.foundation_cache[foundations] = info
+        return info
+
+    def _canFillEmpty(self, c):
+        esf = self.esf
+        return esf == 'all' or (esf == 'kings' and c % 13 == KING)
+
+    def _maxMove(self, freecells, columns, to_empty):
+        if self.sm == 'unlimited':
+            return 52 * self.decks
+        n = freecells.count(EMPTY) + 1
+        if self.esf == 'all':
+            empty = 0
+            for col in columns:
+                if not col:
+                    empty += 1
+            if to_empty:
+                empty -= 1
+            n <<= max(empty, 0)
+        return n
+
+    def _sequenceLength(self, col):
+        # length of the sequence on top of a column
+        accepts = self.accepts
+        n = 1
+        i = len(col) - 1
+        while i > 0 and col[i] in accepts[col[i-1]]:
+            n += 1
+            i -= 1
+        return n
+
+    def _evaluate(self, columns, freecells):
+        # returns (hash, heuristic) of a position
+        zfreecell = self.zfreecell
+        h, n = 0, 0
+        for c in freecells:
+            if c != EMPTY:
+                h += zfreecell[c]
+                n += 2
+        info = self._columnInfo
+        for col in columns:
+            ch, cn = info(col)
+            h += ch
+            n += cn
+        return h & 0xFFFFFFFFFFFFFFFF, n
+
+    #
+    # search
+    #
+
+    def _autoMoves(self, columns, freecells, foundations, moves):
+        # play the safe moves to the foundations
+        changed = True
+        while changed:
+            changed = False
+            info = self._foundationInfo(foundations)
+            for i, c in enumerate(freecells):
+                if c not in info:
+                    continue
+                d, safe = info[c]
+                if safe:
+                    freecells = freecells[:i] + (EMPTY,) + freecells[i+1:]
+                    foundations = (foundations[:d] + (foundations[d] + 1,) +
+                                   foundations[d+1:])
+                    moves.append((1, (FREECELL, i), FOUNDATION))
+                    info = self._foundationInfo(foundations)
+                    changed = True
+            for i, col in enumerate(columns):
+                while col:
+                    c = col[-1]
+                    if c not in info or not info[c][1]:
+                        break
+                    d = info[c][0]
+                    col = col[:-1]
+                    foundations = (foundations[:d] + (foundations[d] + 1,) +
+                                   foundations[d+1:])
+                    moves.append((1, (ROW, i), FOUNDATION))
+                    info = self._foundationInfo(foundations)
+                    changed = True
+                columns[i] = col
+        return freecells, foundations
+
+    def _children(self, columns, freecells, foundations):
+        # yields (columns, freecells, foundations, move)
+        # to the foundations
+        info = self._foundationInfo(foundations)
+        for i, c in enumerate(freecells):
+            if c in info:
+                d = info[c][0]
+                f = foundations[:d] + (foundations[d] + 1,) + foundations[d+1:]
+                yield (columns, freecells[:i] + (EMPTY,) + freecells[i+1:],
+                       f, (1, (FREECELL, i), FOUNDATION))
+        for i, col in enumerate(columns):
+            if col and col[-1] in info:
+                d = info[col[-1]][0]
+                f = foundations[:d] + (foundations[d] + 1,) + foundations[d+1:]
+                cols = list(columns)
+                cols[i] = col[:-1]
+                yield cols, freecells, f, (1, (ROW, i), FOUNDATION)
+        # from the free cells to the columns
+        for i, c in enumerate(freecells):
+            if c == EMPTY:
+                continue
+            fc = freecells[:i] + (EMPTY,) + freecells[i+1:]
+            empty_done = False
+            for j, col in enumerate(columns):
+                if col:
+                    if c not in self.accepts[col[-1]]:
+                        continue
+                elif empty_done or not self._canFillEmpty(c):
+                    continue
+                else:
+                    empty_done = True
+                cols = list(columns)
+                cols[j] = col + (c,)
+                yield cols, fc, foundations, (1, (FREECELL, i), (ROW, j))
+        # from a column to a column
+        max_move = self._maxMove(freecells, columns, False)
+        max_move_empty = self._maxMove(freecells, columns, True)
+        for i, col in enumerate(columns):
+            if not col:
+                continue
+            seq = self._sequenceLength(col)
+            empty_done = False
+            for j, col1 in enumerate(columns):
+                if i == j:
+                    continue
+                if col1:
+                    top = col1[-1]
+                    # the card of the sequence that fits on col1
+                    for n in range(1, seq + 1):
+                        if col[-n] in self.accepts[top]:
+                            break
+                    else:
+                        continue
+                    if n > max_move:
+                        continue
+                    lengths = (n,)
+                else:
+                    if empty_done:
+                        continue
+                    empty_done = True
+                    m = min(seq, max_move_empty)
+                    if m == len(col):
+                        # don't move a whole column to an empty column
+                        m -= 1
+                    lengths = [n for n in range(1, m + 1)
+                               if self._canFillEmpty(col[-n])]
+                for n in lengths:
+                    cols = list(columns)
+                    cols[i] = col[:-n]
+                    cols[j] = col1 + col[-n:]
+                    yield cols, freecells, foundations, (n, (ROW, i), (ROW, j))
+        # from a column to a free cell
+        if EMPTY in freecells:
+            i = freecells.index(EMPTY)
+            for j, col in enumerate(columns):
+                if not col:
+                    continue
+                fc = freecells[:i] + col[-1:] + freecells[i+1:]
+                cols = list(columns)
+                cols[j] = col[:-1]
+                yield cols, fc, foundations, (1, (ROW, j), (FREECELL, i))
+
+    def solve(self, callback=None):
+        # returns 'solved', 'unsolved' or 'intractable';
+        # callback(solver) is called every 100 iterations, the search
+        # is stopped if it returns True
+        self.iters = 0
+        self.moves = []
+        ncards = 52 * self.decks
+        columns = list(self.columns)
+        moves = []
+        freecells, foundations = self._autoMoves(
+            columns, self.freecells, self.foundations, moves)
+        key, h = self._evaluate(columns, freecells)
+        seen = {key: 0}
+        self.states = 1
+        # nodes: (columns, freecells, foundations, g, parent, moves)
+        node = (columns, freecells, foundations, len(moves), None, moves)
+        todo = [(self.WEIGHT * h, 0, node)]
+        counter = 1
+        while todo:
+            f, x, node = heapq.heappop(todo)
+            columns, freecells, foundations, g, parent, moves = node
+            if sum(foundations) == ncards:
+                self._getSolution(node)
+                return 'solved'
+            self.iters += 1
+            if self.iters > self.max_iters:
+                return 'intractable'
+            if callback and self.iters % 100 == 0:
+                self.depth = g
+                if callback(self):
+                    return 'intractable'
+            for cols, fc, fd, move in self._children(
+                    columns, freecells, foundations):
+                cmoves = [move]
+                cols = list(cols)
+                fc, fd = self._autoMoves(cols, fc, fd, cmoves)
+                key, h = self._evaluate(cols, fc)
+                cg = g + len(cmoves)
+                old = seen.get(key)
+                if old is not None and old <= cg:
+                    continue
+                if old is None and self.states >= self.max_states:
+                    # the table is full
+                    continue
+                if old is None:
+                    self.states += 1
+                seen[key] = cg
+                heapq.heappush(todo, (cg + self.WEIGHT * h, counter,
+                                      (cols, fc, fd, cg, node, cmoves)))
+                counter += 1
+        if self.states >= self.max_states:
+            return 'intractable'
+        return 'unsolved'
+
+    def _getSolution(self, node):
+        moves = []
+        while node is not None:
+            moves[:0] = node[5]
+            node = node[4]
+        self.moves = moves
+        self.depth = len(moves)
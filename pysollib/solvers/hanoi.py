@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# ************************************************************************
+# * Tower of Hanoi solver (used by TowerOfHanoy_Hint).
+# *
+# * With three pegs the shortest solution from any legal position is
+# * known: the largest disk that is not on the target peg must go
+# * there, so all the smaller disks first go to the third peg, and then
+# * form a tower which is moved onto the target peg.
+# *
+# * With more pegs, a tower is moved with the Frame-Stewart algorithm:
+# * the m smallest disks go to a spare peg using all the pegs, the
+# * others go to the target peg without this spare peg, then the m
+# * disks follow them. This is only done when all the disks are in one
+# * tower; for other positions no solution is returned.
+# *
+# * A position where a larger disk lies on a smaller one (the dealt
+# * Tower of Hanoy) is solved by a breadth-first search.
+# ************************************************************************
+
+
+_frame_stewart_cache = {}
+
+
+def getFrameStewartCount(n, npegs):
+    # returns the number of moves to move a tower of n disks and the
+    # number of disks to put aside first
+    key = (n, npegs)
+    if key in _frame_stewart_cache:
+        return _frame_stewart_cache[key]
+    if n == 0:
+        ret = (0, 0)
+    elif npegs == 3:
+        ret = (2**n - 1, n - 1)
+    else:
+        ret = None
+        for m in range(n):
+            count = 2 * getFrameStewartCount(m, npegs)[0] + \
+                getFrameStewartCount(n - m, npegs - 1)[0]
+            if ret is None or count < ret[0]:
+                ret = (count, m)
+    _frame_stewart_cache[key] = ret
+    return ret
+
+
+def _moveTower(n, src, dest, pegs, moves):
+    # move the n smallest disks from src to dest using pegs
+    if n == 0:
+        return
+    m = getFrameStewartCount(n, len(pegs))[1]
+    if n == 1:
+        moves.append((src, dest))
+        return
+    spare = [p for p in pegs if p not in (src, dest)][0]
+    if len(pegs) == 3:
+        _moveTower(m, src, spare, pegs, moves)
+        moves.append((src, dest))
+        _moveTower(m, spare, dest, pegs, moves)
+        return
+    _moveTower(m, src, spare, pegs, moves)
+    _moveTower(n - m, src, dest, [p for p in pegs if p != spare], moves)
+    _moveTower(m, spare, dest, pegs, moves)
+
+
+def _move3(pos, n, dest, moves):
+    # move the n smallest disks to dest with three pegs; pos[d] is the
+    # peg of disk d (the smallest disk is 0)
+    for d in range(n - 1, -1, -1):
+        if pos[d] != dest:
+            other = 3 - pos[d] - dest
+            _move3(pos, d, other, moves)
+            moves.append((pos[d], dest))
+            _moveTower(d, other, dest, [0, 1, 2], moves)
+            return
+
+
+def getHanoiMoves(pegs, dest):
+    # pegs: the disk sizes on each peg, from the bottom
+    # dest: the target peg
+    # returns the (from, to) pegs of a shortest solution, or None
+    disks = []
+    for i, peg in enumerate(pegs):
+        for j in range(1, len(peg)):
+            if peg[j-1] <= peg[j]:
+                # a larger disk on a smaller one
+                return None
+        disks.extend([(size, i) for size in peg])
+    disks.sort()
+    pos = [i for size, i in disks]
+    moves = []
+    if len(pegs) == 3:
+        _move3(pos, len(pos), dest, moves)
+        return moves
+    towers = [i for i in range(len(pegs)) if pegs[i]]
+    if len(towers) > 1:
+        return None
+    if towers and towers[0] != dest:
+        _moveTower(len(pos), towers[0], dest, list(range(len(pegs))),
+                   moves)
+    return moves
+
+
+def searchHanoiMoves(pegs, isWon, max_states=100000):
+    # pegs: the disk sizes on each peg, from the bottom
+    # isWon: tells whether a position (a tuple of tuples) is won
+    # returns the (from, to) pegs of a shortest solution, or None
+    start = tuple([tuple(peg) for peg in pegs])
+    parents = {start: None}
+    positions = [start]
+    while positions:
+        next_positions = []
+        for pos in positions:
+            if isWon(pos):
+                moves = []
+                while parents[pos] is not None:
+                    pos, move = parents[pos]
+                    moves.append(move)
+                moves.reverse()
+                return moves
+            for i, src in enumerate(pos):
+                if not src:
+                    continue
+                for j, dest in enumerate(pos):
+                    if i == j or (dest and dest[-1] < src[-1]):
+                        continue
+                    new = list(pos)
+                    new[i] = src[:-1]
+                    new[j] = dest + src[-1:]
+                    new = tuple(new)
+                    if new not in parents:
+                        parents[new] = (pos, (i, j))
+                        next_positions.append(new)
+        if len(parents) > max_states:
+            return None
+        positions = next_positions
+    return None
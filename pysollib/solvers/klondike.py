@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# ************************************************************************
+# * Solver for Klondike and the other games with a waste, a talon and
+# * one deck (used by KlondikeSolver_Hint).
+# *
+# * The solver plays "Thoughtful Solitaire": the face-down cards are
+# * known. The game is described by:
+# *   sbb:      sequences are built by 'alternate_color', 'suit',
+# *             'rank' or 'any_suit_but_own'
+# *   esf:      empty rows are filled by 'all', 'kings' or 'none'
+# *   max_move: the number of cards that may be moved at once
+# *   num_deal, max_rounds: as in WasteTalonStack
+# *
+# * A card is an int (suit * 13 + rank), plus HIDDEN if it is face-down.
+# * The cards of the waste and the talon keep their order for the whole
+# * game, so they are kept in one list (the stock: the waste from the
+# * bottom, then the talon from the top); the waste is the part of the
+# * stock before the cursor. A position is (rows, foundations, bitmask
+# * of the stock cards left, cursor, round); the table of the visited
+# * positions uses the sorted rows, the foundations are not needed.
+# *
+# * The deals are not searched one by one: every card of the stock that
+# * can be reached by dealing (and redealing) is a move of its own (the
+# * deals, then the move of the card). A card is dealt as soon as the
+# * waste is empty (as Game._autoDeal does), the face-down cards are
+# * turned over at once and the cards that nothing can be built on any
+# * more go to the foundations. The cards are not moved back from the
+# * foundations. As in the Black Hole solver, the depth-first search is
+# * restarted with a growing budget and a slightly shuffled move order.
+# ************************************************************************
+
+# imports
+import random
+
+# the moves
+FOUNDATION = None               # dest: the foundations
+ROW = 'rows'                    # ('rows', index)
+WASTE = 'waste'                 # ('waste', 0)
+TALON = 'talon'                 # (0, ('talon', 0), None): deal or redeal
+
+KING = 12
+HIDDEN = 64                     # a face-down card
+UNLIMITED_MOVES = 999999
+
+
+class KlondikeSolverIntractable(Exception):
+    pass
+
+
+class _Restart(Exception):
+    pass
+
+
+class KlondikeSolver:
+    RESTART_ITERS = 200             # budget of the first run
+    RESTART_FACTOR = 1.5            # growth of the budget
+    NOISE = 1                       # shuffling of the move order
+    MAX_DEPTH = 500                 # the search is recursive
+
+    def __init__(self, rows, stock, cursor, foundations,
+                 sbb='alternate_color', esf='kings',
+                 max_move=UNLIMITED_MOVES, num_deal=1, max_rounds=-1,
+                 round=1, max_iters=100000, max_states=1000000):
+        # rows: lists of (suit, rank, face_up) (bottom to top)
+        # stock: (suit, rank) of the waste (bottom to top), then of the
+        #        talon (top to bottom)
+        # cursor: the number of cards in the waste
+        # foundations: number of cards on the foundations for every suit
+        self.sbb, self.esf, self.max_move = sbb, esf, max_move
+        self.num_deal, self.max_rounds = num_deal, max_rounds
+        if max_rounds < 0:
+            # the round does not matter
+            round = 0
+        self.max_iters = max_iters
+        self.max_states = max_states
+        self.rows = tuple([tuple([s * 13 + r + (not face_up) * HIDDEN
+                                  for s, r, face_up in row])
+                           for row in rows])
+        self.stock = [s * 13 + r for s, r in stock]
+        self.mask = (1 << len(stock)) - 1
+        self.cursor = cursor
+        self.round = round
+        self.foundations = tuple(foundations)
+        self.iters = 0
+        self.states = 0
+        self.depth = 0
+        self.moves = []
+        self._initTables()
+
+    def _initTables(self):
+        # cards that may be built on a card (sbb)
+        self.accepts = []
+        for c in range(52):
+            s, r = divmod(c, 13)
+            a = set()
+            if r > 0:
+                for s1 in range(4):
+                    if self.sbb == 'rank' or \
+                       (self.sbb == 'suit' and s1 == s) or \
+                       (self.sbb == 'alternate_color' and
+                            (s1 & 2) != (s & 2)) or \
+                       (self.sbb == 'any_suit_but_own' and s1 != s):
+                        a.add(s1 * 13 + r - 1)
+            self.accepts.append(a)
+        # the rows repeat a lot: cache their encoding
+        self.row_cache = {}
+
+    #
+    # the stock
+    #
+
+    def _deal(self, mask, cursor, round):
+        # returns (cursor, round) after a click on the talon, or None
+        talon = mask >> cursor << cursor
+        if not talon:
+            if not mask & ((1 << cursor) - 1) or round == self.max_rounds:
+                return None
+            # redeal (and deal at once)
+            talon = mask
+            if self.max_rounds >= 0:
+                round += 1
+        for i in range(self.num_deal):
+            if not talon:
+                break
+            low = talon & -talon
+            cursor = low.bit_length()
+            talon ^= low
+        return cursor, round
+
+    def _getStockCards(self, mask, cursor, round):
+        # yields (number of clicks on the talon, card index, cursor, round)
+        # for every card that can be put on top of the waste
+        done = set()
+        deals = 0
+        while True:
+            waste = mask & ((1 << cursor) - 1)
+            if waste:
+                top = waste.bit_length() - 1
+                if top in done:
+                    return
+                done.add(top)
+                yield deals, top, cursor, round
+            new = self._deal(mask, cursor, round)
+            if new is None:
+                return
+            cursor, round = new
+            deals += 1
+
+    #
+    # rules
+    #
+
+    def _canFillEmpty(self, c):
+        esf = self.esf
+        return esf == 'all' or (esf == 'kings' and c % 13 == KING)
+
+    def _isSafe(self, c, foundations):
+        # no card can be built on c any more
+        r = c % 13
+        if r <= 1:
+            return True
+        for c1 in self.accepts[c]:
+            if foundations[c1 // 13] < r:
+                return False
+        return True
+
+    def _sequenceLength(self, col):
+        # length of the face-up sequence on top of a row
+        accepts = self.accepts
+        n = 1
+        i = len(col) - 1
+        while i > 0 and col[i-1] < HIDDEN and col[i] in accepts[col[i-1]]:
+            n += 1
+            i -= 1
+        return n
+
+    def _finishMove(self, rows, foundations, mask, cursor, round, moves):
+        # turn over the face-down cards, play the safe moves to the
+        # foundations and deal if the waste is empty; returns the position
+        rows = list(rows)
+        foundations = list(foundations)
+        changed = True
+        while changed:
+            changed = False
+            for i, col in enumerate(rows):
+                if col and col[-1] >= HIDDEN:
+                    col = rows[i] = col[:-1] + (col[-1] - HIDDEN,)
+                while col:
+                    c = col[-1]
+                    if foundations[c // 13] != c % 13 or \
+                            not self._isSafe(c, foundations):
+                        break
+                    col = rows[i] = col[:-1]
+                    foundations[c // 13] += 1
+                    moves.append((1, (ROW, i), FOUNDATION))
+                    changed = True
+                    if col and col[-1] >= HIDDEN:
+                        col = rows[i] = col[:-1] + (col[-1] - HIDDEN,)
+            waste = mask & ((1 << cursor) - 1)
+            if not waste and mask >> cursor:
+                cursor = self._deal(mask, cursor, round)[0]
+                waste = mask & ((1 << cursor) - 1)
+            if waste:
+                top = waste.bit_length() - 1
+                c = self.stock[top]
+                if foundations[c // 13] == c % 13 and \
+                        self._isSafe(c, foundations):
+                    mask &= ~(1 << top)
+                    foundations[c // 13] += 1
+                    moves.append((1, (WASTE, 0), FOUNDATION))
+                    changed = True
+        cursor = (mask & ((1 << cursor) - 1)).bit_length()
+        return tuple(rows), tuple(foundations), mask, cursor, round
+
+    def _getKey(self, rows, mask, cursor, round):
+        cache = self.row_cache
+        encoded = []
+        for col in rows:
+            e = cache.get(col)
+            if e is None:
+                e = cache[col] = bytes(bytearray(col))
+            encoded.append(e)
+        encoded.sort()
+        return (b'\xff'.join(encoded), mask, cursor, round)
+
+    def _getMoves(self, rows, foundations, mask, cursor, round):
+        # returns a list of (score, moves, rows, foundations, mask,
+        # cursor, round); the best moves have the lowest score
+        accepts = self.accepts
+        ret = []
+        # only the first empty row is used
+        empty = None
+        for i, col in enumerate(rows):
+            if not col:
+                empty = i
+                break
+        # from the rows
+        for i, col in enumerate(rows):
+            if not col:
+                continue
+            c = col[-1]
+            if foundations[c // 13] == c % 13:
+                f = list(foundations)
+                f[c // 13] += 1
+                ret.append((0, [(1, (ROW, i), FOUNDATION)],
+                            rows[:i] + (col[:-1],) + rows[i+1:], tuple(f),
+                            mask, cursor, round))
+            seq = self._sequenceLength(col)
+            hidden = len([c for c in col if c >= HIDDEN])
+            for j, col1 in enumerate(rows):
+                if i == j:
+                    continue
+                if col1:
+                    top = col1[-1]
+                    for n in range(1, seq + 1):
+                        if col[-n] in accepts[top]:
+                            break
+                    else:
+                        continue
+                elif j != empty:
+                    continue
+                else:
+                    n = seq
+                    if n == len(col) or not self._canFillEmpty(col[-n]):
+                        continue
+                if n > self.max_move:
+                    continue
+                if n < seq and n < self.max_move:
+                    # only to play the uncovered card to the foundations
+                    c = col[-n-1]
+                    if foundations[c // 13] != c % 13:
+                        continue
+                if n == len(col):
+                    score = 3
+                elif col[-n-1] >= HIDDEN:
+                    # turn over a card; the longest rows first
+                    score = 1 - hidden / 100.0
+                else:
+                    score = 4
+                r = list(rows)
+                r[i] = col[:-n]
+                r[j] = col1 + col[-n:]
+                ret.append((score, [(n, (ROW, i), (ROW, j))], tuple(r),
+                            foundations, mask, cursor, round))
+        # from the stock
+        for deals, top, cur, rnd in self._getStockCards(mask, cursor, round):
+            c = self.stock[top]
+            m = mask & ~(1 << top)
+            deal = [(0, (TALON, 0), None)] * deals
+            score = 2 + deals / 100.0
+            if foundations[c // 13] == c % 13:
+                f = list(foundations)
+                f[c // 13] += 1
+                ret.append((deals / 100.0,
+                            deal + [(1, (WASTE, 0), FOUNDATION)],
+                            rows, tuple(f), m, cur, rnd))
+            for j, col1 in enumerate(rows):
+                if col1:
+                    if c not in accepts[col1[-1]]:
+                        continue
+                elif j != empty or not self._canFillEmpty(c):
+                    continue
+                r = rows[:j] + (col1 + (c,),) + rows[j+1:]
+                ret.append((score, deal + [(1, (WASTE, 0), (ROW, j))], r,
+                            foundations, m, cur, rnd))
+        rand, noise = self.random.random, self.NOISE
+        ret.sort(key=lambda m: m[0] + rand() * noise)
+        return ret
+
+    #
+    # search
+    #
+
+    def solve(self, callback=None):
+        # returns 'solved', 'unsolved' or 'intractable';
+        # callback(solver) is called every 100 iterations, the search
+        # is stopped if it returns True
+        self.iters = 0
+        self.depth = 0
+        self.callback = callback
+        # fixed seed: the same deal always gives the same solution
+        self.random = random.Random(0)
+        moves = []
+        pos = self._finishMove(self.rows, self.foundations, self.mask,
+                               self.cursor, self.round, moves)
+        budget = self.RESTART_ITERS
+        try:
+            while True:
+                self.moves = moves[:]
+                self.seen = set()
+                self.states = 0
+                self.too_deep = False
+                self.restart_iters = self.iters + budget
+                try:
+                    if self._search(pos, 0):
+                        self.depth = len(self.moves)
+                        return 'solved'
+                    break
+                except _Restart:
+                    budget = int(budget * self.RESTART_FACTOR)
+        except KlondikeSolverIntractable:
+            self.moves = []
+            return 'intractable'
+        self.moves = []
+        if self.states >= self.max_states or self.too_deep:
+            return 'intractable'
+        return 'unsolved'
+
+    def _search(self, pos, depth):
+        rows, foundations, mask, cursor, round = pos
+        if sum(foundations) == 52:
+            return True
+        if depth >= self.MAX_DEPTH:
+            self.too_deep = True
+            return False
+        key = self._getKey(rows, mask, cursor, round)
+        if key in self.seen:
+            return False
+        if self.states < self.max_states:
+            self.seen.add(key)
+            self.states += 1
+        self.iters += 1
+        if self.iters > self.max_iters:
+            raise KlondikeSolverIntractable()
+        if self.iters > self.restart_iters:
+            raise _Restart()
+        if self.callback and self.iters % 100 == 0:
+            self.depth = len(self.moves)
+            if self.callback(self):
+                raise KlondikeSolverIntractable()
+        for move in self._getMoves(rows, foundations, mask, cursor, round):
+            n = len(self.moves)
+            self.moves.extend(move[1])
+            new = self._finishMove(move[2], move[3], move[4], move[5],
+                                   move[6], self.moves)
+            if self._search(new, depth + 1):
+                return True
+            del self.moves[n:]
+        return False
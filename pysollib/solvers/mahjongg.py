@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# imports
+import random
+
+# ************************************************************************
+# * Solvable Mahjongg deals (used by AbstractMahjonggGame).
+# *
+# * A deal is built by playing the game backwards: the pairs are put on
+# * the board one by one, each pair on two positions where both tiles
+# * are free. Removing the pairs in the reverse order solves the deal.
+# *
+# * The positions are numbered 0..n-1 and the blockmaps are bitsets.
+# * The layout is computed once per layout (see
+# * AbstractMahjonggGame.getLayout).
+# * A few rules keep the backward play out of dead ends:
+# *   - a tile is only put on a position if the tiles below are there
+# *   - no empty position is left between two tiles of a row
+# *   - the positions with the longest chains of empty positions behind
+# *     them (above, or further along the row) are filled first, so that
+# *     the last pairs still have a choice
+# * The few dead ends left are handled by backtracking (with a budget,
+# * then the backward play is restarted).
+# ************************************************************************
+
+
+def _mask(positions):
+    m = 0
+    for i in positions:
+        m |= 1 << i
+    return m
+
+
+class MahjonggLayout:
+    def __init__(self, above, below, left, right, all_left, all_right):
+        # one tuple of positions per position
+        self.npos = len(above)
+        self.above_list = tuple([tuple(a) for a in above])
+        self.below_list = tuple([tuple(a) for a in below])
+        self.left_list = tuple([tuple(a) for a in left])
+        self.right_list = tuple([tuple(a) for a in right])
+        self.all_left_list = tuple([tuple(a) for a in all_left])
+        self.all_right_list = tuple([tuple(a) for a in all_right])
+        self.above = [_mask(a) for a in above]
+        self.below = [_mask(a) for a in below]
+        self.left = [_mask(a) for a in left]
+        self.right = [_mask(a) for a in right]
+        self.all_left = [_mask(a) for a in all_left]
+        self.all_right = [_mask(a) for a in all_right]
+
+    @classmethod
+    def fromTiles(cls, tiles):
+        # tiles: the (level, tx, ty) of each position; a tile covers
+        # 2x2 cells of its level
+        tilemap = {}
+        for i, (level, tx, ty) in enumerate(tiles):
+            for cell in ((level, tx, ty), (level, tx+1, ty),
+                         (level, tx, ty+1), (level, tx+1, ty+1)):
+                # sanity check - assert that there are no overlapping tiles
+                assert cell not in tilemap
+                tilemap[cell] = i
+
+        def neighbours(cells):
+            ret = []
+            for cell in cells:
+                i = tilemap.get(cell)
+                if i is not None and i not in ret:
+                    ret.append(i)
+            return ret
+
+        above, below, left, right = [], [], [], []
+        for level, tx, ty in tiles:
+            cells = ((tx, ty), (tx+1, ty), (tx, ty+1), (tx+1, ty+1))
+            above.append(neighbours([(level+1, x, y) for x, y in cells]))
+            below.append(neighbours([(tl, x, y) for tl in range(level)
+                                     for x, y in cells]))
+            left.append(neighbours([(level, tx-1, ty), (level, tx-1, ty+1)]))
+            right.append(neighbours([(level, tx+2, ty),
+                                     (level, tx+2, ty+1)]))
+        return cls(above, below, left, right,
+                   cls._closure(left), cls._closure(right))
+
+    @staticmethod
+    def _closure(neighbours):
+        # all the positions reachable in one direction
+        ret = [None] * len(neighbours)
+
+        def get(i):
+            if ret[i] is None:
+                s = set(neighbours[i])
+                for j in neighbours[i]:
+                    s.update(get(j))
+                ret[i] = sorted(s)
+            return ret[i]
+        for i in range(len(neighbours)):
+            get(i)
+        return ret
+
+    def isFree(self, i, board):
+        # can the tile on position i be removed ?
+        if self.above[i] & board:
+            return False
+        return not (self.left[i] & board) or not (self.right[i] & board)
+
+    def getHeights(self, used):
+        # length of the longest tower of used positions above each position
+        heights = [None] * self.npos
+
+        def height(i):
+            if heights[i] is None:
+                h = 0
+                for a in self.above_list[i]:
+                    if (used >> a) & 1:
+                        h = max(h, height(a) + 1)
+                heights[i] = h
+            return heights[i]
+        for i in range(self.npos):
+            height(i)
+        return heights
+
+
+class MahjonggDealerStuck(Exception):
+    pass
+
+
+class MahjonggDealer:
+    MAX_TRIES = 100
+    MAX_NODES = 1000                # per try
+
+    def __init__(self, layout, random, used=None):
+        # used: bitset of the positions to fill (default: all)
+        self.layout = layout
+        self.random = random
+        if used is None:
+            used = (1 << layout.npos) - 1
+        self.used = used
+        self.heights = layout.getHeights(used)
+        self.nodes = 0
+
+    def createDeal(self):
+        # Returns the pairs of positions in the order they were put on
+        # the board (the reverse of a solution), or None.
+        todo = [i for i in range(self.layout.npos) if (self.used >> i) & 1]
+        for i in range(self.MAX_TRIES):
+            self.nodes = 0
+            pairs = []
+            try:
+                if self._search(todo, 0, pairs):
+                    return pairs
+            except MahjonggDealerStuck:
+                pass
+        return None
+
+    def _canPut(self, i, board):
+        # may a tile be put on position i ?
+        layout, used = self.layout, self.used
+        if layout.below[i] & used & ~board:
+            # a tile below is missing
+            return False
+        for s in layout.left_list[i]:
+            if (used >> s) & 1 and not (board >> s) & 1 and \
+                    layout.all_left[s] & board:
+                # s would be an empty position between two tiles
+                return False
+        for s in layout.right_list[i]:
+            if (used >> s) & 1 and not (board >> s) & 1 and \
+                    layout.all_right[s] & board:
+                return False
+        return True
+
+    def _canPutPair(self, i, j, board):
+        layout = self.layout
+        bi, bj = 1 << i, 1 << j
+        if not self._canPut(i, board | bj) or \
+                not self._canPut(j, board | bi):
+            return False
+        board |= bi | bj
+        return layout.isFree(i, board) and layout.isFree(j, board)
+
+    def _getChain(self, i, board):
+        # number of positions that can only be filled after position i
+        layout = self.layout
+        empty = self.used & ~board
+        chain = self.heights[i]
+        if layout.left[i] & board:
+            # the row grows to the right
+            chain += bin(layout.all_right[i] & empty).count('1')
+        elif layout.right[i] & board:
+            chain += bin(layout.all_left[i] & empty).count('1')
+        return chain
+
+    def _search(self, todo, board, pairs):
+        # depth-first search with a budget, mostly it never backtracks
+        if not todo:
+            return True
+        self.nodes += 1
+        if self.nodes > self.MAX_NODES:
+            raise MahjonggDealerStuck()
+        randint = self.random.randint
+        cands = [i for i in todo if self._canPut(i, board)]
+        # longest chains first, random order otherwise
+        cands = [(-self._getChain(i, board), randint(0, 1 << 20), i)
+                 for i in cands]
+        cands.sort()
+        cands = [c[2] for c in cands]
+        for n, i in enumerate(cands):
+            for j in cands[n+1:]:
+                if not self._canPutPair(i, j, board):
+                    continue
+                pairs.append((i, j))
+                rest = [k for k in todo if k != i and k != j]
+                if self._search(rest, board | (1 << i) | (1 << j), pairs):
+                    return True
+                pairs.pop()
+        return False
+
+
+# ************************************************************************
+# * Solvability checker.
+# *
+# * The state is the bitset of the occupied positions (the tiles never
+# * move); the free tiles are updated around the removed pair only.
+# * The search is a depth-first search with a table of lost boards and
+# * a budget:
+# *   - if all the tiles of a kind left are free they are removed at
+# *     once, nothing is lost by it
+# *   - two tiles lying one upon the other cannot be removed together,
+# *     so a kind is lost if more than half of its tiles lie one upon
+# *     the other
+# *   - otherwise the pairs that uncover the most tiles are tried first
+# * Like BlackHoleSolver, the search is restarted with a growing budget
+# * and a slightly shuffled move order, keeping the lost boards.
+# ************************************************************************
+
+class MahjonggSolverIntractable(Exception):
+    pass
+
+
+class _Restart(Exception):
+    pass
+
+
+class MahjonggSolver:
+    RESTART_ITERS = 100             # budget of the first run
+    RESTART_FACTOR = 1.5            # growth of the budget
+    NOISE = 3000                    # shuffling of the move order
+
+    def __init__(self, layout, tiles, max_iters=20000):
+        # tiles: the kind of the tile on each position (matching tiles
+        # have the same kind), None if the position is empty
+        self.layout = layout
+        self.tiles = tiles
+        self.max_iters = max_iters
+        self.iters = 0
+        self.moves = []                 # pairs of positions
+        self.dead = set()               # boards known to be lost
+        npos = layout.npos
+        # the tiles below and behind a position must wait for it
+        self.scores = [1000 * len(layout.below_list[i]) +
+                       len(layout.all_left_list[i]) +
+                       len(layout.all_right_list[i])
+                       for i in range(npos)]
+        # the tiles whose freedom depends on a position
+        self.neighbours = [layout.below_list[i] + layout.left_list[i] +
+                           layout.right_list[i] for i in range(npos)]
+        # all the tiles under a position (not only straight below)
+        self.all_below = [None] * npos
+        for i in range(npos):
+            self._getAllBelow(i)
+
+    def _getAllBelow(self, i):
+        if self.all_below[i] is None:
+            m = self.layout.below[i]
+            for j in self.layout.below_list[i]:
+                m |= self._getAllBelow(j)
+            self.all_below[i] = m
+        return self.all_below[i]
+
+    def solve(self):
+        # returns 'solved', 'unsolved' or 'intractable'
+        board = 0
+        kinds = {}
+        for i, t in enumerate(self.tiles):
+            if t is not None:
+                board |= 1 << i
+                kinds[t] = kinds.get(t, 0) | (1 << i)
+        self.kinds = list(kinds.values())
+        self.kind_of = [None] * len(self.tiles)
+        for k, m in enumerate(self.kinds):
+            for i in _positions(m):
+                self.kind_of[i] = k
+        free = 0
+        for i in _positions(board):
+            if self.layout.isFree(i, board):
+                free |= 1 << i
+        self.iters = 0
+        self.dead = set()
+        self.moves = []
+        for m in self.kinds:
+            if self._isLost(m):
+                return 'unsolved'
+        # fixed seed: the same board always gives the same solution
+        self.random = random.Random(0)
+        budget = self.RESTART_ITERS
+        try:
+            while True:
+                self.moves = []
+                self.restart_iters = self.iters + budget
+                try:
+                    if self._search(board, free):
+                        return 'solved'
+                    return 'unsolved'
+                except _Restart:
+                    budget = int(budget * self.RESTART_FACTOR)
+        except MahjonggSolverIntractable:
+            self.moves = []
+            return 'intractable'
+
+    def _isLost(self, m):
+        # m: the tiles left of a kind
+        positions = _positions(m)
+        if len(positions) % 2:
+            return True
+        # the longest chain of tiles lying one upon the other
+        all_below = self.all_below
+        chains = {}
+
+        def chain(i):
+            if i not in chains:
+                c = 0
+                for j in positions:
+                    if (all_below[i] >> j) & 1:
+                        c = max(c, chain(j))
+                chains[i] = c + 1
+            return chains[i]
+        for i in positions:
+            if 2 * chain(i) > len(positions):
+                return True
+        return False
+
+    def _remove(self, board, free, positions):
+        # the board and the free tiles after removing some tiles
+        layout = self.layout
+        for i in positions:
+            board &= ~(1 << i)
+        free &= board
+        for i in positions:
+            for j in self.neighbours[i]:
+                if (board >> j) & 1 and layout.isFree(j, board):
+                    free |= 1 << j
+        return board, free
+
+    def _search(self, board, free):
+        if board == 0:
+            return True
+        if board in self.dead:
+            return False
+        self.iters += 1
+        if self.iters > self.max_iters:
+            raise MahjonggSolverIntractable()
+        if self.iters > self.restart_iters:
+            raise _Restart()
+        pairs = []
+        noise = self.random.random
+        for m in self.kinds:
+            m &= board
+            f = m & free
+            if not f or not f & (f - 1):
+                # less than two free tiles
+                continue
+            positions = _positions(f)
+            if f == m:
+                # all the tiles of this kind are free
+                for n in range(0, len(positions), 2):
+                    self.moves.append((positions[n], positions[n+1]))
+                if self._search(*self._remove(board, free, positions)):
+                    return True
+                del self.moves[len(self.moves) - len(positions)//2:]
+                self.dead.add(board)
+                return False
+            for n, i in enumerate(positions):
+                for j in positions[n+1:]:
+                    rest = m & ~((1 << i) | (1 << j))
+                    if self._isLost(rest):
+                        continue
+                    score = self.scores[i] + self.scores[j]
+                    pairs.append((noise() * self.NOISE - score, i, j))
+        pairs.sort()
+        for score, i, j in pairs:
+            self.moves.append((i, j))
+            if self._search(*self._remove(board, free, (i, j))):
+                return True
+            self.moves.pop()
+        self.dead.add(board)
+        return False
+
+
+def _positions(m):
+    # the positions in a bitset
+    ret = []
+    while m:
+        low = m & -m
+        ret.append(low.bit_length() - 1)
+        m ^= low
+    return ret
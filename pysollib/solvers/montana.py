@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# ************************************************************************
+# * Beam search for Montana and the other gap moving games (used by
+# * Montana_Hint).
+# *
+# * The state is a tuple with one slot per row stack: a card is coded
+# * as suit*16 + rank (the ranks count from the first card of a row),
+# * a gap is GAP. A card goes into a gap if it is the next card of the
+# * card on the left of the gap (and, in Galary, if it is the card
+# * before the card on the right of the gap); only the first rank goes
+# * into a gap in the first column.
+# *
+# * The moves of a round can not be undone and the redeals are random,
+# * so the search can not plan beyond the end of the round. The beam
+# * search keeps the best states of each depth; the states are scored
+# * by the cards in order from the left of their row (these are kept by
+# * a redeal), then by the cards that follow their left neighbour.
+# ************************************************************************
+
+GAP = -1
+
+
+class MontanaSolver:
+    BEAM_WIDTH = 50
+    LOCKED_SCORE = 100              # a card in order from the left
+    CHAINED_SCORE = 10              # a card after its left neighbour
+    DEAD_GAP_SCORE = -5             # a gap after the last rank
+
+    def __init__(self, cards, rstep, right=False, max_iters=5000):
+        # cards: (suit, rank) or None for each slot, row by row
+        # rstep: the slots in a row (the last one stays empty)
+        # right: a card may go before the card on the right of a gap
+        self.state = tuple([GAP if c is None else c[0]*16 + c[1]
+                            for c in cards])
+        self.rstep = rstep
+        self.right = right
+        self.max_iters = max_iters
+        self.iters = 0
+        self.moves = []             # (from, to) slots of the best line
+        self.seen = set()
+
+    def solve(self):
+        # returns 'solved' if the best line wins the game, 'intractable'
+        # otherwise (the rest is up to the redeals)
+        self.iters = 0
+        self.seen = set([self.state])
+        best_score = self._getScore(self.state)
+        best = (self.state, None)
+        beam = [best]
+        while beam and self.iters < self.max_iters:
+            children = []
+            for node in beam:
+                state = node[0]
+                for f, t in self._getMoves(state):
+                    new = list(state)
+                    new[t], new[f] = new[f], GAP
+                    new = tuple(new)
+                    if new in self.seen:
+                        continue
+                    self.seen.add(new)
+                    self.iters += 1
+                    children.append((self._getScore(new), new, (f, t), node))
+            children.sort(key=lambda c: c[0], reverse=True)
+            beam = []
+            for score, state, move, parent in children[:self.BEAM_WIDTH]:
+                node = (state, (move, parent))
+                beam.append(node)
+                if score > best_score:
+                    best_score, best = score, node
+            if best_score == self._getWonScore():
+                break
+        self.moves = []
+        node = best
+        while node[1] is not None:
+            move, node = node[1]
+            self.moves.append(move)
+        self.moves.reverse()
+        if best_score == self._getWonScore():
+            return 'solved'
+        return 'intractable'
+
+    def _getMoves(self, state):
+        rstep = self.rstep
+        where = {}
+        for i, c in enumerate(state):
+            if c != GAP:
+                where.setdefault(c, []).append(i)
+        moves = []
+        for t, c in enumerate(state):
+            if c != GAP:
+                continue
+            if t % rstep == 0:
+                for f, c in enumerate(state):
+                    if c != GAP and c & 15 == 0 and f % rstep:
+                        moves.append((f, t))
+                continue
+            left = state[t-1]
+            if left != GAP:
+                for f in where.get(left + 1, ()):
+                    moves.append((f, t))
+            if self.right and t + 1 < len(state):
+                right = state[t+1]
+                if right != GAP and right & 15:
+                    for f in where.get(right - 1, ()):
+                        if (f, t) not in moves:
+                            moves.append((f, t))
+        return moves
+
+    def _getWonScore(self):
+        return len(self.state) // self.rstep * (self.rstep - 1) * \
+            self.LOCKED_SCORE
+
+    def _getScore(self, state):
+        rstep = self.rstep
+        score = 0
+        for i in range(0, len(state), rstep):
+            c = state[i]
+            j = 0
+            if c != GAP and c & 15 == 0:
+                while j < rstep - 1 and state[i+j] == c + j:
+                    j += 1
+            score += j * self.LOCKED_SCORE
+            for k in range(i + j + 1, i + rstep):
+                c = state[k]
+                if c == GAP:
+                    left = state[k-1]
+                    if left != GAP and left & 15 == rstep - 2:
+                        score += self.DEAD_GAP_SCORE
+                elif c == state[k-1] + 1 and state[k-1] != GAP:
+                    score += self.CHAINED_SCORE
+        return score
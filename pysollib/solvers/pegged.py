@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# imports
+from fractions import Fraction
+
+# ************************************************************************
+# * Peg solitaire solver (used by Pegged_Hint).
+# *
+# * The board is a bitset over the holes. The search is a depth-first
+# * search with a table of lost boards; the boards are stored in a
+# * canonical form (the smallest of the boards symmetric to it), so a
+# * board is only searched once for all its symmetric images.
+# *
+# * The symmetries are the linear maps that permute the steps and map
+# * the holes onto the holes (8 for the square boards, 6 for the
+# * triangles); if the last peg must end in a given hole, only the
+# * symmetries that keep this hole are used.
+# *
+# * Before the search, the board is checked against the position
+# * classes (see getClasses), which rule out most of the impossible
+# * games, e.g. the 37 holes board with the middle hole empty.
+# ************************************************************************
+
+
+class PeggedSolverIntractable(Exception):
+    pass
+
+
+def getSymmetries(positions, steps):
+    # returns the symmetries as permutations of the holes
+    index = dict([(p, i) for i, p in enumerate(positions)])
+    steps = set(steps)
+    # a basis of the steps
+    s1 = min(steps)
+    for s2 in sorted(steps):
+        det = s1[0]*s2[1] - s1[1]*s2[0]
+        if det:
+            break
+    else:
+        return [list(range(len(positions)))]
+    ret = []
+    for t1 in steps:
+        for t2 in steps:
+            # the map s1 -> t1, s2 -> t2
+            m = [[Fraction(t1[0]*s2[1] - t2[0]*s1[1], det),
+                  Fraction(t2[0]*s1[0] - t1[0]*s2[0], det)],
+                 [Fraction(t1[1]*s2[1] - t2[1]*s1[1], det),
+                  Fraction(t2[1]*s1[0] - t1[1]*s2[0], det)]]
+
+            def apply(p):
+                return (m[0][0]*p[0] + m[0][1]*p[1],
+                        m[1][0]*p[0] + m[1][1]*p[1])
+            if set([apply(s) for s in steps]) != steps:
+                continue
+            # the translation: the corners of the bounding boxes
+            mapped = [apply(p) for p in positions]
+            dx = min([p[0] for p in positions]) - min([p[0] for p in mapped])
+            dy = min([p[1] for p in positions]) - min([p[1] for p in mapped])
+            perm = []
+            for x, y in mapped:
+                i = index.get((x + dx, y + dy))
+                if i is None:
+                    break
+                perm.append(i)
+            else:
+                ret.append(perm)
+    return ret
+
+
+def getClasses(positions, steps):
+    # returns the holes grouped in three colours, for every way to
+    # colour the board so that the three holes of each jump have
+    # different colours; a jump then changes the parity of the number
+    # of pegs on each colour, so the differences of these parities
+    # never change
+    steps = sorted(set(steps))
+    s1 = steps[0]
+    for s2 in steps:
+        det = s1[0]*s2[1] - s1[1]*s2[0]
+        if det:
+            break
+    else:
+        return []
+
+    def coords(p):
+        # p in halves of the basis steps
+        return (Fraction(2*(p[0]*s2[1] - p[1]*s2[0]), det),
+                Fraction(2*(p[1]*s1[0] - p[0]*s1[1]), det))
+    x0, y0 = positions[0]
+    holes = [coords((x - x0, y - y0)) for x, y in positions]
+    units = [coords((dx//2, dy//2)) for dx, dy in steps]
+    for a, b in holes + units:
+        if a.denominator != 1 or b.denominator != 1:
+            return []
+    ret = []
+    for alpha, beta in ((1, 0), (0, 1), (1, 1), (1, 2)):
+        if [1 for a, b in units if (alpha*a + beta*b) % 3 == 0]:
+            continue
+        colours = [0, 0, 0]
+        for i, (a, b) in enumerate(holes):
+            colours[int(alpha*a + beta*b) % 3] |= 1 << i
+        ret.append(colours)
+    return ret
+
+
+class PeggedSolver:
+    # the lost boards are kept from one solve() to the next
+    MAX_DEAD = 1000000
+
+    def __init__(self, positions, steps, target=None, max_iters=100000):
+        # positions: the (x, y) of the holes
+        # steps: the jumps (dx, dy), over the hole at (dx/2, dy/2)
+        # target: the hole of the last peg (None: any hole)
+        self.npos = len(positions)
+        self.max_iters = max_iters
+        self.iters = 0
+        self.moves = []             # (from, to) of a solution
+        index = dict([(p, i) for i, p in enumerate(positions)])
+        self.jumps = []
+        for i, (x, y) in enumerate(positions):
+            for dx, dy in steps:
+                o = index.get((x + dx//2, y + dy//2))
+                t = index.get((x + dx, y + dy))
+                if o is not None and t is not None:
+                    self.jumps.append((1 << i, 1 << o, 1 << t, i, t))
+        self.dead = set()
+        self.target = target
+        self.classes = getClasses(positions, steps)
+        symmetries = getSymmetries(positions, steps)
+        if target is not None:
+            symmetries = [s for s in symmetries if s[target] == target]
+        # the symmetries as lookup tables, 8 holes at a time
+        self.tables = []
+        for perm in symmetries:
+            tables = []
+            for chunk in range(0, len(positions), 8):
+                table = []
+                for byte in range(256):
+                    m = 0
+                    for bit in range(8):
+                        if (byte >> bit) & 1 and chunk + bit < len(perm):
+                            m |= 1 << perm[chunk + bit]
+                    table.append(m)
+                tables.append(table)
+            self.tables.append(tables)
+
+    def _getCanonical(self, board):
+        ret = board
+        for tables in self.tables:
+            m = 0
+            b = board
+            for table in tables:
+                m |= table[b & 255]
+                b >>= 8
+            if m < ret:
+                ret = m
+        return ret
+
+    def _getClass(self, board):
+        ret = []
+        for colours in self.classes:
+            n = [bin(board & m).count('1') & 1 for m in colours]
+            ret.append((n[0] ^ n[1], n[1] ^ n[2]))
+        return ret
+
+    def solve(self, board):
+        # board: the holes with a peg
+        # returns 'solved', 'unsolved' or 'intractable'
+        self.board = 0
+        for i in board:
+            self.board |= 1 << i
+        self.iters = 0
+        self.moves = []
+        if len(self.dead) > self.MAX_DEAD:
+            self.dead.clear()
+        # the last peg must be in a hole of the same class as the board
+        cls = self._getClass(self.board)
+        if self.target is None:
+            targets = range(self.npos)
+        else:
+            targets = [self.target]
+        if not [1 for i in targets if self._getClass(1 << i) == cls]:
+            return 'unsolved'
+        try:
+            if self._search(self.board):
+                return 'solved'
+            return 'unsolved'
+        except PeggedSolverIntractable:
+            self.moves = []
+            return 'intractable'
+
+    def _search(self, board):
+        if not board & (board - 1):
+            # the last peg
+            return self.target is None or board == 1 << self.target
+        key = self._getCanonical(board)
+        if key in self.dead:
+            return False
+        self.iters += 1
+        if self.iters > self.max_iters:
+            raise PeggedSolverIntractable()
+        for f, o, t, i, j in self.jumps:
+            if board & f and board & o and not board & t:
+                self.moves.append((i, j))
+                if self._search(board ^ (f | o | t)):
+                    return True
+                self.moves.pop()
+        self.dead.add(key)
+        return False
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# imports
+import random
+
+# PySol imports
+from pysollib.util import KING
+
+# ************************************************************************
+# * Solver for Pyramid and the games with the same talon (used by
+# * Pyramid_Hint).
+# *
+# * The cards of the talon and the waste keep their order for the whole
+# * game, so they are kept in one list (the stock: the waste from the
+# * bottom, then the talon from the top); the waste is the part of the
+# * stock before the cursor. The state is (bitmask of the pyramid cards
+# * left, bitmask of the stock cards left, cursor, redeals left).
+# *
+# * The search is a depth-first search with a table of lost states; the
+# * table stays valid for the whole deal, so it is kept from one solve()
+# * to the next. Kings are removed at once and a card is dealt as soon
+# * as the waste is empty (as Game._autoDeal does). As in the Black Hole
+# * solver, the search is restarted with a growing budget and a slightly
+# * shuffled move order.
+# ************************************************************************
+
+FOUNDATION = -1
+WASTE = -2
+TALON = -3                      # (TALON, WASTE): deal or redeal
+
+
+class PyramidSolverIntractable(Exception):
+    pass
+
+
+class _Restart(Exception):
+    pass
+
+
+class PyramidSolver:
+    RESTART_ITERS = 200             # budget of the first run
+    RESTART_FACTOR = 1.5            # growth of the budget
+    NOISE = 2                       # shuffling of the move order
+    # the lost states are kept from one solve() to the next
+    MAX_DEAD = 1000000
+
+    def __init__(self, ranks, blockers, stock, clear_stock=True,
+                 max_iters=100000):
+        # ranks: the rank of each pyramid card
+        # blockers: for each pyramid card, the pyramid cards covering it
+        # stock: the ranks of the stock cards
+        # clear_stock: the stock must be removed too
+        self.ranks = ranks
+        self.blockers = []
+        for b in blockers:
+            m = 0
+            for i in b:
+                m |= 1 << i
+            self.blockers.append(m)
+        self.stock = stock
+        self.clear_stock = clear_stock
+        # all the cards above each pyramid card
+        self.above = []
+        for i in range(len(ranks)):
+            m = self.blockers[i]
+            todo = list(blockers[i])
+            while todo:
+                j = todo.pop()
+                todo.extend([k for k in blockers[j]
+                             if not m >> k & 1])
+                m |= self.blockers[j]
+            self.above.append(m)
+        # the cards of each rank
+        self.pyramid_ranks = [0] * (KING + 1)
+        for i, rank in enumerate(ranks):
+            if rank is not None:
+                self.pyramid_ranks[rank] |= 1 << i
+        self.stock_ranks = [0] * (KING + 1)
+        for i, rank in enumerate(stock):
+            self.stock_ranks[rank] |= 1 << i
+        self.max_iters = max_iters
+        self.iters = 0
+        self.moves = []             # (from, to) of a solution
+        self.path = []              # the states before these moves
+        self.dead = set()
+
+    def getState(self, pyramid, stock, cursor, redeals):
+        # pyramid: the pyramid cards left
+        # stock: the stock cards left
+        # cursor: the first talon card in the stock
+        pmask = smask = 0
+        for i in pyramid:
+            pmask |= 1 << i
+        for i in stock:
+            smask |= 1 << i
+        return self._normalize((pmask, smask, cursor, redeals))
+
+    def _normalize(self, state):
+        # the cursor is put after the waste
+        pmask, smask, cursor, redeals = state
+        cursor = (smask & ((1 << cursor) - 1)).bit_length()
+        return (pmask, smask, cursor, redeals)
+
+    def solve(self, state, max_iters=None):
+        # returns 'solved', 'unsolved' or 'intractable'; max_iters: the
+        # budget of this search (default: the one of the solver)
+        self.iters = 0
+        self.iters_limit = self.max_iters
+        if max_iters is not None:
+            self.iters_limit = max_iters
+        if len(self.dead) > self.MAX_DEAD:
+            self.dead.clear()
+        # fixed seed: the same deal always gives the same solution
+        self.random = random.Random(0)
+        budget = self.RESTART_ITERS
+        try:
+            while True:
+                self.moves = []
+                self.path = []
+                self.restart_iters = self.iters + budget
+                try:
+                    if self._search(state):
+                        return 'solved'
+                    return 'unsolved'
+                except _Restart:
+                    budget = int(budget * self.RESTART_FACTOR)
+        except PyramidSolverIntractable:
+            self.moves = []
+            self.path = []
+            return 'intractable'
+
+    def _getMoves(self, state):
+        pmask, smask, cursor, redeals = state
+        ranks, stock = self.ranks, self.stock
+        # the free cards: (position, rank, new pmask, new smask)
+        free = []
+        for i, rank in enumerate(ranks):
+            if pmask >> i & 1 and not self.blockers[i] & pmask:
+                free.append((i, rank, pmask & ~(1 << i), smask))
+        waste = (smask & ((1 << cursor) - 1)).bit_length() - 1
+        if waste >= 0:
+            free.append((WASTE, stock[waste], pmask, smask & ~(1 << waste)))
+        talon = smask >> cursor
+        if talon:
+            talon = (talon & -talon).bit_length() - 1 + cursor
+            free.append((TALON, stock[talon], pmask, smask & ~(1 << talon)))
+        else:
+            talon = None
+        moves = []
+        for n, (i, rank, p, s) in enumerate(free):
+            if rank == KING:
+                # always good
+                return [((i, FOUNDATION), (p, s, cursor, redeals))]
+            for j, rank2, p2, s2 in free[n+1:]:
+                if rank + rank2 != 11:
+                    continue
+                new = (p & p2, s & s2, cursor, redeals)
+                if self._countRank(state, rank) == 1 and \
+                        self._countRank(state, rank2) == 1:
+                    # the last two cards of the pair, always good
+                    return [((i, j), new)]
+                moves.append(((i, j), new))
+        # the pairs from the pyramid first (more or less)
+        moves = [(self.random.random() * self.NOISE - (i >= 0) - (j >= 0),
+                  (i, j), new) for (i, j), new in moves]
+        moves.sort()
+        moves = [(move, new) for x, move, new in moves]
+        if talon is not None:
+            moves.append(((TALON, WASTE), (pmask, smask, talon + 1, redeals)))
+        elif waste >= 0 and redeals > 0:
+            moves.append(((TALON, WASTE), (pmask, smask, 0, redeals - 1)))
+        return moves
+
+    def _countRank(self, state, rank):
+        return bin(state[0] & self.pyramid_ranks[rank]).count('1') + \
+            bin(state[1] & self.stock_ranks[rank]).count('1')
+
+    def _isWon(self, state):
+        return not state[0] and (not self.clear_stock or not state[1])
+
+    def _isLost(self, state):
+        # a card that can not be paired any more
+        pmask, smask, cursor, redeals = state
+        pyramid_ranks, stock_ranks = self.pyramid_ranks, self.stock_ranks
+        waste = smask & ((1 << cursor) - 1)
+        for rank in range(KING):
+            p = pmask & pyramid_ranks[rank]
+            s = smask & stock_ranks[rank]
+            if not p and not (s and self.clear_stock):
+                continue
+            p2 = pmask & pyramid_ranks[11 - rank]
+            s2 = smask & stock_ranks[11 - rank]
+            if self.clear_stock and not redeals and s & waste and \
+                    not p2 and not s2 & ~waste:
+                # in the last round only the top card of the waste is free
+                return True
+            if s2:
+                continue
+            if not p2:
+                return True
+            while p:
+                # the partners must not all lie above the card
+                i = (p & -p).bit_length() - 1
+                if not p2 & ~self.above[i]:
+                    return True
+                p &= p - 1
+        return False
+
+    def _search(self, state):
+        if self._isWon(state):
+            return True
+        state = self._normalize(state)
+        if state in self.dead:
+            return False
+        self.iters += 1
+        if self.iters > self.iters_limit:
+            raise PyramidSolverIntractable()
+        if self.iters > self.restart_iters:
+            raise _Restart()
+        if self._isLost(state):
+            self.dead.add(state)
+            return False
+        pmask, smask, cursor, redeals = state
+        if not cursor and smask:
+            # the waste is empty: deal a card
+            talon = (smask & -smask).bit_length()
+            moves = [((TALON, WASTE), (pmask, smask, talon, redeals))]
+        else:
+            moves = self._getMoves(state)
+        for move, new in moves:
+            self.moves.append(move)
+            self.path.append(state)
+            if self._search(new):
+                return True
+            self.moves.pop()
+            self.path.pop()
+        self.dead.add(state)
+        return False
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# imports
+import heapq
+import time
+
+# PySol imports
+from pysollib.util import ACE, KING
+
+# ************************************************************************
+# * Best-first search for Spider and the games with the same rows (used
+# * by Spider_Hint).
+# *
+# * A card is coded as suit*16 + rank, so a card lies on the next card of
+# * its suit if the two codes follow each other; a face-down card is
+# * HIDDEN. The search only knows the face-up cards: a move that turns
+# * up a card and a deal end a line, the hint is computed again when the
+# * new cards are known.
+# *
+# * The runs on top of the rows move as units: a whole run, or the part
+# * of it that fits on the top card of another row (only if the card
+# * goes on a card of its own suit then), or a whole run into the first
+# * empty row. A complete suit from King to Ace goes to the foundations
+# * as soon as it is built.
+# *
+# * The positions are scored (suits on the foundations, face-down cards
+# * left, empty rows, cards on the next rank) and the best one is
+# * expanded first. The search stops after max_states positions or
+# * time_limit seconds; duplicate positions are found with a set of the
+# * hashes of the positions (the rows are sorted, their order does not
+# * matter). The moves to the best position found are returned; if no
+# * position is better than the current one, the moves to the best deal.
+# ************************************************************************
+
+HIDDEN = -1
+FOUNDATION = -1
+TALON = -2                      # (0, TALON, None): a deal
+
+
+class SpiderSolver:
+    DROP_SCORE = 1000               # a suit on the foundations
+    HIDDEN_SCORE = -150             # a face-down card under another card
+    EMPTY_SCORE = 100               # an empty row
+    SUIT_LINK_SCORE = 10            # a card on the next card of its suit
+    RANK_LINK_SCORE = 3             # a card on the next rank
+    MOVE_SCORE = -1                 # per move (shorter lines first)
+    DEAL_SCORE = -5
+
+    def __init__(self, rows, talon, same_suit=True, deal_empty=True,
+                 max_states=5000, time_limit=0.5):
+        # rows: the cards of each row from the bottom, (suit, rank) or
+        #   None for a face-down card
+        # talon: the number of cards in the talon
+        # same_suit: only the cards of one suit move together (else any
+        #   sequence of ranks)
+        # deal_empty: cards may be dealt when a row is empty
+        self.rows = tuple([tuple([HIDDEN if c is None else c[0]*16 + c[1]
+                                  for c in row]) for row in rows])
+        self.talon = talon
+        self.same_suit = same_suit
+        self.deal_empty = deal_empty
+        self.max_states = max_states
+        self.time_limit = time_limit
+        self.states = 0
+        self.moves = []             # (ncards, from, to) of the best line
+        self.path = []              # the positions before these moves
+
+    def getKey(self, rows=None):
+        # the position as seen by the game (see RelaxedSpider)
+        if rows is None:
+            rows = self.rows
+        return (rows, self.talon)
+
+    def solve(self):
+        # returns 'solved' if the best line wins the game, 'intractable'
+        # otherwise
+        deadline = time.time() + self.time_limit
+        # nodes: (rows, drops, depth, move, parent)
+        nodes = [(self.rows, 0, 0, None, None)]
+        seen = set([self._getHash(self.rows)])
+        best_score = self._getScore(self.rows, 0, 0)
+        best = deal = None
+        deal_score = None
+        queue = [(-best_score, 0)]
+        while queue and len(nodes) < self.max_states:
+            if time.time() > deadline:
+                break
+            index = heapq.heappop(queue)[1]
+            rows, drops, depth = nodes[index][:3]
+            if self._canDeal(rows):
+                score = self._getScore(rows, drops, depth) + self.DEAL_SCORE
+                if deal_score is None or score > deal_score:
+                    deal_score = score
+                    deal = len(nodes)
+                    nodes.append((rows, drops, depth + 1,
+                                  (0, TALON, None), index))
+            for move, new, leaf in self._getMoves(rows):
+                h = self._getHash(new)
+                if h in seen:
+                    continue
+                seen.add(h)
+                n = drops + (move[2] == FOUNDATION)
+                score = self._getScore(new, n, depth + 1)
+                nodes.append((new, n, depth + 1, move, index))
+                if score > best_score:
+                    best_score, best = score, len(nodes) - 1
+                if not leaf:
+                    heapq.heappush(queue, (-score, len(nodes) - 1))
+        self.states = len(nodes)
+        if best is None:
+            best = deal
+        self.moves = []
+        self.path = []
+        won = False
+        if best is not None:
+            won = not self.talon and not any(nodes[best][0])
+        while best:
+            rows, drops, depth, move, best = nodes[best]
+            self.moves.append(move)
+            self.path.append(self.getKey(nodes[best][0]))
+        self.moves.reverse()
+        self.path.reverse()
+        if won:
+            return 'solved'
+        return 'intractable'
+
+    def _getHash(self, rows):
+        return hash(tuple(sorted(rows)))
+
+    def _canDeal(self, rows):
+        if not self.talon:
+            return False
+        return self.deal_empty or all(rows)
+
+    def _isLinked(self, c1, c2):
+        # can c2 move together with c1 (the card under it)?
+        if c1 == HIDDEN:
+            return False
+        if self.same_suit:
+            return c1 == c2 + 1
+        return c1 & 15 == (c2 & 15) + 1
+
+    def _getMoves(self, rows):
+        # returns (move, new rows, the line ends here)
+        moves = []
+        runs = []
+        empty = None
+        for i, row in enumerate(rows):
+            if not row:
+                if empty is None:
+                    empty = i
+                runs.append(None)
+                continue
+            if row[-1] == HIDDEN:
+                runs.append(None)
+                continue
+            start = len(row) - 1
+            while start > 0 and self._isLinked(row[start-1], row[start]):
+                start -= 1
+            if len(row) - start >= 13:
+                # a complete suit, this is always good
+                top = row[-13]
+                if top & 15 == KING and \
+                        row[-13:] == tuple(range(top, top - 13, -1)):
+                    return [self._getMove(rows, 13, i, FOUNDATION)]
+            runs.append(start)
+        for i, start in enumerate(runs):
+            if start is None:
+                continue
+            src = rows[i]
+            top_rank = src[start] & 15
+            for j, dest in enumerate(rows):
+                if i == j:
+                    continue
+                if not dest:
+                    if j == empty and start > 0:
+                        moves.append(self._getMove(rows, len(src) - start,
+                                                   i, j))
+                    continue
+                card = dest[-1]
+                if card == HIDDEN or card & 15 == ACE:
+                    continue
+                k = start + top_rank - (card & 15) + 1
+                if k < start or k >= len(src):
+                    continue
+                if k > start and src[k] != card - 1:
+                    # the run is broken for a card of another suit
+                    continue
+                moves.append(self._getMove(rows, len(src) - k, i, j))
+        return moves
+
+    def _getMove(self, rows, n, i, j):
+        new = list(rows)
+        src = rows[i]
+        if j != FOUNDATION:
+            new[j] = rows[j] + src[-n:]
+        new[i] = src[:-n]
+        leaf = bool(new[i]) and new[i][-1] == HIDDEN
+        return (n, i, j), tuple(new), leaf
+
+    def _getScore(self, rows, drops, depth):
+        score = drops * self.DROP_SCORE + depth * self.MOVE_SCORE
+        for row in rows:
+            if not row:
+                score += self.EMPTY_SCORE
+                continue
+            # a face-down card on top is as good as turned up
+            prev = HIDDEN
+            for c in row:
+                if c == HIDDEN:
+                    score += self.HIDDEN_SCORE
+                elif prev == c + 1:
+                    score += self.SUIT_LINK_SCORE
+                elif prev != HIDDEN and prev & 15 == (c & 15) + 1:
+                    score += self.RANK_LINK_SCORE
+                prev = c
+            if row[-1] == HIDDEN:
+                score -= self.HIDDEN_SCORE
+        return score
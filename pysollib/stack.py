@@ -21,6 +21,8 @@
 #
 # ---------------------------------------------------------------------------
 
+import inspect
+
 from pysollib.mygettext import _
 # PySol imports
 from pysollib.mfxutil import Struct, kwdefault, SubclassResponsibility
@@ -125,6 +127,29 @@ def isAnySuitButOwnSequence(cards, mod=8192, dir=-1):
     return True
 
 
+# The row stacks that set _accept_index accept only the next card of a
+# sequence (see BasicRowStack.getAcceptedRanks). A subclass that
+# overrides one of these methods may accept other cards.
+ACCEPT_INDEX_METHODS = ('acceptsCards', 'basicAcceptsCards', '_isSequence',
+                        '_isAcceptableSequence', '_getAcceptDirs')
+_accept_index_classes = {}
+
+
+def isAcceptIndexSafe(cls):
+    safe = _accept_index_classes.get(cls)
+    if safe is None:
+        safe = False
+        for klass in inspect.getmro(cls):
+            d = klass.__dict__
+            if '_accept_index' in d:
+                safe = d['_accept_index']
+                break
+            if [n for n in ACCEPT_INDEX_METHODS if n in d]:
+                break
+        _accept_index_classes[cls] = safe
+    return safe
+
+
 def getNumberOfFreeStacks(stacks):
     return len([s for s in stacks if not s.cards])
 
@@ -462,6 +487,9 @@ class Stack:
 
     # Position the card on the canvas {view}
     def _position(self, card):
+        if self.game.turbo:
+            # see Game.relayoutStacks
+            return
         x, y = self.getPositionFor(card)
         card.moveTo(x, y)
 
@@ -566,6 +594,12 @@ class Stack:
         # Do we accept receiving `cards' from `from_stack' ?
         return False
 
+    def getAcceptedRanks(self):
+        # The ranks of the first card of a pile that we may accept, or
+        # None if we don't know. Used as an index by the hints, the
+        # moves are still checked by acceptsCards().
+        return None
+
     def canMoveCards(self, cards):
         # Can we move these cards when assuming they are our top-cards ?
         return False
@@ -755,7 +789,8 @@ class Stack:
                 c.moveTo(x, y)
 
     def updateText(self):
-        if self.game.preview > 1 or self.texts.ncards is None:
+        if self.game.preview > 1 or self.game.turbo or \
+                self.texts.ncards is None:
             return
         t = ""
         format = "%d"
@@ -2466,6 +2501,28 @@ class BasicRowStack(OpenStack):
     def getReserveBottomImage(self):
         return self.game.app.images.getReserveBottom()
 
+    # see isAcceptIndexSafe()
+    _accept_index = False
+
+    def _getAcceptDirs(self):
+        # the directions of the sequences we build
+        return (self.cap.dir,)
+
+    def getAcceptedRanks(self):
+        if not isAcceptIndexSafe(self.__class__):
+            return None
+        cap = self.cap
+        if cap.max_accept <= 0 or len(self.cards) >= cap.max_cards:
+            return ()
+        if self.cards:
+            c = self.cards[-1]
+            if not c.face_up:
+                return ()
+            return [(c.rank + d) % cap.mod for d in self._getAcceptDirs()]
+        if cap.base_rank == ANY_RANK:
+            return None
+        return (cap.base_rank,)
+
 
 # Abstract class.
 class SequenceRowStack(SequenceStack_StackMethods, BasicRowStack):
@@ -2488,6 +2545,8 @@ class SequenceRowStack(SequenceStack_StackMethods, BasicRowStack):
 # An AlternateColor_RowStack builds down by rank and alternate color.
 # e.g. Klondike
 class AC_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def _isSequence(self, cards):
         return isAlternateColorSequence(cards, self.cap.mod, self.cap.dir)
 
@@ -2503,6 +2562,8 @@ class AC_RowStack(SequenceRowStack):
 # A SameColor_RowStack builds down by rank and same color.
 # e.g. Klondike
 class SC_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def _isSequence(self, cards):
         return isSameColorSequence(cards, self.cap.mod, self.cap.dir)
 
@@ -2517,6 +2578,8 @@ class SC_RowStack(SequenceRowStack):
 
 # A SameSuit_RowStack builds down by rank and suit.
 class SS_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def _isSequence(self, cards):
         return isSameSuitSequence(cards, self.cap.mod, self.cap.dir)
 
@@ -2531,6 +2594,8 @@ class SS_RowStack(SequenceRowStack):
 
 # A Rank_RowStack builds down by rank ignoring suit.
 class RK_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def _isSequence(self, cards):
         return isRankSequence(cards, self.cap.mod, self.cap.dir)
 
@@ -2545,6 +2610,8 @@ class RK_RowStack(SequenceRowStack):
 
 # ButOwn_RowStack
 class BO_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def _isSequence(self, cards):
         return isAnySuitButOwnSequence(cards, self.cap.mod, self.cap.dir)
 
@@ -2581,6 +2648,8 @@ class FreeCell_RK_RowStack(RK_RowStack):
 # A Spider_AlternateColor_RowStack builds down by rank and alternate color,
 # but accepts sequences that match by rank only.
 class Spider_AC_RowStack(AC_RowStack):
+    _accept_index = True
+
     def _isAcceptableSequence(self, cards):
         return isRankSequence(cards, self.cap.mod, self.cap.dir)
 
@@ -2600,6 +2669,8 @@ class Spider_AC_RowStack(AC_RowStack):
 # A Spider_SameSuit_RowStack builds down by rank and suit,
 # but accepts sequences that match by rank only.
 class Spider_SS_RowStack(SS_RowStack):
+    _accept_index = True
+
     def _isAcceptableSequence(self, cards):
         return isRankSequence(cards, self.cap.mod, self.cap.dir)
 
@@ -2619,6 +2690,8 @@ class Spider_SS_RowStack(SS_RowStack):
 # A Yukon_AlternateColor_RowStack builds down by rank and alternate color,
 # but can move any face-up cards regardless of sequence.
 class Yukon_AC_RowStack(BasicRowStack):
+    _accept_index = True
+
     def __init__(self, x, y, game, **cap):
         kwdefault(cap, max_move=999999, max_accept=999999)
         BasicRowStack.__init__(self, x, y, game, **cap)
@@ -2653,6 +2726,8 @@ class Yukon_AC_RowStack(BasicRowStack):
 # A Yukon_SameSuit_RowStack builds down by rank and suit,
 # but can move any face-up cards regardless of sequence.
 class Yukon_SS_RowStack(Yukon_AC_RowStack):
+    _accept_index = True
+
     def _isSequence(self, c1, c2):
         return ((c1.rank + self.cap.dir) % self.cap.mod == c2.rank and
                 c1.suit == c2.suit)
@@ -2672,6 +2747,8 @@ class Yukon_SS_RowStack(Yukon_AC_RowStack):
 # A Yukon_Rank_RowStack builds down by rank
 # but can move any face-up cards regardless of sequence.
 class Yukon_RK_RowStack(Yukon_AC_RowStack):
+    _accept_index = True
+
     def _isSequence(self, c1, c2):
         return (c1.rank + self.cap.dir) % self.cap.mod == c2.rank
 
@@ -2712,6 +2789,8 @@ class KingRK_RowStack(RK_RowStack):
 
 # up or down by color
 class UD_SC_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def __init__(self, x, y, game, **cap):
         kwdefault(cap, max_move=1, max_accept=1)
         SequenceRowStack.__init__(self, x, y, game, **cap)
@@ -2720,12 +2799,17 @@ class UD_SC_RowStack(SequenceRowStack):
         return (isSameColorSequence(cards, self.cap.mod, 1) or
                 isSameColorSequence(cards, self.cap.mod, -1))
 
+    def _getAcceptDirs(self):
+        return (1, -1)
+
     def getHelp(self):
         return _('Tableau. Build up or down by color.')
 
 
 # up or down by alternate color
 class UD_AC_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def __init__(self, x, y, game, **cap):
         kwdefault(cap, max_move=1, max_accept=1)
         SequenceRowStack.__init__(self, x, y, game, **cap)
@@ -2734,12 +2818,17 @@ class UD_AC_RowStack(SequenceRowStack):
         return (isAlternateColorSequence(cards, self.cap.mod, 1) or
                 isAlternateColorSequence(cards, self.cap.mod, -1))
 
+    def _getAcceptDirs(self):
+        return (1, -1)
+
     def getHelp(self):
         return _('Tableau. Build up or down by alternate color.')
 
 
 # up or down by suit
 class UD_SS_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def __init__(self, x, y, game, **cap):
         kwdefault(cap, max_move=1, max_accept=1)
         SequenceRowStack.__init__(self, x, y, game, **cap)
@@ -2748,12 +2837,17 @@ class UD_SS_RowStack(SequenceRowStack):
         return (isSameSuitSequence(cards, self.cap.mod, 1) or
                 isSameSuitSequence(cards, self.cap.mod, -1))
 
+    def _getAcceptDirs(self):
+        return (1, -1)
+
     def getHelp(self):
         return _('Tableau. Build up or down by suit.')
 
 
 # up or down by rank ignoring suit
 class UD_RK_RowStack(SequenceRowStack):
+    _accept_index = True
+
     def __init__(self, x, y, game, **cap):
         kwdefault(cap, max_move=1, max_accept=1)
         SequenceRowStack.__init__(self, x, y, game, **cap)
@@ -2762,6 +2856,9 @@ class UD_RK_RowStack(SequenceRowStack):
         return (isRankSequence(cards, self.cap.mod, 1) or
                 isRankSequence(cards, self.cap.mod, -1))
 
+    def _getAcceptDirs(self):
+        return (1, -1)
+
     def getHelp(self):
         return _('Tableau. Build up or down regardless of suit.')
 
@@ -2792,6 +2889,8 @@ class SuperMoveStack_StackMethods:
 
 
 class SuperMoveSS_RowStack(SuperMoveStack_StackMethods, SS_RowStack):
+    _accept_index = True
+
     def canMoveCards(self, cards):
         if not SS_RowStack.canMoveCards(self, cards):
             return False
@@ -2804,6 +2903,8 @@ class SuperMoveSS_RowStack(SuperMoveStack_StackMethods, SS_RowStack):
 
 
 class SuperMoveAC_RowStack(SuperMoveStack_StackMethods, AC_RowStack):
+    _accept_index = True
+
     def canMoveCards(self, cards):
         if not AC_RowStack.canMoveCards(self, cards):
             return False
@@ -2816,6 +2917,8 @@ class SuperMoveAC_RowStack(SuperMoveStack_StackMethods, AC_RowStack):
 
 
 class SuperMoveRK_RowStack(SuperMoveStack_StackMethods, RK_RowStack):
+    _accept_index = True
+
     def canMoveCards(self, cards):
         if not RK_RowStack.canMoveCards(self, cards):
             return False
@@ -2828,6 +2931,8 @@ class SuperMoveRK_RowStack(SuperMoveStack_StackMethods, RK_RowStack):
 
 
 class SuperMoveSC_RowStack(SuperMoveStack_StackMethods, SC_RowStack):
+    _accept_index = True
+
     def canMoveCards(self, cards):
         if not SC_RowStack.canMoveCards(self, cards):
             return False
@@ -2840,6 +2945,8 @@ class SuperMoveSC_RowStack(SuperMoveStack_StackMethods, SC_RowStack):
 
 
 class SuperMoveBO_RowStack(SuperMoveStack_StackMethods, BO_RowStack):
+    _accept_index = True
+
     def canMoveCards(self, cards):
         if not BO_RowStack.canMoveCards(self, cards):
             return False
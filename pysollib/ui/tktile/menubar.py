@@ -191,6 +191,7 @@ class PysolMenubarTkCommon:
             save_games_geometry=tkinter.BooleanVar(),
             splashscreen=tkinter.BooleanVar(),
             demo_logo=tkinter.BooleanVar(),
+            demo_lookahead=tkinter.BooleanVar(),
             mouse_type=tkinter.StringVar(),
             mouse_undo=tkinter.BooleanVar(),
             negative_bottom=tkinter.BooleanVar(),
@@ -240,6 +241,7 @@ class PysolMenubarTkCommon:
         tkopt.helpbar.set(opt.helpbar)
         tkopt.save_games_geometry.set(opt.save_games_geometry)
         tkopt.demo_logo.set(opt.demo_logo)
+        tkopt.demo_lookahead.set(opt.demo_lookahead)
         tkopt.splashscreen.set(opt.splashscreen)
         tkopt.mouse_type.set(opt.mouse_type)
         tkopt.mouse_undo.set(opt.mouse_undo)
@@ -444,6 +446,9 @@ class PysolMenubarTkCommon:
         menu.add_command(
             label=n_("Demo (&all games)"),
             command=self.mMixedDemo)
+        menu.add_command(
+            label=n_("A&utopilot"),
+            command=self.mAutopilot)
         if USE_FREECELL_SOLVER:
             menu.add_command(label=n_("&Solver"), command=self.mSolver)
         else:
@@ -474,6 +479,10 @@ class PysolMenubarTkCommon:
         submenu.add_checkbutton(
             label=n_("&Quick play"), variable=self.tkopt.quickplay,
             command=self.mOptQuickPlay)
+        submenu.add_checkbutton(
+            label=n_("Demo &looks ahead"),
+            variable=self.tkopt.demo_lookahead,
+            command=self.mOptDemoLookahead)
         submenu = MfxMenu(menu, label=n_("Assist &level"))
         submenu.add_checkbutton(
             label=n_("Enable &undo"), variable=self.tkopt.undo,
@@ -1308,6 +1317,11 @@ Unsupported game for import.
             return
         self.app.opt.quickplay = self.tkopt.quickplay.get()
 
+    def mOptDemoLookahead(self, *args):
+        if self._cancelDrag(break_pause=False):
+            return
+        self.app.opt.demo_lookahead = self.tkopt.demo_lookahead.get()
+
     def mOptEnableUndo(self, *args):
         if self._cancelDrag(break_pause=False):
             return
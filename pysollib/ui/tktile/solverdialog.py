@@ -1,3 +1,5 @@
+import threading
+
 from six.moves import tkinter
 
 from pysollib.mygettext import _
@@ -18,10 +20,21 @@ class BaseSolverDialog:
 
     def _OnAssignToMaxIters(self, *args):
         self.app.opt.solver_max_iterations = self._getMaxIters()
+        if self.solver:
+            # the running solver will pick it up
+            self.solver.config(max_iters=self._getMaxIters())
 
     def __init__(self, parent, app, **kw):
         self.parent = parent
         self.app = app
+        # the running solver (see startSolving)
+        self.solver = None
+        self.solver_thread = None
+        self.solver_error = None
+        self.poll_timer = None
+        self.main_thread = threading.current_thread()
+        self.text_lock = threading.Lock()
+        self.pending_text = {}
         title = TITLE+' - FreeCell Solver'
         kw = self.initKw(kw)
         self._calc_MfxDialog().__init__(
@@ -124,7 +137,10 @@ class BaseSolverDialog:
 
     def mDone(self, button):
         if button == 0:
-            self.startSolving()
+            if self.solver:
+                self.stopSolving()
+            else:
+                self.startSolving()
         elif button == 1:
             self.startPlay()
         elif button == 2:
@@ -132,6 +148,10 @@ class BaseSolverDialog:
         elif button == 3:
             global solver_dialog
             solver_dialog = None
+            self.stopSolving()
+            if self.poll_timer:
+                self.top.after_cancel(self.poll_timer)
+                self.poll_timer = None
             self.destroy()
         return EVENT_HANDLED
 
@@ -155,11 +175,11 @@ class BaseSolverDialog:
         self.top.update_idletasks()
 
     def reset(self):
+        # the game was changed; the running solver is out of date
+        self.stopSolving()
         self.play_button.config(state='disabled')
 
     def startSolving(self):
-        from gettext import ungettext
-
         self._reset()
         game = self.app.game
         solver = game.Solver_Class(game, self)  # create solver instance
@@ -168,10 +188,54 @@ class BaseSolverDialog:
         max_iters = self._getMaxIters()
         progress = self.app.opt.solver_show_progress
         solver.config(preset=preset, max_iters=max_iters, progress=progress)
+        # the thread must not read the stacks while the cards are moved
+        solver.prepare()
+        # run the solver in the background; see _pollSolver
+        self.solver = solver
+        self.solver_error = None
+        self.solver_thread = threading.Thread(target=self._runSolver,
+                                              args=(solver,))
+        self.solver_thread.daemon = True
+        self.start_button.config(text=_('Stop'))
+        self.solver_thread.start()
+        self._pollSolver()
+
+    def stopSolving(self):
+        if self.solver:
+            self.solver.cancel()
+
+    def _runSolver(self, solver):
+        # solver thread
         try:
             solver.computeHints()
         except RuntimeError:
-            self.result_label['text'] = _('Solver not found in the PATH')
+            self.solver_error = _('Solver not found in the PATH')
+        except Exception as e:
+            # shown by _pollSolver
+            self.solver_error = _('Solver error: %s') % e
+
+    def _pollSolver(self):
+        self.poll_timer = None
+        with self.text_lock:
+            kw, self.pending_text = self.pending_text, {}
+        if kw:
+            self.setText(**kw)
+        if self.solver_thread.is_alive():
+            self.poll_timer = self.top.after(100, self._pollSolver)
+            return
+        solver, self.solver = self.solver, None
+        self.solver_thread = None
+        self.start_button.config(text=_('Start'))
+        self.showResult(solver)
+
+    def showResult(self, solver):
+        from gettext import ungettext
+
+        if self.solver_error:
+            self.result_label['text'] = self.solver_error
+            return
+        if solver.cancelled:
+            self.result_label['text'] = _('Solving was stopped')
             return
         hints_len = len(solver.hints)-1
         if hints_len > 0:
@@ -199,6 +263,11 @@ class BaseSolverDialog:
         self.app.game.startDemo(level=3)
 
     def setText(self, **kw):
+        if threading.current_thread() is not self.main_thread:
+            # called by the solver thread; see _pollSolver
+            with self.text_lock:
+                self.pending_text.update(kw)
+            return
         if 'iter' in kw:
             self.iter_label['text'] = kw['iter']
         if 'depth' in kw:
@@ -92,6 +92,7 @@ for module_name in \
          'pysollib.games.windmill',
          'pysollib.games.yukon',
          'pysollib.games.zodiac',
+         'pysollib.headless',
          'pysollib.help',
          'pysollib.hint',
          'pysollib.images',
@@ -132,6 +133,17 @@ for module_name in \
          'pysollib.pysoltk',
          'pysollib.resource',
          'pysollib.settings',
+         'pysollib.solvercache',
+         'pysollib.solverpool',
+         'pysollib.solvers.blackhole',
+         'pysollib.solvers.freecell',
+         'pysollib.solvers.hanoi',
+         'pysollib.solvers.klondike',
+         'pysollib.solvers.mahjongg',
+         'pysollib.solvers.montana',
+         'pysollib.solvers.pegged',
+         'pysollib.solvers.pyramid',
+         'pysollib.solvers.spider',
          'pysollib.stack',
          'pysollib.stats',
          'pysollib.tile.basetilemfxdialog',
@@ -84,7 +84,8 @@ kw = {
                  'pysollib.games',
                  'pysollib.games.special',
                  'pysollib.games.ultra',
-                 'pysollib.games.mahjongg'],
+                 'pysollib.games.mahjongg',
+                 'pysollib.solvers'],
     'data_files': data_files,
     }
 
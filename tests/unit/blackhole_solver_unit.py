@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+from pysollib.solvers.blackhole import BlackHoleSolver, TALON
+
+
+class MyTests(unittest.TestCase):
+    def _play(self, columns, foundation, talon, moves):
+        # replay the moves and check them
+        columns = [list(c) for c in columns]
+        talon = list(talon)
+        f = foundation
+        for i in moves:
+            if i == TALON:
+                f = talon.pop(0)
+                continue
+            r = columns[i].pop()
+            self.assertTrue(f is None or (r - f) % 13 in (1, 12))
+            f = r
+        return sum(len(c) for c in columns)
+
+    def test_solved(self):
+        columns = [[6, 2], [4, 1], [5, 3]]
+        s = BlackHoleSolver(columns, foundation=0)
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertEqual(self._play(columns, 0, (), s.moves), 0)
+
+    def test_unsolved(self):
+        s = BlackHoleSolver([[0, 5], [7, 9]], foundation=0)
+        # TEST
+        self.assertEqual(s.solve(), 'unsolved')
+        # TEST
+        self.assertEqual(s.moves, [])
+
+    def test_talon(self):
+        columns = [[6], [1, 2]]
+        talon = [5, 3]
+        s = BlackHoleSolver(columns, foundation=9, talon=talon, wrap=False)
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertEqual(self._play(columns, 9, talon, s.moves), 0)
+
+    def test_intractable(self):
+        columns = [[r % 13 for r in range(i, 52, 4)] for i in range(4)]
+        s = BlackHoleSolver(columns, foundation=0, max_iters=10)
+        # TEST
+        self.assertEqual(s.solve(), 'intractable')
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.solvers.freecell import FreeCellSolver, FOUNDATION
+
+
+class MockDialog:
+    def setText(self, **kw):
+        pass
+
+
+class MyTests(unittest.TestCase):
+    def test_trivial(self):
+        # only the kings are left
+        s = FreeCellSolver([[(0, 12), (1, 12)], [(2, 12)]], [(3, 12)],
+                           [[12], [12], [12], [12]])
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertEqual(len(s.moves), 4)
+        # TEST
+        self.assertTrue(all(dest is FOUNDATION for n, src, dest in s.moves))
+
+    def test_unsolved(self):
+        # the 2 of clubs lies on the ace and there is no free cell
+        s = FreeCellSolver([[(0, 0), (0, 1)]], [], [[0], [13], [13], [13]],
+                           esf='none')
+        # TEST
+        self.assertEqual(s.solve(), 'unsolved')
+
+    def test_freecell(self):
+        game = HeadlessApp().newGame(8, '24')
+        solver = game.Solver_Class(game, MockDialog())
+        solver.computeHintsInProcess()
+        # TEST
+        self.assertEqual(solver.solver_state, 'solved')
+
+        game.solver = solver
+        while True:
+            hints = solver.getHints(None)
+            if not hints:
+                break
+            ncards, src, dest = hints[0][2:5]
+            src.moveMove(ncards, dest)
+            game.finishMove()
+        # TEST
+        self.assertTrue(game.isGameWon(), 'the solution wins the game')
+
+    def test_prepare(self):
+        game = HeadlessApp().newGame(8, '24')
+        expected = game.Solver_Class(game, MockDialog())
+        expected.computeHintsInProcess()
+        solver = game.Solver_Class(game, MockDialog())
+        solver.prepare()
+        board = solver.calcBoardString()
+        # the cards are moved while the solver runs
+        game.s.rows[0].moveMove(1, game.s.reserves[0], frames=0)
+        game.finishMove()
+        # TEST
+        self.assertEqual(solver.getPreparedBoard(), board)
+        solver.computeHintsInProcess()
+        # TEST
+        self.assertEqual(solver.hints, expected.hints,
+                         'solved from the first board')
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import itertools
+import unittest
+
+import pysollib.games.special.hanoi  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.mfxutil import Struct
+from pysollib.solvers.hanoi import getFrameStewartCount, getHanoiMoves, \
+    searchHanoiMoves
+
+
+class MyTests(unittest.TestCase):
+    def _play(self, pegs, moves):
+        pegs = [list(p) for p in pegs]
+        for i, j in moves:
+            if pegs[j] and pegs[j][-1] < pegs[i][-1]:
+                return None
+            pegs[j].append(pegs[i].pop())
+        return pegs
+
+    def test_three_pegs(self):
+        # every legal position of four disks
+        for pos in itertools.product(range(3), repeat=4):
+            pegs = [[d for d in range(3, -1, -1) if pos[d] == i]
+                    for i in range(3)]
+            moves = getHanoiMoves(pegs, 2)
+            # TEST
+            self.assertEqual(self._play(pegs, moves)[2], [3, 2, 1, 0])
+            best = searchHanoiMoves(pegs, lambda p: len(p[2]) == 4)
+            # TEST
+            self.assertEqual(len(moves), len(best), 'a shortest solution')
+
+    def test_frame_stewart(self):
+        # TEST
+        self.assertEqual([getFrameStewartCount(n, 4)[0] for n in range(8)],
+                         [0, 1, 3, 5, 9, 13, 17, 25])
+        pegs = [[4, 3, 2, 1, 0], [], [], []]
+        moves = getHanoiMoves(pegs, 3)
+        # TEST
+        self.assertEqual(len(moves), 13)
+        # TEST
+        self.assertEqual(self._play(pegs, moves)[3], [4, 3, 2, 1, 0])
+
+    def test_unordered(self):
+        # TEST
+        self.assertIsNone(getHanoiMoves([[0, 1], [], []], 2))
+        # TEST
+        self.assertEqual(searchHanoiMoves([[0, 1], [], []],
+                                          lambda p: len(p[2]) == 2),
+                         [(0, 2), (0, 2)])
+
+    def _playDemo(self, game):
+        game.demo = Struct(level=2, sleep=1.0, last_deal=[], snapshots=set(),
+                           hint=None, keypress=None, turbo=True)
+        game.playDemoToEnd(game.demo)
+
+    def test_demo(self):
+        game = HeadlessApp().newGame(209, '24')
+        self._playDemo(game)
+        # TEST
+        self.assertTrue(game.isGameWon())
+        # TEST
+        self.assertEqual(game.moves.index, 63, 'the shortest solution')
+        for id in (124, 769):
+            game = HeadlessApp().newGame(id, '24')
+            self._playDemo(game)
+            # TEST
+            self.assertTrue(game.isGameWon())
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.hint import LookaheadHint
+from pysollib.mfxutil import Struct
+
+
+class MyTests(unittest.TestCase):
+    def test_klondike(self):
+        game = HeadlessApp().newGame(2, '24')
+        # TEST
+        self.assertEqual(len(game.cards), 52, 'all cards were created')
+        # TEST
+        self.assertEqual(sum(len(s.cards) for s in game.allstacks), 52,
+                         'all cards were dealt')
+
+        snapshot = game.getSnapshot()
+        game.s.talon.dealCards()
+        game.finishMove()
+        # TEST
+        self.assertNotEqual(game.getSnapshot(), snapshot, 'a move was played')
+
+        game.undo()
+        # TEST
+        self.assertEqual(game.getSnapshot(), snapshot, 'undo works')
+
+        game.redo()
+        # TEST
+        self.assertNotEqual(game.getSnapshot(), snapshot, 'redo works')
+
+    def test_snapshot_is_incremental(self):
+        game = HeadlessApp().newGame(2, '24')
+        for i in range(10):
+            game.s.talon.dealCards()
+            game.finishMove()
+        game.undo()
+        game.undo()
+        game.redo()
+        snapshot = game.getSnapshot()
+        # rehash all the stacks
+        game.sn_hashes = None
+        # TEST
+        self.assertEqual(game.getSnapshot(), snapshot,
+                         'the incremental hash matches a full rehash')
+        # TEST
+        self.assertIn(snapshot, game.snapshots)
+
+    def test_accepted_ranks(self):
+        game = HeadlessApp().newGame(2, '24')
+        for r in game.s.rows:
+            # TEST
+            self.assertEqual(r.getAcceptedRanks(),
+                             [(r.cards[-1].rank - 1) % r.cap.mod],
+                             'Klondike rows accept the next lower rank')
+        # TEST
+        self.assertIsNone(game.s.talon.getAcceptedRanks())
+
+    def test_lookahead(self):
+        game = HeadlessApp().newGame(8, '24')
+        snapshot = game.getSnapshot()
+        hints = game.getHints(2)
+        lookahead = game.getHints(4)
+        # TEST
+        self.assertEqual(sorted(lookahead), sorted(hints),
+                         'the lookahead only reorders the hints')
+        game.sn_hashes = None
+        # TEST
+        self.assertEqual(game.getSnapshot(), snapshot,
+                         'the lookahead leaves the game unchanged')
+        # Montana: the hints already come from a search
+        game = HeadlessApp().newGame(53, '24')
+        # TEST
+        self.assertEqual(game.getHints(4), game.getHints(2),
+                         'no lookahead on the planned hints')
+        # the rows are filled from the talon (Trusty Twelve & co.)
+        for id in (480, 481, 482):
+            game = HeadlessApp().newGame(id, '24')
+            # TEST
+            self.assertEqual(game.getHints(4), game.getHints(2),
+                             'no lookahead with fillStack()')
+            # the hint class fails on the positions of the model
+            snapshot = game.getSnapshot()
+            hint = LookaheadHint(game, 4, game.getHintClass())
+            # TEST
+            self.assertEqual(sorted(hint.getHints()),
+                             sorted(game.getHints(2)))
+            game.sn_hashes = None
+            # TEST
+            self.assertEqual(game.getSnapshot(), snapshot)
+
+    def test_hints_cache(self):
+        game = HeadlessApp().newGame(2, '24')
+        hints = game.getHints(0)
+        game.s.talon.dealCards()
+        game.finishMove()
+        game.getHints(0)
+        game.undo()
+        # TEST
+        self.assertIn(game._getHintsCacheKey(0), game.hints_cache,
+                      'undo comes back to a cached position')
+        # TEST
+        self.assertEqual(game.getHints(0), hints)
+
+    def test_has_any_move(self):
+        game = HeadlessApp().newGame(2, '24')
+        hint = game.getHintClass()(game, 0)
+        # TEST
+        self.assertEqual(hint.hasAnyMove(), bool(hint.getHints()))
+        # TEST
+        self.assertEqual(hint.hints, [], 'hasAnyMove() cleans up')
+        for s in game.s.rows:
+            s.cards = []
+        # TEST
+        self.assertFalse(hint.hasAnyMove(), 'no cards, no moves')
+
+    def test_demo_to_end(self):
+        game = HeadlessApp().newGame(2, '24')
+        game.demo = Struct(level=2, sleep=1.0, last_deal=[], snapshots=set(),
+                           hint=None, keypress='q', turbo=True)
+        # TEST
+        self.assertEqual(game.playDemoToEnd(game.demo), 0)
+        # TEST
+        self.assertEqual(game.moves.index, 0, 'a key stops the autopilot')
+        game.demo.keypress = None
+        # TEST
+        self.assertEqual(game.playDemoToEnd(game.demo, 0), 0)
+        # TEST
+        self.assertEqual(game.moves.index, 0, 'no time left')
+        game.playDemoToEnd(game.demo)
+        # TEST
+        self.assertTrue(game.isGameWon(), 'the autopilot wins the game')
+        # TEST
+        self.assertFalse(game.turbo)
+
+    def test_same_deal(self):
+        g1 = HeadlessApp().newGame(2, '1000')
+        g2 = HeadlessApp().newGame(2, '1000')
+        # TEST
+        self.assertEqual(g1.getSnapshot(), g2.getSnapshot(),
+                         'the same seed gives the same deal')
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games.klondike  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.mfxutil import Struct
+from pysollib.solvers.klondike import FOUNDATION, KlondikeSolver, ROW, \
+    TALON, WASTE
+
+
+class MockDialog:
+    def setText(self, **kw):
+        pass
+
+
+class MyTests(unittest.TestCase):
+    def test_trivial(self):
+        # only the kings are left, one of them face-down
+        s = KlondikeSolver([[(0, 12, True)], [(1, 12, False)]],
+                           [(2, 12), (3, 12)], 0, [12, 12, 12, 12])
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertEqual(s.moves, [(1, (ROW, 0), FOUNDATION),
+                                   (1, (ROW, 1), FOUNDATION),
+                                   (1, (WASTE, 0), FOUNDATION),
+                                   (1, (WASTE, 0), FOUNDATION)],
+                         'the cards are dealt when the waste is empty')
+
+    def test_stock(self):
+        # the queen of hearts must be played before the king of hearts
+        s = KlondikeSolver([[(0, 12, True)]], [(2, 12), (3, 12), (2, 11)],
+                           1, [12, 13, 11, 12], num_deal=3)
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        deal = (0, (TALON, 0), None)
+        # TEST
+        self.assertEqual(s.moves.count(deal), 1, 'three cards are dealt')
+        # TEST
+        self.assertEqual(s.moves[s.moves.index(deal) + 1],
+                         (1, (WASTE, 0), FOUNDATION))
+        # the king of hearts lies on the queen in the waste
+        s = KlondikeSolver([[(0, 12, True)]], [(2, 11), (3, 12), (2, 12)],
+                           3, [12, 13, 11, 12], esf='none', num_deal=3,
+                           max_rounds=1)
+        # TEST
+        self.assertEqual(s.solve(), 'unsolved', 'no redeal')
+
+    def test_unsolved(self):
+        # the 2 of clubs lies on the ace and there is no other row
+        s = KlondikeSolver([[(0, 0, False), (0, 1, True)]], [], 0,
+                           [0, 13, 13, 13], esf='none')
+        # TEST
+        self.assertEqual(s.solve(), 'unsolved')
+
+    def test_klondike(self):
+        game = HeadlessApp().newGame(2, '24')
+        solver = game.Solver_Class(game, MockDialog())
+        solver.computeHints()
+        # TEST
+        self.assertEqual(solver.solver_state, 'solved')
+
+        game.solver = solver
+        game.demo = Struct(level=3, sleep=1.0, last_deal=[],
+                           snapshots=set(), hint=None, keypress=None,
+                           turbo=True)
+        game.playDemoToEnd(game.demo)
+        # TEST
+        self.assertTrue(game.isGameWon(), 'the solution wins the game')
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
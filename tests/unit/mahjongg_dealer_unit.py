@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games.mahjongg  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.pysolrandom import constructRandom
+from pysollib.solvers.mahjongg import MahjonggDealer, MahjonggLayout, \
+    MahjonggSolver
+
+
+class MyTests(unittest.TestCase):
+    def _solves(self, layout, pairs):
+        # remove the pairs in the reverse order and check them
+        board = (1 << layout.npos) - 1
+        for i, j in reversed(pairs):
+            if not layout.isFree(i, board):
+                return False
+            if not layout.isFree(j, board):
+                return False
+            board &= ~((1 << i) | (1 << j))
+        return board == 0
+
+    def _row(self):
+        # a single row of four tiles
+        return MahjonggLayout(
+            above=[[], [], [], []], below=[[], [], [], []],
+            left=[[], [0], [1], [2]], right=[[1], [2], [3], []],
+            all_left=[[], [0], [0, 1], [0, 1, 2]],
+            all_right=[[1, 2, 3], [2, 3], [3], []])
+
+    def test_row(self):
+        layout = self._row()
+        pairs = MahjonggDealer(layout, constructRandom('1')).createDeal()
+        # TEST
+        self.assertEqual(len(pairs), 2)
+        # TEST
+        self.assertTrue(self._solves(layout, pairs))
+
+    def test_traditional(self):
+        game = HeadlessApp().newGame(5001, '24')
+        layout = game.getLayout().blockmap
+        for seed in ('1', '2', '3'):
+            pairs = MahjonggDealer(layout, constructRandom(seed)).createDeal()
+            # TEST
+            self.assertTrue(self._solves(layout, pairs),
+                            'the deal is solvable')
+        cards = game._shuffleHook2(game.s.rows, game.cards[:])
+        # TEST
+        self.assertEqual(len(cards), len(game.cards), 'all tiles are dealt')
+
+    def test_solver(self):
+        layout = self._row()
+        s = MahjonggSolver(layout, ['a', 'b', 'b', 'a'])
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertTrue(self._solves(layout, s.moves[::-1]))
+        s = MahjonggSolver(layout, ['a', 'b', 'a', 'b'])
+        # TEST
+        self.assertEqual(s.solve(), 'unsolved')
+        # the tiles of a kind lie one upon the other
+        tower = MahjonggLayout(
+            above=[[1], []], below=[[], [0]], left=[[], []], right=[[], []],
+            all_left=[[], []], all_right=[[], []])
+        s = MahjonggSolver(tower, ['a', 'a'])
+        # TEST
+        self.assertEqual(s.solve(), 'unsolved')
+
+    def test_solvable_deal(self):
+        game = HeadlessApp().newGame(5001, '24')
+        state, moves = game.getSolverResult()
+        # TEST
+        self.assertNotEqual(state, 'unsolved', 'the deals are solvable')
+        if state != 'solved':
+            return
+        r, t = moves[0]
+        # TEST
+        self.assertEqual(game.getHints(0)[0][3:5], (r, t),
+                         'the hint follows the solution')
+        r.moveMove(1, t, frames=0)
+        game.finishMove()
+        # TEST
+        self.assertEqual(game.getSolverResult(), (state, moves[1:]),
+                         'the rest of the solution is known')
+
+    def test_solver_budget(self):
+        game = HeadlessApp().newGame(5001, '24')
+        # TEST
+        self.assertEqual(game.getSolverResult(1)[0], 'intractable')
+        # TEST
+        self.assertEqual(game.getSolverResult()[0], 'solved',
+                         'a larger budget searches again')
+        # TEST
+        self.assertEqual(game.getSolverResult(1)[0], 'solved',
+                         'the known result is kept')
+
+    def test_layout_cache(self):
+        app = HeadlessApp()
+        game = app.constructGame(5001)
+        game.createHeadless(app)
+        layout = game.getLayout().blockmap
+        # TEST
+        self.assertTrue(
+            all(i in layout.below_list[j]
+                for i in range(layout.npos) for j in layout.above_list[i]),
+            'a tile is below the tiles above it')
+        # TEST
+        self.assertEqual(
+            sorted((i, j) for i in range(layout.npos)
+                   for j in layout.left_list[i]),
+            sorted((j, i) for i in range(layout.npos)
+                   for j in layout.right_list[i]),
+            'left and right agree')
+        # TEST
+        self.assertEqual(
+            [sorted(set(a).union(*[layout.all_left_list[j] for j in a]))
+             for a in layout.left_list],
+            [sorted(a) for a in layout.all_left_list],
+            'all_left holds all the tiles on the left')
+        # TEST
+        self.assertEqual(len(game.s.rows), layout.npos)
+        other = app.constructGame(5001)
+        other.createHeadless(app)
+        # TEST
+        self.assertIs(other.getLayout(), game.getLayout(),
+                      'the layout is decoded once')
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games.montana  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.mfxutil import Struct
+from pysollib.solvers.montana import MontanaSolver
+
+
+class MyTests(unittest.TestCase):
+    def test_trivial(self):
+        # two rows of two cards, the first one is shifted right
+        s = MontanaSolver([None, (0, 0), (0, 1), (1, 0), (1, 1), None], 3)
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertEqual(s.moves, [(1, 0), (2, 1)])
+        # the Two goes before the Three (Galary)
+        cards = [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), None, (1, 2), None]
+        s = MontanaSolver(cards, 4)
+        # TEST
+        self.assertEqual(s.solve(), 'intractable')
+        s = MontanaSolver(cards, 4, right=True)
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertEqual(s.moves, [(4, 5), (3, 4)])
+
+    def test_best_line(self):
+        game = HeadlessApp().newGame(53, '24')
+        state, moves = game.getSolverResult()
+        # TEST
+        self.assertTrue(moves, 'there are moves in the first round')
+        r, t = moves[0]
+        # TEST
+        self.assertEqual(game.getHints(0)[0][3:5], (r, t),
+                         'the hint follows the best line')
+        r.moveMove(1, t, frames=0)
+        game.finishMove()
+        # TEST
+        self.assertEqual(game.getSolverResult(), (state, moves[1:]),
+                         'the rest of the line is known')
+
+    def test_demo(self):
+        game = HeadlessApp().newGame(53, '1000000000002')
+        game.demo = Struct(level=2, sleep=1.0, last_deal=[], snapshots=set(),
+                           hint=None, keypress=None, turbo=True)
+        game.playDemoToEnd(game.demo)
+        # TEST
+        self.assertTrue(game.isGameWon(), 'the autopilot wins the game')
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
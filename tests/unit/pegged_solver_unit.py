@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games.special.pegged  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.solvers.pegged import PeggedSolver, getSymmetries
+
+
+class MyTests(unittest.TestCase):
+    def test_row(self):
+        # a row of four holes
+        positions = [(0, 0), (2, 0), (4, 0), (6, 0)]
+        steps = ((-4, 0), (4, 0))
+        s = PeggedSolver(positions, steps, target=1)
+        # TEST
+        self.assertEqual(s.solve([0, 1, 3]), 'solved')
+        # TEST
+        self.assertEqual(s.moves, [(0, 2), (3, 1)])
+        # TEST
+        self.assertEqual(s.solve([0, 3]), 'unsolved')
+
+    def test_symmetries(self):
+        for id, n in ((181, 8), (183, 8), (211, 6)):
+            game = HeadlessApp().newGame(id, '24')
+            positions = [r.pos for r in game.s.rows]
+            # TEST
+            self.assertEqual(len(getSymmetries(positions, game.STEPS)), n)
+
+    def test_classes(self):
+        # no game on the 37 holes board ends with one peg
+        game = HeadlessApp().newGame(180, '24')
+        state, moves = game.getSolverResult()
+        # TEST
+        self.assertEqual(state, 'unsolved')
+        # TEST
+        self.assertEqual(moves, [])
+
+    def test_perfect_game(self):
+        game = HeadlessApp().newGame(181, '24')
+        state, moves = game.getSolverResult()
+        # TEST
+        self.assertEqual(state, 'solved')
+        r, t = moves[0]
+        # TEST
+        self.assertEqual(game.getHints(0)[0][3:5], (r, t),
+                         'the hint follows the solution')
+        r.moveMove(1, t, frames=0)
+        game.finishMove()
+        # TEST
+        self.assertEqual(game.getSolverResult(), (state, moves[1:]),
+                         'the rest of the solution is known')
+        for r, t in moves[1:]:
+            r.moveMove(1, t, frames=0)
+            game.finishMove()
+        # TEST
+        self.assertEqual(game.getWinStatus()[1], 2, 'a perfect game')
+
+    def test_not_perfect_game(self):
+        # the triangle can not end in the empty hole
+        game = HeadlessApp().newGame(210, '24')
+        state, moves = game.getSolverResult()
+        # TEST
+        self.assertEqual(state, 'solved')
+        for r, t in moves:
+            r.moveMove(1, t, frames=0)
+            game.finishMove()
+        # TEST
+        self.assertTrue(game.isGameWon())
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games.pyramid  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.solvers.pyramid import FOUNDATION, PyramidSolver, TALON, \
+    WASTE
+
+
+class MyTests(unittest.TestCase):
+    def test_trivial(self):
+        # a Six under a Queen and a King, an Ace and a Seven in the talon
+        s = PyramidSolver([5, 11, 12], [[1, 2], [], []], [0, 6])
+        state = s.getState([0, 1, 2], [0, 1], 0, 0)
+        # TEST
+        self.assertEqual(s.solve(state), 'solved')
+        # TEST
+        self.assertEqual(s.moves, [(TALON, WASTE), (1, WASTE), (TALON, WASTE),
+                                   (2, FOUNDATION), (0, WASTE)],
+                         'a card is dealt while the waste is empty')
+
+    def test_unsolved(self):
+        # the Five lies under the only Six
+        s = PyramidSolver([5, 6, 12], [[1, 2], [], []], [], clear_stock=False)
+        # TEST
+        self.assertEqual(s.solve(s.getState([0, 1, 2], [], 0, 0)),
+                         'unsolved')
+
+    def test_solution(self):
+        game = HeadlessApp().newGame(38, '24')
+        state, moves = game.getSolverResult()
+        # TEST
+        self.assertEqual(state, 'solved')
+        # TEST
+        self.assertEqual(game.getHints(0)[0][3:5], moves[0],
+                         'the hint follows the solution')
+        while not game.isGameWon():
+            state, moves = game.getSolverResult()
+            # TEST
+            self.assertEqual(state, 'solved')
+            r, t = moves[0]
+            if t is None:
+                game.dealCards()
+            else:
+                r.moveMove(1, t, frames=0)
+            game.finishMove()
+        # TEST
+        self.assertTrue(game.isGameWon(), 'the solution wins the game')
+
+    def test_solver_budget(self):
+        game = HeadlessApp().newGame(38, '24')
+        # TEST
+        self.assertEqual(game.getSolverResult(1)[0], 'intractable')
+        # TEST
+        self.assertEqual(game.getSolverResult()[0], 'solved',
+                         'a larger budget searches again')
+        # TEST
+        self.assertEqual(game.getSolverResult(1)[0], 'solved',
+                         'the known result is kept')
+
+    def test_hints(self):
+        for seed in ('2', '3', '4'):
+            game = HeadlessApp().newGame(38, seed)
+            for level in (0, 2):
+                hints = [h[2:5] for h in game.getHints(level)]
+                # TEST
+                self.assertEqual(len(set(hints)), len(hints),
+                                 'each move is hinted once')
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games.mahjongg  # noqa: F401
+from pysollib.headless import HeadlessApp
+
+
+class MyTests(unittest.TestCase):
+    def _setTiles(self, game, positions):
+        # put a pair of matching tiles on the given (col, row)
+        card = game.cards[0]
+        other = [c for c in game.cards[1:] if game.cardsMatch(card, c)][0]
+        for r in game.s.rows:
+            r.cards = []
+        stacks = [game.cols[x][y] for x, y in positions]
+        stacks[0].cards = [card]
+        stacks[1].cards = [other]
+        return stacks
+
+    def test_empty_board(self):
+        game = HeadlessApp().newGame(11001, '24')
+        r, t = self._setTiles(game, [(0, 0), (13, 5)])
+        # TEST
+        self.assertEqual(r.acceptsCards(t, t.cards),
+                         [(1, 1), (1, 6), (14, 6)], 'one turn')
+
+    def test_around_the_board(self):
+        game = HeadlessApp().newGame(11001, '24')
+        r, t = self._setTiles(game, [(3, 0), (7, 0)])
+        game.cols[5][0].cards = [game.cards[2]]
+        # TEST
+        self.assertEqual(r.acceptsCards(t, t.cards),
+                         [(4, 1), (4, 0), (8, 0), (8, 1)],
+                         'two turns through the border')
+        game.cols[5][0].cards = []
+        # TEST
+        self.assertEqual(r.acceptsCards(t, t.cards), [(4, 1), (8, 1)])
+
+    def test_blocked(self):
+        game = HeadlessApp().newGame(11001, '24')
+        r, t = self._setTiles(game, [(5, 3), (9, 3)])
+        for x, y in ((4, 3), (6, 3), (5, 2), (5, 4)):
+            game.cols[x][y].cards = [game.cards[2]]
+        # TEST
+        self.assertIsNone(r.acceptsCards(t, t.cards))
+
+    def test_full_board(self):
+        game = HeadlessApp().newGame(11001, '24')
+        for r in game.s.rows:
+            for t in game.s.rows:
+                if r is t or not game.cardsMatch(r.cards[0], t.cards[0]):
+                    continue
+                path = r.acceptsCards(t, t.cards)
+                x1, y1, x2, y2 = r.coln, r.rown, t.coln, t.rown
+                inner = 0 < x1 < 13 and 0 < y1 < 5 and \
+                    0 < x2 < 13 and 0 < y2 < 5
+                if abs(x1 - x2) + abs(y1 - y2) == 1:
+                    # TEST
+                    self.assertEqual(len(path), 2, 'neighbours')
+                elif inner:
+                    # TEST
+                    self.assertIsNone(path)
+
+    def _checkMatchingPairs(self, game):
+        rows = [r for r in game.s.rows if r.cards]
+        pairs = [(r, t) for i, r in enumerate(rows) for t in rows[i+1:]
+                 if r.acceptsCards(t, t.cards)]
+        # TEST
+        self.assertEqual(game.getMatchingPairs(), pairs)
+        return pairs
+
+    def test_matching_pairs(self):
+        for id in (11001, 11004, 11011):
+            game = HeadlessApp().newGame(id, '24')
+            game.app.opt.shisen_show_hint = False
+            for i in range(10):
+                pairs = self._checkMatchingPairs(game)
+                if not pairs:
+                    break
+                r, t = pairs[-1]
+                r.moveMove(1, t, frames=0)
+                game.finishMove()
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
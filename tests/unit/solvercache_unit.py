@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import os
+import tempfile
+import unittest
+
+from pysollib.solvercache import SolverCache
+
+
+class MyTests(unittest.TestCase):
+    def test_lru(self):
+        cache = SolverCache(max_entries=2)
+        k1 = cache.getKey('board1', ['fc-solve', '--max-iters', 100])
+        k2 = cache.getKey('board2', ['fc-solve', '--max-iters', 100])
+        k3 = cache.getKey('board1', ['fc-solve', '--max-iters', 200])
+        # TEST
+        self.assertNotEqual(k1, k3, 'the args are part of the key')
+
+        cache.put(k1, ('solved', [(1, ('rows', 0), None)]))
+        cache.put(k2, ('unsolved', []))
+        # TEST
+        self.assertEqual(cache.get(k1), ('solved', [(1, ('rows', 0), None)]),
+                         'get works')
+
+        cache.put(k3, ('intractable', []))
+        # TEST
+        self.assertIsNone(cache.get(k2), 'the least recently used is dropped')
+        # TEST
+        self.assertIsNotNone(cache.get(k1), 'k1 was used recently')
+
+    def test_save_load(self):
+        cache = SolverCache()
+        cache.put('key', ('solved', []))
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            cache.save(filename)
+            cache2 = SolverCache()
+            cache2.load(filename)
+            # TEST
+            self.assertEqual(cache2.get('key'), ('solved', []),
+                             'save and load work')
+        finally:
+            os.remove(filename)
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import io
+import sys
+import unittest
+
+from pysollib.solverpool import SolverPool, read_frame, write_frame
+
+# echoes the board in upper case, writes to stderr and exits with 3
+COMMAND = [sys.executable, '-c',
+           'import sys; sys.stdout.write(sys.stdin.read().upper()); '
+           'sys.stderr.write("done"); sys.exit(3)']
+
+
+class MyTests(unittest.TestCase):
+    def test_frames(self):
+        fh = io.BytesIO()
+        write_frame(fh, b'o', b'abc')
+        write_frame(fh, b'x', b'')
+        fh.seek(0)
+        # TEST
+        self.assertEqual(read_frame(fh), (b'o', b'abc'))
+        # TEST
+        self.assertEqual(read_frame(fh), (b'x', b''))
+        # TEST
+        self.assertRaises(EOFError, read_frame, fh)
+
+    def test_run(self):
+        pool = SolverPool(size=1)
+        try:
+            chunks = []
+            result = pool.run(COMMAND, 'board\n', chunks.append)
+            # TEST
+            self.assertEqual(result, (3, b'BOARD\n', b'done'))
+            # TEST
+            self.assertEqual(b''.join(chunks), b'BOARD\n')
+            # the worker is used again
+            worker = pool.workers[0]
+            # TEST
+            self.assertEqual(pool.run(COMMAND, 'x'), (3, b'X', b'done'))
+            # TEST
+            self.assertEqual(pool.workers, [worker])
+        finally:
+            pool.shutdown()
+        # frozen executables run the solver in-process
+        pool = SolverPool(size=1)
+        pool.use_workers = False
+        # TEST
+        self.assertEqual(pool.run(COMMAND, 'board'), (3, b'BOARD', b'done'))
+        # TEST
+        self.assertEqual(pool.workers, [])
+
+    def test_not_found(self):
+        pool = SolverPool(size=1)
+        try:
+            # TEST
+            self.assertEqual(pool.run(['no-such-solver-command'], ''),
+                             (127, b'', b''))
+        finally:
+            pool.shutdown()
+
+    def test_retry(self):
+        pool = SolverPool(size=1)
+        pids = []
+
+        def started(pid):
+            # kill the worker while it waits for the solver
+            if not pids:
+                pool.workers[0].process.kill()
+            pids.append(pid)
+        try:
+            # TEST
+            self.assertEqual(pool.run(COMMAND, 'board', started=started),
+                             (3, b'BOARD', b'done'))
+            # TEST
+            self.assertEqual(len(pids), 2, 'the request is sent again')
+            # TEST
+            self.assertTrue(pool.workers[0].isAlive(), 'a new worker')
+        finally:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Written by Shlomi Fish, under the MIT Expat License.
+
+import unittest
+
+import pysollib.games.spider  # noqa: F401
+from pysollib.headless import HeadlessApp
+from pysollib.solvers.spider import FOUNDATION, SpiderSolver, TALON
+
+
+class MyTests(unittest.TestCase):
+    def _suit(self, suit, first, last):
+        # the cards of a suit from first down to last
+        return [(suit, rank) for rank in range(first, last - 1, -1)]
+
+    def test_moves(self):
+        s = SpiderSolver([[(0, 4)], [(1, 6), (0, 5)]], 0)
+        # TEST
+        self.assertEqual(s.solve(), 'intractable')
+        # TEST
+        self.assertEqual(s.moves, [(1, 0, 1)], 'the row is emptied')
+        # the runs move as units
+        s = SpiderSolver([[None, (0, 9), (0, 8)], [(1, 10)]], 0)
+        s.solve()
+        # TEST
+        self.assertEqual(s.moves, [(2, 0, 1)])
+        # TEST
+        self.assertEqual(s.path, [s.getKey()])
+
+    def test_drop(self):
+        s = SpiderSolver([self._suit(2, 12, 1), [(2, 0)]], 0)
+        # TEST
+        self.assertEqual(s.solve(), 'solved')
+        # TEST
+        self.assertEqual(s.moves, [(1, 1, 0), (13, 0, FOUNDATION)])
+
+    def test_reveal(self):
+        # the line ends when a card is turned up
+        s = SpiderSolver([[None, (0, 5)], [(1, 6)], [(1, 4)]], 0)
+        s.solve()
+        # TEST
+        self.assertEqual(s.moves, [(1, 0, 1)])
+
+    def test_deal(self):
+        rows = [[(0, 3)], [(1, 9)], [(2, 6)]]
+        s = SpiderSolver(rows, 10)
+        s.solve()
+        # TEST
+        self.assertEqual(s.moves, [(0, TALON, None)])
+        rows[1] = []
+        s = SpiderSolver(rows, 10, deal_empty=False)
+        s.solve()
+        # TEST
+        self.assertEqual(s.moves, [], 'no deal with an empty row')
+
+    def test_black_widow(self):
+        # any sequence of ranks moves as a unit
+        rows = [[None, (0, 9), (1, 8)], [(2, 10)]]
+        s = SpiderSolver(rows, 0, same_suit=False)
+        s.solve()
+        # TEST
+        self.assertEqual(s.moves, [(2, 0, 1)])
+        s = SpiderSolver(rows, 0)
+        s.solve()
+        # TEST
+        self.assertEqual(s.moves, [], 'only one suit moves in Spider')
+
+    def test_game(self):
+        # Open Spider: all the cards are face up, the lines are longer
+        game = HeadlessApp().newGame(461, '24')
+        state, moves = game.getSolverResult()
+        # TEST
+        self.assertTrue(len(moves) > 1, 'a line is found')
+        ncards, r, t = moves[0]
+        # TEST
+        self.assertEqual(game.getHints(0)[0][2:5], (ncards, r, t),
+                         'the hint follows the line')
+        r.moveMove(ncards, t, frames=0)
+        game.finishMove()
+        # TEST
+        self.assertEqual(game.getSolverResult(), (state, moves[1:]),
+                         'the rest of the line is known')
+
+    def test_hints(self):
+        for seed in ('1', '2', '3', '4'):
+            game = HeadlessApp().newGame(10, seed)
+            for level in (0, 2):
+                hints = [h[2:5] for h in game.getHints(level)]
+                # TEST
+                self.assertEqual(len(set(hints)), len(hints),
+                                 'each move is hinted once')
+
+    def test_unsupported(self):
+        # Simple Simon (the free rows limit the moves)
+        game = HeadlessApp().newGame(50, '24')
+        # TEST
+        self.assertIsNone(game.getSolverResult())
+
+
+if __name__ == '__main__':
+    from pycotap import TAPTestRunner
+    suite = unittest.TestLoader().loadTestsFromTestCase(MyTests)
+    TAPTestRunner().run(suite)